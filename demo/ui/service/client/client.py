@@ -28,25 +28,48 @@ from service.types import (
 import json
 
 class ConversationClient:
+  """Client for the conversation server.
 
-  def __init__(self, base_url):
+  Calls share a pool of keep-alive connections that lives until aclose() is
+  called, or until the end of an `async with ConversationClient(...)` block.
+  """
+
+  def __init__(self, base_url, httpx_client: httpx.AsyncClient | None = None):
     self.base_url = base_url.rstrip("/")
+    self._httpx_client = httpx_client
+    self._owns_httpx_client = httpx_client is None
+
+  @property
+  def httpx_client(self) -> httpx.AsyncClient:
+    if self._httpx_client is None:
+      self._httpx_client = httpx.AsyncClient()
+    return self._httpx_client
+
+  async def aclose(self):
+    if self._owns_httpx_client and self._httpx_client is not None:
+      await self._httpx_client.aclose()
+      self._httpx_client = None
+
+  async def __aenter__(self) -> "ConversationClient":
+    return self
+
+  async def __aexit__(self, *exc_info):
+    await self.aclose()
 
   async def send_message(self, payload: SendMessageRequest) -> SendMessageResponse:
     return SendMessageResponse(**await self._send_request(payload))
 
   async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-    async with httpx.AsyncClient() as client:
-      try:
-        response = await client.post(
-          self.base_url + "/" + request.method, json=request.model_dump()
-        )
-        response.raise_for_status()
-        return response.json()
-      except httpx.HTTPStatusError as e:
-        raise AgentClientHTTPError(e.response.status_code, str(e)) from e
-      except json.JSONDecodeError as e:
-        raise AgentClientJSONError(str(e)) from e
+    try:
+      response = await self.httpx_client.post(
+        self.base_url + "/" + request.method, json=request.model_dump()
+      )
+      response.raise_for_status()
+      return response.json()
+    except httpx.HTTPStatusError as e:
+      raise AgentClientHTTPError(e.response.status_code, str(e)) from e
+    except json.JSONDecodeError as e:
+      raise AgentClientJSONError(str(e)) from e
 
   async def create_conversation(self, payload: CreateConversationRequest) -> CreateConversationResponse:
     return CreateConversationResponse(**await self._send_request(payload))
@@ -1,5 +1,4 @@
 import asyncio
-import base64
 import threading
 import os
 import uuid
@@ -7,6 +6,7 @@ from typing import Any
 from fastapi import APIRouter
 from fastapi import Request, Response
 from common.types import Message, Task, FilePart, FileContent
+from common.utils.content_store import get_content_store
 from .in_memory_manager import InMemoryFakeAgentManager
 from .application_manager import ApplicationManager
 from .adk_host_manager import ADKHostManager, get_message_id
@@ -45,6 +45,9 @@ class ConversationServer:
       self.manager = InMemoryFakeAgentManager()
     self._file_cache = {} # dict[str, FilePart] maps file id to message data
     self._message_to_cache = {} # dict[str, str] maps message id to cache id
+    # Inline bytes are shared through the content store, so a file resent
+    # across messages is held once.
+    self._content_store = get_content_store()
 
     router.add_api_route(
         "/conversation/create",
@@ -138,15 +141,18 @@ class ConversationServer:
         else:
           cache_id = str(uuid.uuid4())
           self._message_to_cache[message_part_id] = cache_id
+          if part.file.bytes:
+            # Each part keeps its own name and mimeType, only the bytes are shared.
+            _, part.file.bytes = self._content_store.intern(part.file.bytes)
+          self._file_cache[cache_id] = part
         # Replace the part data with a url reference
         new_parts.append(FilePart(
             file=FileContent(
+                name=part.file.name,
                 mimeType=part.file.mimeType,
                 uri=f"/message/file/{cache_id}",
             )
         ))
-        if cache_id not in self._file_cache:
-          self._file_cache[cache_id] = part
       m.parts = new_parts
       rval.append(m)
     return rval
@@ -178,7 +184,7 @@ class ConversationServer:
     part = self._file_cache[file_id]
     if "image" in part.file.mimeType:
       return Response(
-          content=base64.b64decode(part.file.bytes),
+          content=part.file.decoded_bytes,
           media_type=part.file.mimeType)
     return Response(content=part.file.bytes, media_type=part.file.mimeType)
   
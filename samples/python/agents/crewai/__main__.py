@@ -6,7 +6,7 @@ and starts the server to handle incoming requests.
 
 from agent import ImageGenerationAgent
 import click
-from common.server import A2AServer
+from common.server import A2AServer, FileSystemBlobStore
 from common.types import AgentCapabilities, AgentCard, AgentSkill, MissingAPIKeyError
 import logging
 import os
@@ -21,7 +21,13 @@ logger = logging.getLogger(__name__)
 @click.command()
 @click.option("--host", "host", default="localhost")
 @click.option("--port", "port", default=10001)
-def main(host, port):
+@click.option(
+    "--blob-store-dir",
+    "blob_store_dir",
+    default=None,
+    help="Serve generated images from this directory by uri instead of inline bytes.",
+)
+def main(host, port, blob_store_dir):
   """Entry point for the A2A + CrewAI Image generation sample."""
   try:
     if not os.getenv("GOOGLE_API_KEY"):
@@ -60,6 +66,7 @@ def main(host, port):
         task_manager=AgentTaskManager(agent=ImageGenerationAgent()),
         host=host,
         port=port,
+        blob_store=FileSystemBlobStore(blob_store_dir) if blob_store_dir else None,
     )
     logger.info(f"Starting server on {host}:{port}")
     server.start()
@@ -11,6 +11,7 @@ import os
 import re
 from typing import Any, AsyncIterable, Dict, List
 from uuid import uuid4
+from common.utils.content_store import get_content_store
 from common.utils.in_memory_cache import InMemoryCache
 from crewai import Agent, Crew, LLM, Task
 from crewai.process import Process
@@ -110,8 +111,12 @@ def generate_image_tool(prompt: str, session_id: str, artifact_file_id: str = No
   for part in response.candidates[0].content.parts:
     if part.inline_data is not None:
       try:
+        # Share the encoded image with the task store instead of holding a second copy.
+        _, image_bytes = get_content_store().intern(
+            base64.b64encode(part.inline_data.data).decode("utf-8")
+        )
         data = Imagedata(
-            bytes=base64.b64encode(part.inline_data.data).decode("utf-8"),
+            bytes=image_bytes,
             mime_type=part.inline_data.mime_type,
             name="generated_image.png",
             id=uuid4().hex,
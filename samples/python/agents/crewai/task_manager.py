@@ -68,24 +68,7 @@ class AgentTaskManager(InMemoryTaskManager):
   async def _update_store(
       self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
   ) -> Task:
-    async with self.lock:
-      try:
-        task = self.tasks[task_id]
-      except KeyError as exc:
-        logger.error("Task %s not found for updating the task", task_id)
-        raise ValueError(f"Task {task_id} not found") from exc
-
-      task.status = status
-
-      if status.message is not None:
-        self.task_messages[task_id].append(status.message)
-
-      if artifacts is not None:
-        if task.artifacts is None:
-          task.artifacts = []
-        task.artifacts.extend(artifacts)
-
-      return task
+    return await self.update_store(task_id, status, artifacts)
 
   async def _invoke(self, request: SendTaskRequest) -> SendTaskResponse:
     task_send_params: TaskSendParams = request.params
@@ -7,7 +7,6 @@ from common.types import (
     TaskStatus,
     Artifact,
     TaskStatusUpdateEvent,
-    TaskArtifactUpdateEvent,
     TextPart,
     TaskState,
     Task,
@@ -18,6 +17,7 @@ from common.types import (
     SendTaskStreamingResponse,
 )
 from common.server.task_manager import InMemoryTaskManager
+from common.utils.artifact_chunks import chunk_artifact
 from agent import ReimbursementAgent
 import common.server.utils as utils
 from typing import Union
@@ -58,7 +58,10 @@ class AgentTaskManager(InMemoryTaskManager):
               artifacts = [Artifact(parts=parts, index=0, append=False)]
           message = Message(role="agent", parts=parts)
           task_status = TaskStatus(state=task_state, message=message)
-          await self._update_store(task_send_params.id, task_status, artifacts)
+          # Streamed updates are not read back, skip building the task.
+          await self.record_update(
+              task_send_params.id, task_status, artifacts, append_status_message=False
+          )
           task_update_event = TaskStatusUpdateEvent(
                 id=task_send_params.id,
                 status=task_status,
@@ -68,13 +71,12 @@ class AgentTaskManager(InMemoryTaskManager):
           # Now yield Artifacts too
           if artifacts:
             for artifact in artifacts:
-              yield SendTaskStreamingResponse(
-                  id=request.id,
-                  result=TaskArtifactUpdateEvent(
-                      id=task_send_params.id,
-                      artifact=artifact,
-                  )
-              )
+              for task_artifact_update_event in chunk_artifact(
+                  task_send_params.id, artifact, self.artifact_chunk_size
+              ):
+                yield SendTaskStreamingResponse(
+                    id=request.id, result=task_artifact_update_event
+                )
           if is_task_complete:
             yield SendTaskStreamingResponse(
               id=request.id,
@@ -124,20 +126,9 @@ class AgentTaskManager(InMemoryTaskManager):
     async def _update_store(
         self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
     ) -> Task:
-        async with self.lock:
-            try:
-                task = self.tasks[task_id]
-            except KeyError:
-                logger.error(f"Task {task_id} not found for updating the task")
-                raise ValueError(f"Task {task_id} not found")
-            task.status = status
-            #if status.message is not None:
-            #    self.task_messages[task_id].append(status.message)
-            if artifacts is not None:
-                if task.artifacts is None:
-                    task.artifacts = []
-                task.artifacts.extend(artifacts)
-            return task
+        return await self.update_store(
+            task_id, status, artifacts, append_status_message=False
+        )
     async def _invoke(self, request: SendTaskRequest) -> SendTaskResponse:
         task_send_params: TaskSendParams = request.params
         query = self._get_user_query(task_send_params)
@@ -12,7 +12,6 @@ from common.types import (
     JSONRPCResponse,
     SendTaskStreamingRequest,
     SendTaskStreamingResponse,
-    TaskArtifactUpdateEvent,
     TaskStatusUpdateEvent,
     Task,
     TaskIdParams,
@@ -46,49 +45,47 @@ class AgentTaskManager(InMemoryTaskManager):
         query = self._get_user_query(task_send_params)
 
         try:
-            async for item in self.agent.stream(query, task_send_params.sessionId):
-                is_task_complete = item["is_task_complete"]
-                require_user_input = item["require_user_input"]
-                artifact = None
-                message = None
-                parts = [{"type": "text", "text": item["content"]}]
-                end_stream = False
-
-                if not is_task_complete and not require_user_input:
-                    task_state = TaskState.WORKING
-                    message = Message(role="agent", parts=parts)
-                elif require_user_input:
-                    task_state = TaskState.INPUT_REQUIRED
-                    message = Message(role="agent", parts=parts)
-                    end_stream = True
-                else:
-                    task_state = TaskState.COMPLETED
-                    artifact = Artifact(parts=parts, index=0, append=False)
-                    end_stream = True
-
-                task_status = TaskStatus(state=task_state, message=message)
-                latest_task = await self.update_store(
-                    task_send_params.id,
-                    task_status,
-                    None if artifact is None else [artifact],
-                )
-                await self.send_task_notification(latest_task)
-
-                if artifact:
-                    task_artifact_update_event = TaskArtifactUpdateEvent(
-                        id=task_send_params.id, artifact=artifact
+            async with self.run_in_session(task_send_params.sessionId, task_send_params.id):
+                async for item in self.agent.stream(query, task_send_params.sessionId):
+                    is_task_complete = item["is_task_complete"]
+                    require_user_input = item["require_user_input"]
+                    artifact = None
+                    message = None
+                    parts = [{"type": "text", "text": item["content"]}]
+                    end_stream = False
+
+                    if not is_task_complete and not require_user_input:
+                        task_state = TaskState.WORKING
+                        message = Message(role="agent", parts=parts)
+                    elif require_user_input:
+                        task_state = TaskState.INPUT_REQUIRED
+                        message = Message(role="agent", parts=parts)
+                        end_stream = True
+                    else:
+                        task_state = TaskState.COMPLETED
+                        artifact = Artifact(parts=parts, index=0, append=False)
+                        end_stream = True
+
+                    task_status = TaskStatus(state=task_state, message=message)
+                    latest_task = await self.update_store(
+                        task_send_params.id,
+                        task_status,
+                        None if artifact is None else [artifact],
                     )
-                    await self.enqueue_events_for_sse(
-                        task_send_params.id, task_artifact_update_event
-                    )                    
+                    await self.send_task_notification(latest_task)
+
+                    if artifact:
+                        await self.enqueue_artifact_for_sse(
+                            task_send_params.id, artifact
+                        )
                     
 
-                task_update_event = TaskStatusUpdateEvent(
-                    id=task_send_params.id, status=task_status, final=end_stream
-                )
-                await self.enqueue_events_for_sse(
-                    task_send_params.id, task_update_event
-                )
+                    task_update_event = TaskStatusUpdateEvent(
+                        id=task_send_params.id, status=task_status, final=end_stream
+                    )
+                    await self.enqueue_events_for_sse(
+                        task_send_params.id, task_update_event
+                    )
 
         except Exception as e:
             logger.error(f"An error occurred while streaming the response: {e}")
@@ -136,7 +133,11 @@ class AgentTaskManager(InMemoryTaskManager):
         task_send_params: TaskSendParams = request.params
         query = self._get_user_query(task_send_params)
         try:
-            agent_response = self.agent.invoke(query, task_send_params.sessionId)
+            # Invoke off the event loop so that other sessions keep running meanwhile.
+            async with self.run_in_session(task_send_params.sessionId, task_send_params.id):
+                agent_response = await asyncio.to_thread(
+                    self.agent.invoke, query, task_send_params.sessionId
+                )
         except Exception as e:
             logger.error(f"Error invoking agent: {e}")
             raise ValueError(f"Error invoking agent: {e}")
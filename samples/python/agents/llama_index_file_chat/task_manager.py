@@ -19,7 +19,6 @@ from common.types import (
     JSONRPCResponse,
     SendTaskStreamingRequest,
     SendTaskStreamingResponse,
-    TaskArtifactUpdateEvent,
     TaskStatusUpdateEvent,
     Task,
     TaskIdParams,
@@ -59,77 +58,76 @@ class LlamaIndexTaskManager(InMemoryTaskManager):
         input_event = self._get_input_event(task_send_params)
 
         try:
-            ctx = None
-            handler = None
+            # Runs of the same session share ctx_states, so they must not overlap.
+            async with self.run_in_session(session_id, task_id):
+                ctx = None
+                handler = None
             
-            # Check if we have a saved context state for this session
-            print(f"Len of tasks: {len(self.tasks)}", flush=True)
-            print(f"Len of ctx_states: {len(self.ctx_states)}", flush=True)
-            saved_ctx_state = self.ctx_states.get(session_id, None)
+                # Check if we have a saved context state for this session
+                print(f"Len of tasks: {len(self.tasks)}", flush=True)
+                print(f"Len of ctx_states: {len(self.ctx_states)}", flush=True)
+                saved_ctx_state = self.ctx_states.get(session_id, None)
 
-            if saved_ctx_state is not None:
-                # Resume with existing context
-                logger.info(f"Resuming session {session_id} with saved context")
-                ctx = Context.from_dict(self.agent, saved_ctx_state)
-                handler = self.agent.run(
-                    start_event=input_event,
-                    ctx=ctx,
-                )
-            else:
-                # New session!
-                logger.info(f"Starting new session {session_id}")
-                handler = self.agent.run(
-                    start_event=input_event,
-                )
-
-            # Stream updates as they come
-            async for event in handler.stream_events():
-                if isinstance(event, LogEvent):
-                    # Send log event as intermediate message
-                    content = event.msg
-                    parts = [{"type": "text", "text": content}]
-                    task_status = TaskStatus(
-                        state=TaskState.WORKING,
-                        message=Message(role="agent", parts=parts)
+                if saved_ctx_state is not None:
+                    # Resume with existing context
+                    logger.info(f"Resuming session {session_id} with saved context")
+                    ctx = Context.from_dict(self.agent, saved_ctx_state)
+                    handler = self.agent.run(
+                        start_event=input_event,
+                        ctx=ctx,
                     )
-                    latest_task = await self.update_store(task_id, task_status, None)
-                    await self.send_task_notification(latest_task)
-                    
-                    # Send status update event
-                    task_update_event = TaskStatusUpdateEvent(
-                        id=task_id, status=task_status, final=False
+                else:
+                    # New session!
+                    logger.info(f"Starting new session {session_id}")
+                    handler = self.agent.run(
+                        start_event=input_event,
                     )
-                    await self.enqueue_events_for_sse(task_id, task_update_event)
 
-            # If we got here without hitting a return, wait for final response
-            final_response = await handler
-            if isinstance(final_response, ChatResponseEvent):
-                content = final_response.response
-                parts = [{"type": "text", "text": content}]
-                metadata = final_response.citations if hasattr(final_response, 'citations') else None            
-                if metadata is not None:
-                    # ensure metadata is a dict of str keys
-                    metadata = {str(k): v for k, v in metadata.items()}                    
+                # Stream updates as they come
+                async for event in handler.stream_events():
+                    if isinstance(event, LogEvent):
+                        # Send log event as intermediate message
+                        content = event.msg
+                        parts = [{"type": "text", "text": content}]
+                        task_status = TaskStatus(
+                            state=TaskState.WORKING,
+                            message=Message(role="agent", parts=parts)
+                        )
+                        latest_task = await self.update_store(task_id, task_status, None)
+                        await self.send_task_notification(latest_task)
+                    
+                        # Send status update event
+                        task_update_event = TaskStatusUpdateEvent(
+                            id=task_id, status=task_status, final=False
+                        )
+                        await self.enqueue_events_for_sse(task_id, task_update_event)
 
-                # save the context state to resume the current session
-                self.ctx_states[session_id] = handler.ctx.to_dict()
+                # If we got here without hitting a return, wait for final response
+                final_response = await handler
+                if isinstance(final_response, ChatResponseEvent):
+                    content = final_response.response
+                    parts = [{"type": "text", "text": content}]
+                    metadata = final_response.citations if hasattr(final_response, 'citations') else None            
+                    if metadata is not None:
+                        # ensure metadata is a dict of str keys
+                        metadata = {str(k): v for k, v in metadata.items()}                    
+
+                    # save the context state to resume the current session
+                    self.ctx_states[session_id] = handler.ctx.to_dict()
                 
-                artifact = Artifact(parts=parts, index=0, append=False, metadata=metadata)
-                task_status = TaskStatus(state=TaskState.COMPLETED)
-                latest_task = await self.update_store(task_id, task_status, [artifact])
-                await self.send_task_notification(latest_task)
+                    artifact = Artifact(parts=parts, index=0, append=False, metadata=metadata)
+                    task_status = TaskStatus(state=TaskState.COMPLETED)
+                    latest_task = await self.update_store(task_id, task_status, [artifact])
+                    await self.send_task_notification(latest_task)
                 
-                # Send artifact update
-                task_artifact_update_event = TaskArtifactUpdateEvent(
-                    id=task_id, artifact=artifact
-                )
-                await self.enqueue_events_for_sse(task_id, task_artifact_update_event)
+                    # Send artifact update
+                    await self.enqueue_artifact_for_sse(task_id, artifact)
                 
-                # Send final status update
-                task_update_event = TaskStatusUpdateEvent(
-                    id=task_id, status=task_status, final=True
-                )
-                await self.enqueue_events_for_sse(task_id, task_update_event)
+                    # Send final status update
+                    task_update_event = TaskStatusUpdateEvent(
+                        id=task_id, status=task_status, final=True
+                    )
+                    await self.enqueue_events_for_sse(task_id, task_update_event)
 
         except Exception as e:
             logger.error(f"An error occurred while streaming the response: {e}")
@@ -190,27 +188,28 @@ class LlamaIndexTaskManager(InMemoryTaskManager):
         input_event = self._get_input_event(task_send_params)
         
         try:
-            # Check if we have a saved context for this session
-            ctx = None
-            saved_ctx_state = self.ctx_states.get(session_id, None)
+            async with self.run_in_session(session_id, task_id):
+                # Check if we have a saved context for this session
+                ctx = None
+                saved_ctx_state = self.ctx_states.get(session_id, None)
             
-            if saved_ctx_state:
-                # Resume existing conversation
-                logger.info(f"Resuming existing conversation for session {session_id}")
-                ctx = Context.from_dict(self.agent, saved_ctx_state)
-                handler = self.agent.run(
-                    start_event=input_event,
-                    ctx=ctx,
-                )
-            else:
-                # New conversation
-                logger.info(f"Starting new conversation for session {session_id}")
-                handler = self.agent.run(
-                    start_event=input_event,
-                )
+                if saved_ctx_state:
+                    # Resume existing conversation
+                    logger.info(f"Resuming existing conversation for session {session_id}")
+                    ctx = Context.from_dict(self.agent, saved_ctx_state)
+                    handler = self.agent.run(
+                        start_event=input_event,
+                        ctx=ctx,
+                    )
+                else:
+                    # New conversation
+                    logger.info(f"Starting new conversation for session {session_id}")
+                    handler = self.agent.run(
+                        start_event=input_event,
+                    )
             
             
-            final_response: ChatResponseEvent = await handler
+                final_response: ChatResponseEvent = await handler
 
             # Create artifact with response
             content = final_response.response
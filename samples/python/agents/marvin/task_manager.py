@@ -20,7 +20,6 @@ from common.types import (
     SendTaskStreamingRequest,
     SendTaskStreamingResponse,
     Task,
-    TaskArtifactUpdateEvent,
     TaskIdParams,
     TaskSendParams,
     TaskState,
@@ -99,7 +98,12 @@ class AgentTaskManager(InMemoryTaskManager):
                 ),
             )
 
-            agent_outcome = await self.agent.invoke(query, task_send_params.sessionId)
+            async with self.run_in_session(
+                task_send_params.sessionId, task_send_params.id
+            ):
+                agent_outcome = await self.agent.invoke(
+                    query, task_send_params.sessionId
+                )
 
             final_task_status, final_artifacts = self._parse_agent_outcome(
                 agent_outcome
@@ -114,10 +118,7 @@ class AgentTaskManager(InMemoryTaskManager):
 
             # Enqueue artifact events first (if any)
             for artifact in final_artifacts:
-                await self.enqueue_events_for_sse(
-                    task_send_params.id,
-                    TaskArtifactUpdateEvent(id=task_send_params.id, artifact=artifact),
-                )
+                await self.enqueue_artifact_for_sse(task_send_params.id, artifact)
 
             # Enqueue the final status update event (marking stream end)
             await self.enqueue_events_for_sse(
@@ -213,7 +214,12 @@ class AgentTaskManager(InMemoryTaskManager):
         task_send_params: TaskSendParams = request.params
         query = self._get_user_query(task_send_params)
         try:
-            agent_response = await self.agent.invoke(query, task_send_params.sessionId)
+            async with self.run_in_session(
+                task_send_params.sessionId, task_send_params.id
+            ):
+                agent_response = await self.agent.invoke(
+                    query, task_send_params.sessionId
+                )
         except Exception as e:
             logger.error(f"Error invoking agent: {e}")
             raise ValueError(f"Error invoking agent: {e}")
@@ -13,7 +13,6 @@ from common.types import (
     SendTaskResponse,
     SendTaskStreamingRequest,
     SendTaskStreamingResponse,
-    TaskArtifactUpdateEvent,
     TaskState,
     TaskStatus,
     TaskStatusUpdateEvent,
@@ -129,12 +128,7 @@ class TaskManager(InMemoryTaskManager):
                     )
 
                 if artifact:
-                    task_artifact_update_event = TaskArtifactUpdateEvent(
-                        id=request.params.id, artifact=artifact
-                    )
-                    await self.enqueue_events_for_sse(
-                        request.params.id, task_artifact_update_event
-                    )
+                    await self.enqueue_artifact_for_sse(request.params.id, artifact)
 
                 # Persist + notify
                 updated_task = await self.update_store(request.params.id, new_status, [artifact] if artifact else None)
@@ -1,4 +1,20 @@
 from .client import A2AClient
+from .bulk import BulkTaskResult, RateLimiter
 from .card_resolver import A2ACardResolver
+from .circuit_breaker import CircuitBreaker, CircuitState
+from .load_balancer import BalancingStrategy, LoadBalancer
+from .retry import IDEMPOTENCY_KEY, RetryBudget, RetryPolicy
 
-__all__ = ["A2AClient", "A2ACardResolver"]
+__all__ = [
+    "A2AClient",
+    "A2ACardResolver",
+    "BalancingStrategy",
+    "BulkTaskResult",
+    "CircuitBreaker",
+    "CircuitState",
+    "RateLimiter",
+    "IDEMPOTENCY_KEY",
+    "LoadBalancer",
+    "RetryBudget",
+    "RetryPolicy",
+]
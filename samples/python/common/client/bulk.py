@@ -0,0 +1,66 @@
+"""Helpers for sending batches of tasks."""
+
+import asyncio
+import time
+
+from common.types import SendTaskResponse, TaskSendParams
+
+
+class RateLimiter:
+    """Token bucket that spaces out calls to acquire to at most rate per second.
+
+    Up to burst calls pass at once after a pause, further ones wait for their token.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        # Reserve a token, a negative balance is the queue of callers waiting for one.
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class BulkTaskResult:
+    """The outcome of one task of a batch.
+
+    Attributes:
+        index: Position of the task in the batch.
+        params: The params the task was sent with.
+        response: The agent's response, None if sending failed.
+        error: The exception raised while sending, None on success.
+        wait_time: Seconds between taking the task from the batch and sending it, spent
+            waiting for the rate limit.
+        elapsed: Seconds the request took.
+    """
+
+    __slots__ = ("index", "params", "response", "error", "wait_time", "elapsed")
+
+    def __init__(
+        self,
+        index: int,
+        params: TaskSendParams | dict,
+        response: SendTaskResponse | None,
+        error: Exception | None,
+        wait_time: float,
+        elapsed: float,
+    ):
+        self.index = index
+        self.params = params
+        self.response = response
+        self.error = error
+        self.wait_time = wait_time
+        self.elapsed = elapsed
+
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error else "ok"
+        return f"BulkTaskResult(index={self.index}, {outcome}, elapsed={self.elapsed:.3f})"
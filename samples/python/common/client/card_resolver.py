@@ -1,21 +1,168 @@
 import httpx
 from common.types import (
     AgentCard,
+    A2AClientHTTPError,
     A2AClientJSONError,
 )
-import json
+from pydantic import ValidationError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+import asyncio
+import threading
+import time
+
+
+class _CachedCard:
+    __slots__ = ("card", "etag", "expires_at")
+
+    def __init__(self, card: AgentCard, etag: str | None, expires_at: float):
+        self.card = card
+        self.etag = etag
+        self.expires_at = expires_at
 
 
 class A2ACardResolver:
-    def __init__(self, base_url, agent_card_path="/.well-known/agent.json"):
+    """Fetches agent cards, caching them for all resolvers in the process.
+
+    A cached card is used until ttl seconds after it was fetched. It is then revalidated with
+    its ETag, so an unchanged card is not downloaded again.
+
+    Args:
+        base_url: The url the agent is served from.
+        agent_card_path: The path of the card below base_url.
+        ttl: Seconds a fetched card is used without asking the agent again, 0 to always ask.
+        timeout: Seconds to wait for the agent.
+        httpx_client: An existing client whose connection pool is used by aget_agent_card.
+    """
+
+    # url -> cached card, shared by all resolvers.
+    _cache: dict[str, _CachedCard] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(
+        self,
+        base_url,
+        agent_card_path="/.well-known/agent.json",
+        ttl: float = 300,
+        timeout: float = 10,
+        httpx_client: httpx.AsyncClient | None = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.agent_card_path = agent_card_path.lstrip("/")
+        self.ttl = ttl
+        self.timeout = timeout
+        self.httpx_client = httpx_client
+
+    @property
+    def url(self) -> str:
+        return self.base_url + "/" + self.agent_card_path
 
     def get_agent_card(self) -> AgentCard:
-        with httpx.Client() as client:
-            response = client.get(self.base_url + "/" + self.agent_card_path)
-            response.raise_for_status()
+        cached = self._cached()
+        if cached and cached.expires_at > time.monotonic():
+            return cached.card.model_copy(deep=True)
+        try:
+            response = httpx.get(
+                self.url, headers=self._revalidation_headers(cached), timeout=self.timeout
+            )
+        except httpx.RequestError as e:
+            raise A2AClientHTTPError(400, str(e)) from e
+        return self._update_cache(response, cached)
+
+    async def aget_agent_card(self) -> AgentCard:
+        """Fetches the card without blocking the event loop."""
+        cached = self._cached()
+        if cached and cached.expires_at > time.monotonic():
+            return cached.card.model_copy(deep=True)
+        headers = self._revalidation_headers(cached)
+        try:
+            if self.httpx_client is not None:
+                response = await self.httpx_client.get(
+                    self.url, headers=headers, timeout=self.timeout
+                )
+            else:
+                async with httpx.AsyncClient() as client:
+                    response = await client.get(self.url, headers=headers, timeout=self.timeout)
+        except httpx.RequestError as e:
+            raise A2AClientHTTPError(400, str(e)) from e
+        return self._update_cache(response, cached)
+
+    @classmethod
+    async def resolve_many(
+        cls,
+        base_urls: Iterable[str],
+        timeout: float = 10,
+        ttl: float = 300,
+        return_exceptions: bool = False,
+    ) -> list[AgentCard | Exception]:
+        """Fetches the cards of several agents concurrently over one connection pool.
+
+        Args:
+            base_urls: The urls the agents are served from.
+            timeout: Seconds to wait for each agent.
+            ttl: See A2ACardResolver.
+            return_exceptions: Return the error in place of the card of an agent that could
+                not be resolved, instead of raising it.
+
+        Returns:
+            The cards in the order of base_urls.
+        """
+        async with httpx.AsyncClient() as client:
+            resolvers = [
+                cls(base_url, ttl=ttl, timeout=timeout, httpx_client=client)
+                for base_url in base_urls
+            ]
+            return await asyncio.gather(
+                *(resolver.aget_agent_card() for resolver in resolvers),
+                return_exceptions=return_exceptions,
+            )
+
+    @classmethod
+    def get_agent_cards(cls, base_urls: Iterable[str], **kwargs) -> list[AgentCard | Exception]:
+        """Blocking version of resolve_many, for synchronous callers.
+
+        Also works when called from a running event loop, the cards are then resolved on a
+        separate thread.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(cls.resolve_many(base_urls, **kwargs))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, cls.resolve_many(base_urls, **kwargs)).result()
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    def _cached(self) -> _CachedCard | None:
+        if self.ttl <= 0:
+            return None
+        with self._cache_lock:
+            return self._cache.get(self.url)
+
+    @staticmethod
+    def _revalidation_headers(cached: _CachedCard | None) -> dict[str, str]:
+        if cached and cached.etag:
+            return {"If-None-Match": cached.etag}
+        return {}
+
+    def _update_cache(self, response: httpx.Response, cached: _CachedCard | None) -> AgentCard:
+        if response.status_code == 304 and cached:
+            card, etag = cached.card, cached.etag
+        else:
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
             try:
-                return AgentCard(**response.json())
-            except json.JSONDecodeError as e:
+                card = AgentCard.model_validate_json(response.content)
+            except ValidationError as e:
                 raise A2AClientJSONError(str(e)) from e
+            etag = response.headers.get("ETag")
+        if self.ttl > 0:
+            with self._cache_lock:
+                self._cache[self.url] = _CachedCard(card, etag, time.monotonic() + self.ttl)
+        # Callers may change their card, the cached one stays as the agent sent it.
+        return card.model_copy(deep=True)
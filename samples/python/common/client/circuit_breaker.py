@@ -0,0 +1,212 @@
+"""Circuit breaker that stops calls to an agent while it is failing."""
+
+from collections import deque
+from enum import Enum
+from typing import Awaitable, Callable, TypeVar
+import asyncio
+import threading
+import time
+
+import httpx
+
+from common.types import (
+    A2AClientCircuitOpenError,
+    A2AClientHTTPError,
+    A2AClientJSONError,
+)
+
+T = TypeVar("T")
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+def is_agent_failure(error: BaseException) -> bool:
+    """Whether an error means the agent is unhealthy, rather than that the request was bad."""
+    if isinstance(error, (A2AClientHTTPError, httpx.HTTPStatusError)):
+        status_code = (
+            error.status_code
+            if isinstance(error, A2AClientHTTPError)
+            else error.response.status_code
+        )
+        return status_code >= 500 or status_code == 429
+    return isinstance(error, (httpx.TransportError, A2AClientJSONError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """Tracks the health of one agent and fails calls fast while it is unhealthy.
+
+    The breaker is closed while the agent works. It opens when, among the last window_size
+    calls, the share of failures reaches failure_rate_threshold or the share of calls slower
+    than slow_call_duration reaches slow_call_rate_threshold. While open, calls raise
+    A2AClientCircuitOpenError without contacting the agent. After open_duration seconds the
+    breaker is half-open and lets half_open_max_calls calls through: if they all succeed it
+    closes again, if one fails it opens again.
+
+    The breaker is thread-safe, hosts that run turns on several threads can share it.
+
+    Args:
+        url: The url of the agent, reported in errors.
+        failure_rate_threshold: Share of failed calls that opens the breaker.
+        slow_call_duration: Seconds after which a successful call counts as slow, None to
+            ignore latency.
+        slow_call_rate_threshold: Share of slow calls that opens the breaker.
+        window_size: Number of recent calls the rates are computed from.
+        min_calls: Calls needed in the window before the breaker can open.
+        open_duration: Seconds the breaker stays open before letting a probe through.
+        half_open_max_calls: Calls let through while half-open.
+    """
+
+    def __init__(
+        self,
+        url: str = "",
+        failure_rate_threshold: float = 0.5,
+        slow_call_duration: float | None = None,
+        slow_call_rate_threshold: float = 1.0,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_duration: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.url = url
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        # (failed, slow) of the most recent calls.
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._half_open_successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    @property
+    def available(self) -> bool:
+        """Whether a call would currently be let through."""
+        with self._lock:
+            self._update_state()
+            if self._state == CircuitState.HALF_OPEN:
+                return self._half_open_calls < self.half_open_max_calls
+            return self._state == CircuitState.CLOSED
+
+    def failure_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return sum(failed for failed, _ in self._outcomes) / len(self._outcomes)
+
+    def slow_call_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return sum(slow for _, slow in self._outcomes) / len(self._outcomes)
+
+    def acquire(self):
+        """Admits a call, to be followed by record_success, record_failure or release.
+
+        Raises:
+            A2AClientCircuitOpenError: If the breaker is open.
+        """
+        with self._lock:
+            self._update_state()
+            if self._state == CircuitState.OPEN:
+                raise A2AClientCircuitOpenError(
+                    self.url, self._opened_at + self.open_duration - time.monotonic()
+                )
+            if self._state == CircuitState.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    raise A2AClientCircuitOpenError(self.url, 0.0)
+                self._half_open_calls += 1
+
+    def record_success(self, duration: float):
+        slow = self.slow_call_duration is not None and duration > self.slow_call_duration
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                if slow:
+                    self._open()
+                    return
+                self._half_open_successes += 1
+                if self._half_open_successes >= self.half_open_max_calls:
+                    self._close()
+                return
+            self._record(False, slow)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._open()
+                return
+            self._record(True, False)
+
+    def release(self):
+        """Ends an admitted call without an outcome, e.g. when it was cancelled."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._half_open_calls:
+                self._half_open_calls -= 1
+
+    def record_error(self, error: BaseException, duration: float):
+        """Records a call that raised error, only errors caused by the agent are failures."""
+        if is_agent_failure(error):
+            self.record_failure()
+        elif isinstance(error, Exception):
+            # The agent answered, the request itself was rejected.
+            self.record_success(duration)
+        else:
+            self.release()
+
+    async def call(self, send: Callable[[], Awaitable[T]], timed: bool = True) -> T:
+        """Runs send through the breaker, recording its outcome.
+
+        Calls that are slow on purpose, such as long polls, pass timed=False so they never
+        count as slow calls.
+        """
+        self.acquire()
+        start = time.monotonic()
+        try:
+            result = await send()
+        except BaseException as e:
+            self.record_error(e, time.monotonic() - start if timed else 0.0)
+            raise
+        self.record_success(time.monotonic() - start if timed else 0.0)
+        return result
+
+    def _record(self, failed: bool, slow: bool):
+        self._outcomes.append((failed, slow))
+        if self._state != CircuitState.CLOSED or len(self._outcomes) < self.min_calls:
+            return
+        calls = len(self._outcomes)
+        failure_rate = sum(f for f, _ in self._outcomes) / calls
+        slow_rate = sum(s for _, s in self._outcomes) / calls
+        if failure_rate >= self.failure_rate_threshold or (
+            self.slow_call_duration is not None and slow_rate >= self.slow_call_rate_threshold
+        ):
+            self._open()
+
+    def _update_state(self):
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.open_duration
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+            self._half_open_successes = 0
+
+    def _open(self):
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+
+    def _close(self):
+        self._state = CircuitState.CLOSED
+        self._outcomes.clear()
@@ -1,8 +1,11 @@
 import httpx
-from httpx_sse import connect_sse
-from typing import Any, AsyncIterable
+from httpx_sse import aconnect_sse
+from typing import Any, AsyncIterable, Callable, Iterable, TypeVar
+from pydantic import BaseModel, ValidationError
+from urllib.parse import urljoin, urlsplit
 from common.types import (
     AgentCard,
+    FileContent,
     GetTaskRequest,
     SendTaskRequest,
     SendTaskResponse,
@@ -18,69 +21,748 @@ from common.types import (
     A2AClientJSONError,
     SendTaskStreamingRequest,
     SendTaskStreamingResponse,
+    ListTasksRequest,
+    ListTasksResponse,
+    TaskArtifactUpdateEvent,
+    TaskDelta,
+    TaskResubscriptionRequest,
+    TaskSendParams,
+    TaskStatusUpdateEvent,
+    FINAL_TASK_STATES,
+    MethodNotFoundError,
+    UnsupportedOperationError,
+)
+from common.utils.artifact_chunks import ArtifactAssembler
+from common.client.bulk import BulkTaskResult, RateLimiter
+from common.client.circuit_breaker import CircuitBreaker
+from common.client.load_balancer import LoadBalancer
+from common.client.retry import RetryPolicy, is_idempotent
+from contextlib import AsyncExitStack, aclosing
+import asyncio
+import mimetypes
+import time
+import weakref
+import os
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+
+DEFAULT_MAX_RECONNECTS = 3
+MAX_RECONNECT_BACKOFF = 30.0
+# Seconds a tasks/get long-poll asks the agent to hold the request while the task is unchanged.
+DEFAULT_WAIT_TIMEOUT = 30.0
+# Seconds a resumed stream may stay silent before the task is polled instead.
+DEFAULT_RESUME_IDLE_TIMEOUT = 30.0
+# Answers to tasks/resubscribe from agents that can only be polled.
+RESUBSCRIBE_UNSUPPORTED_ERROR_CODES = {UnsupportedOperationError().code, MethodNotFoundError().code}
+
+
+# Keep idle connections to an agent open across calls so they skip TCP and TLS setup.
+DEFAULT_CONNECTION_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30
 )
-import json
 
 
 class A2AClient:
-    def __init__(self, agent_card: AgentCard = None, url: str = None):
+    """Client for one A2A agent.
+
+    Calls share a pool of keep-alive connections that lives until aclose() is called,
+    or until the end of an `async with A2AClient(...)` block. Pass httpx_client to share
+    one pool between several clients, it is then left to the caller to close.
+
+    Connections cannot move between event loops, so a client that is used from several
+    loops, such as one asyncio.run per thread, keeps a separate pool for each loop. A loop's
+    pool is closed when the loop cancels its remaining tasks, as asyncio.run does at its end.
+
+    Args:
+        agent_card: The card of the agent, its url is used.
+        url: The url of the agent, if no agent_card is given.
+        httpx_client: An existing client whose connection pool is used.
+        limits: Connection pool size and keep-alive expiry.
+        http2: Multiplex requests over one HTTP/2 connection. Requires the h2 package
+            (pip install httpx[http2]).
+        retry_policy: Retries idempotent requests, see common.client.retry. No retries if None.
+        replica_urls: Other urls serving the same agent, which the retry policy may hedge to.
+        circuit_breaker: Fails calls fast while the agent is unhealthy, see
+            common.client.circuit_breaker.
+        load_balancer: Spreads requests over several replicas of the agent, see
+            common.client.load_balancer. Requests about a task go to the replica that owns
+            it, so they are only hedged to replica_urls if they are not about a task.
+    """
+
+    def __init__(
+        self,
+        agent_card: AgentCard = None,
+        url: str = None,
+        httpx_client: httpx.AsyncClient | None = None,
+        limits: httpx.Limits = DEFAULT_CONNECTION_LIMITS,
+        http2: bool = False,
+        retry_policy: RetryPolicy | None = None,
+        replica_urls: list[str] | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        load_balancer: LoadBalancer | None = None,
+    ):
         if agent_card:
             self.url = agent_card.url
         elif url:
             self.url = url
+        elif load_balancer:
+            self.url = load_balancer.urls[0]
         else:
-            raise ValueError("Must provide either agent_card or url")
+            raise ValueError("Must provide either agent_card, url or load_balancer")
+        self.limits = limits
+        self.http2 = http2
+        self._httpx_client = httpx_client
+        # Pools created by this client and the tasks that close them when their event loop
+        # ends, by the event loop they belong to.
+        self._httpx_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, tuple[httpx.AsyncClient, asyncio.Task]
+        ] = weakref.WeakKeyDictionary()
+        self.retry_policy = retry_policy
+        self.replica_urls = replica_urls or []
+        self.circuit_breaker = circuit_breaker
+        self.load_balancer = load_balancer
+        # Rate limiters of send_tasks by host, so concurrent batches share one limit.
+        self._rate_limiters: dict[str, RateLimiter] = {}
+        if circuit_breaker is not None and not circuit_breaker.url:
+            circuit_breaker.url = self.url
+
+    @property
+    def httpx_client(self) -> httpx.AsyncClient:
+        """The pooled client of the running event loop, created on first use."""
+        if self._httpx_client is not None:
+            return self._httpx_client
+        loop = asyncio.get_running_loop()
+        pool = self._httpx_clients.get(loop)
+        if pool is None:
+            client = httpx.AsyncClient(limits=self.limits, http2=self.http2)
+            closer = loop.create_task(
+                self._close_at_loop_end(self._httpx_clients, loop, client)
+            )
+            pool = self._httpx_clients[loop] = (client, closer)
+        return pool[0]
+
+    @staticmethod
+    async def _close_at_loop_end(
+        pools: weakref.WeakKeyDictionary,
+        loop: asyncio.AbstractEventLoop,
+        client: httpx.AsyncClient,
+    ):
+        """Waits to be cancelled, as the tasks left when an event loop ends are, then closes
+        the loop's pool.
+
+        It holds no reference to the A2AClient, so it does not keep the client alive.
+        """
+        try:
+            await asyncio.Event().wait()
+        finally:
+            if pools.get(loop, (None,))[0] is client:
+                del pools[loop]
+            await client.aclose()
+
+    async def aclose(self):
+        """Closes the pooled connections of the running event loop.
+
+        A pool passed in by the caller is left open.
+        """
+        pool = self._httpx_clients.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            client, closer = pool
+            closer.cancel()
+            await client.aclose()
+
+    async def __aenter__(self) -> "A2AClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
 
     async def send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
         request = SendTaskRequest(params=payload)
-        return SendTaskResponse(**await self._send_request(request))
+        return await self._send_request(request, SendTaskResponse)
+
+    def _rate_limiter(self, rate: float) -> RateLimiter:
+        """The rate limiter of the agent's host, created on first use and set to rate."""
+        host = urlsplit(self.url).netloc
+        limiter = self._rate_limiters.get(host)
+        if limiter is None:
+            limiter = self._rate_limiters[host] = RateLimiter(rate)
+        else:
+            limiter.rate = rate
+        return limiter
+
+    async def send_tasks(
+        self,
+        tasks: Iterable[TaskSendParams | dict[str, Any]]
+        | AsyncIterable[TaskSendParams | dict[str, Any]],
+        concurrency: int = 16,
+        rate_limit: float | None = None,
+        ordered: bool = False,
+    ) -> AsyncIterable[BulkTaskResult]:
+        """Sends a batch of tasks and yields their results as they complete.
+
+        Tasks are taken from the batch only when one of the concurrency slots is free, so
+        tasks can be generated lazily. Failed sends are yielded with their error instead of
+        ending the batch. Closing the iteration cancels the requests still running.
+
+        Args:
+            tasks: The params of the tasks to send.
+            concurrency: Maximum number of requests running at once.
+            rate_limit: Maximum number of requests started per second to the agent's host. The
+                limit is shared with the other batches this client sends to the host.
+            ordered: Yield results in batch order. Results that complete before an earlier
+                one are buffered until it completes.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        limiter = self._rate_limiter(rate_limit) if rate_limit else None
+
+        async def send(index: int, params: TaskSendParams | dict[str, Any]) -> BulkTaskResult:
+            taken = time.monotonic()
+            if limiter:
+                await limiter.acquire()
+            start = time.monotonic()
+            response, error = None, None
+            try:
+                response = await self.send_task(params)
+            except Exception as e:
+                error = e
+            return BulkTaskResult(
+                index, params, response, error, start - taken, time.monotonic() - start
+            )
+
+        async def iterate() -> AsyncIterable[TaskSendParams | dict[str, Any]]:
+            if isinstance(tasks, AsyncIterable):
+                async for params in tasks:
+                    yield params
+            else:
+                for params in tasks:
+                    yield params
+
+        pending_tasks = iterate()
+        running = set()
+        completed: dict[int, BulkTaskResult] = {}
+        submitted = 0
+        next_index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(running) < concurrency:
+                    try:
+                        params = await anext(pending_tasks)
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    running.add(asyncio.ensure_future(send(submitted, params)))
+                    submitted += 1
+                if not running:
+                    return
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for result in sorted((task.result() for task in done), key=lambda r: r.index):
+                    if ordered:
+                        completed[result.index] = result
+                    else:
+                        yield result
+                while next_index in completed:
+                    yield completed.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in running:
+                task.cancel()
+            await pending_tasks.aclose()
 
     async def send_task_streaming(
-        self, payload: dict[str, Any]
+        self,
+        payload: dict[str, Any],
+        reassemble_artifacts: bool = False,
+        max_reconnects: int = DEFAULT_MAX_RECONNECTS,
+        reconnect_backoff: float = 0.5,
+        resume_idle_timeout: float = DEFAULT_RESUME_IDLE_TIMEOUT,
     ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Streams task updates.
+
+        Events are parsed as they arrive over a pooled connection without blocking the event
+        loop, so many streams can be consumed concurrently. Closing or cancelling the
+        iteration closes the stream.
+
+        If the connection drops after the agent accepted the task, the stream is resumed with
+        tasks/resubscribe, or by polling tasks/get if the agent does not support it. Agents
+        only stream the events that follow a resubscription, so once it is open one tasks/get
+        yields what was missed while the connection was down. A resumed stream that stays
+        silent for resume_idle_timeout seconds is replaced by polling, in case it missed the
+        end of the task. What was already yielded is skipped: the status that was last
+        yielded, and from tasks/get, the artifacts up to the position in the task's artifacts
+        the stream had reached. tasks/get yields artifacts whole, so the chunks of an artifact
+        that was cut off may be followed by the complete artifact, and events the agent sends
+        while tasks/get is answered may be yielded twice.
+
+        Args:
+            payload: The task send params.
+            reassemble_artifacts: Buffer chunked artifacts and yield them once complete.
+            max_reconnects: How many times a single stream may reconnect, 0 to disable.
+            reconnect_backoff: Delay before the first reconnect in seconds, doubled for every
+                following one.
+            resume_idle_timeout: Seconds a resumed stream may stay silent before the task is
+                polled instead.
+        """
         request = SendTaskStreamingRequest(params=payload)
-        with httpx.Client(timeout=None) as client:
-            with connect_sse(
-                client, "POST", self.url, json=request.model_dump()
-            ) as event_source:
+        task_id = request.params.id
+        artifact_assembler = ArtifactAssembler() if reassemble_artifacts else None
+        # How far the stream got, to skip what a resumed stream repeats: the number of complete
+        # artifacts yielded, which is their position in the task's artifacts, and the last status.
+        artifacts_delivered = 0
+        last_status = None
+        # The status a resumed stream may repeat, until it yields a different one.
+        replayed_status = None
+        accepted = False
+        polling = False
+        reconnects = 0
+
+        async def resume() -> AsyncIterable[SendTaskStreamingResponse]:
+            nonlocal reconnects, replayed_status
+            reconnects += 1
+            replayed_status = last_status
+            await asyncio.sleep(
+                min(reconnect_backoff * 2 ** (reconnects - 1), MAX_RECONNECT_BACKOFF)
+            )
+            if polling:
+                return self._poll_task_events(task_id, reconnect_backoff, artifacts_delivered)
+            return self._stream_events(
+                TaskResubscriptionRequest(params={"id": task_id}),
+                read_timeout=resume_idle_timeout,
+                first_events=lambda: self._missed_task_events(task_id, artifacts_delivered),
+            )
+
+        source = self._stream_events(request)
+        try:
+            while True:
                 try:
-                    for sse in event_source.iter_sse():
-                        yield SendTaskStreamingResponse(**json.loads(sse.data))
-                except json.JSONDecodeError as e:
-                    raise A2AClientJSONError(str(e)) from e
-                except httpx.RequestError as e:
-                    raise A2AClientHTTPError(400, str(e)) from e
-
-    async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
+                    async for response in source:
+                        accepted = True
+                        if response.error:
+                            if (
+                                reconnects
+                                and not polling
+                                and response.error.code in RESUBSCRIBE_UNSUPPORTED_ERROR_CODES
+                            ):
+                                polling = True
+                                source = self._poll_task_events(
+                                    task_id, reconnect_backoff, artifacts_delivered
+                                )
+                                break
+                            yield response
+                            return
+                        event = response.result
+                        if artifact_assembler and isinstance(event, TaskArtifactUpdateEvent):
+                            artifact = artifact_assembler.add(event)
+                            if artifact is None:
+                                continue
+                            event.artifact = artifact
+                        if isinstance(event, TaskStatusUpdateEvent):
+                            if event.status == replayed_status:
+                                continue
+                            replayed_status = None
+                            last_status = event.status
+                        elif event.artifact.lastChunk is not False:
+                            artifacts_delivered += 1
+                        yield response
+                        if isinstance(event, TaskStatusUpdateEvent) and event.final:
+                            return
+                    else:
+                        # The agent closed the stream before the final event.
+                        if not accepted or reconnects >= max_reconnects:
+                            return
+                        source = await resume()
+                except httpx.TransportError as e:
+                    if isinstance(e, httpx.ReadTimeout) and reconnects and not polling:
+                        # The resumed stream went silent, it may have missed the end of the task.
+                        polling = True
+                        replayed_status = last_status
+                        source = self._poll_task_events(
+                            task_id, reconnect_backoff, artifacts_delivered
+                        )
+                        continue
+                    if not accepted or reconnects >= max_reconnects:
+                        raise
+                    source = await resume()
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except httpx.RequestError as e:
+            raise A2AClientHTTPError(400, str(e)) from e
+        finally:
+            await source.aclose()
+
+    async def resubscribe(
+        self, payload: dict[str, Any]
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Streams the updates of a task that is already running."""
+        request = TaskResubscriptionRequest(params=payload)
+        try:
+            async with aclosing(self._stream_events(request)) as source:
+                async for response in source:
+                    yield response
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except httpx.RequestError as e:
+            raise A2AClientHTTPError(400, str(e)) from e
+
+    async def _stream_events(
+        self,
+        request: JSONRPCRequest,
+        read_timeout: float | None = None,
+        first_events: Callable[[], AsyncIterable[SendTaskStreamingResponse]] | None = None,
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Yields the events of a stream, after those of first_events once it is open.
+
+        read_timeout bounds how long the agent may stay silent between events, exceeding it
+        raises httpx.ReadTimeout. By default agents may stay silent for as long as they like.
+        """
+        # Only connecting counts towards the circuit breaker, streams may legitimately be long.
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.acquire()
+        url = self._select_url(request)
+        start = time.monotonic()
+        async with AsyncExitStack() as stack:
+            if self.load_balancer is not None:
+                # The open stream counts as a request in flight to its replica.
+                self.load_balancer.acquire(url)
+                stack.callback(self.load_balancer.release, url)
             try:
-                # Image generation could take time, adding timeout
-                response = await client.post(
-                    self.url, json=request.model_dump(), timeout=30
+                event_source = await stack.enter_async_context(
+                    aconnect_sse(
+                        self.httpx_client,
+                        "POST",
+                        url,
+                        content=request.model_dump_json(),
+                        headers={"Content-Type": "application/json"},
+                        # Agents may stay silent for a long time between updates.
+                        timeout=httpx.Timeout(30, read=None),
+                    )
                 )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
-            except json.JSONDecodeError as e:
+                event_source.response.raise_for_status()
+            except BaseException as e:
+                if breaker is not None:
+                    breaker.record_error(e, time.monotonic() - start)
+                raise
+            if breaker is not None:
+                breaker.record_success(time.monotonic() - start)
+            if self.load_balancer is not None:
+                self.load_balancer.observe(url, time.monotonic() - start)
+            response = event_source.response
+            if "text/event-stream" not in response.headers.get("content-type", ""):
+                # Errors are answered with a single JSON-RPC response instead of a stream.
+                yield self._parse_response(await response.aread(), SendTaskStreamingResponse)
+                return
+            if first_events is not None:
+                async with aclosing(first_events()) as events:
+                    async for event in events:
+                        yield event
+            events = await stack.enter_async_context(aclosing(event_source.aiter_sse()))
+            while True:
+                try:
+                    # Keep-alive comments do not count as events.
+                    async with asyncio.timeout(read_timeout):
+                        sse = await anext(events)
+                except StopAsyncIteration:
+                    return
+                except TimeoutError as e:
+                    raise httpx.ReadTimeout("No event from the agent in time") from e
+                yield self._parse_response(sse.data, SendTaskStreamingResponse)
+
+    async def _poll_task_events(
+        self, task_id: str, interval: float, artifacts_seen: int = 0
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Follows a task by polling tasks/get, for agents that cannot resubscribe.
+
+        Every status change yields the task's artifacts after the first artifacts_seen ones,
+        that were not yielded before, and its status.
+        """
+        last_status = None
+        async with aclosing(self._watch_task({"id": task_id}, interval)) as responses:
+            async for response in responses:
+                if not response.error and response.result.status == last_status:
+                    continue
+                events = self._task_events(response, artifacts_seen)
+                for event in events:
+                    yield event
+                if response.error or response.result.status.state in FINAL_TASK_STATES:
+                    return
+                last_status = response.result.status
+                # Every event but the status is an artifact.
+                artifacts_seen += len(events) - 1
+
+    async def _missed_task_events(
+        self, task_id: str, artifacts_seen: int
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Yields the artifacts of a task after the first artifacts_seen ones and its status,
+        from one tasks/get."""
+        for event in self._task_events(await self.get_task({"id": task_id}), artifacts_seen):
+            yield event
+
+    @staticmethod
+    def _task_events(
+        response: GetTaskResponse, artifacts_seen: int
+    ) -> list[SendTaskStreamingResponse]:
+        """The stream events for a tasks/get response: the task's artifacts after the first
+        artifacts_seen ones and its status, or the error."""
+        if response.error:
+            return [SendTaskStreamingResponse(id=response.id, error=response.error)]
+        task = response.result
+        events = [
+            SendTaskStreamingResponse(
+                id=response.id, result=TaskArtifactUpdateEvent(id=task.id, artifact=artifact)
+            )
+            for artifact in (task.artifacts or [])[artifacts_seen:]
+        ]
+        final = task.status.state in FINAL_TASK_STATES
+        events.append(
+            SendTaskStreamingResponse(
+                id=response.id,
+                result=TaskStatusUpdateEvent(id=task.id, status=task.status, final=final),
+            )
+        )
+        return events
+
+    async def _watch_task(
+        self,
+        payload: dict[str, Any],
+        interval: float,
+        wait_timeout: float = DEFAULT_WAIT_TIMEOUT,
+    ) -> AsyncIterable[GetTaskResponse]:
+        """Yields tasks/get responses for a task until one is an error.
+
+        After the first request, each request long-polls the agent for up to wait_timeout
+        seconds, so the next response arrives as soon as the task changes. Agents that do
+        not support long-polling answer right away, they are polled instead with an interval
+        that doubles, up to MAX_RECONNECT_BACKOFF, while the task does not change.
+
+        Agents that version tasks only send the changes since the last response, which are
+        applied to it so every response holds the whole task.
+        """
+        # The first response must hold the whole task for later changes to apply to.
+        payload = {key: value for key, value in payload.items() if key != "ifVersionNewerThan"}
+        params = payload
+        task = None
+        delay = interval
+        while True:
+            start = time.monotonic()
+            response = await self.get_task(params)
+            if isinstance(response.result, TaskDelta):
+                response = response.model_copy(
+                    update={
+                        "result": task.apply_delta(
+                            response.result, payload.get("historyLength")
+                        )
+                    }
+                )
+            yield response
+            if response.error:
+                return
+            if task is None:
+                changed = True
+            elif response.result.version is not None:
+                changed = response.result.version != task.version
+            else:
+                changed = response.result.status != task.status
+            task = response.result
+            params = dict(payload)
+            if wait_timeout:
+                params["waitTimeout"] = wait_timeout
+            if task.version is not None:
+                # Only fetch what changed, and wait for changes after this version.
+                params["ifVersionNewerThan"] = task.version
+            if changed:
+                delay = interval
+                if wait_timeout:
+                    continue
+            elif wait_timeout and time.monotonic() - start >= wait_timeout / 2:
+                # The agent held the request until its timeout, ask again right away.
+                continue
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_BACKOFF)
+
+    async def _send_request(
+        self, request: JSONRPCRequest, response_type: type[ResponseT]
+    ) -> ResponseT:
+        url = self._select_url(request)
+        if self.retry_policy is None or not is_idempotent(request):
+            return await self._call(url, request, response_type)
+        # An idempotency key only deduplicates within one server process, a send hedged to
+        # a replica would run twice, so sends are only ever retried against the same url.
+        hedge = not self._wait_timeout(request) and not isinstance(request, SendTaskRequest)
+        return await self.retry_policy.call(
+            lambda url: self._call(url, request, response_type),
+            url,
+            self._hedge_urls(url, request) if hedge else (),
+            hedge=hedge,
+            method=request.method,
+        )
+
+    @staticmethod
+    def _wait_timeout(request: JSONRPCRequest) -> float:
+        """How long the agent may hold a long-polling request, 0 for other requests."""
+        return getattr(request.params, "waitTimeout", None) or 0.0
+
+    @staticmethod
+    def _task_id(request: JSONRPCRequest) -> str | None:
+        return getattr(request.params, "id", None)
+
+    def _select_url(self, request: JSONRPCRequest) -> str:
+        if self.load_balancer is None:
+            return self.url
+        return self.load_balancer.select(self._task_id(request))
+
+    def _hedge_urls(self, url: str, request: JSONRPCRequest) -> list[str]:
+        if self.load_balancer is None:
+            return self.replica_urls
+        if self._task_id(request) is not None:
+            # Only the owning replica knows the task.
+            return []
+        return [other for other in self.load_balancer.urls if other != url]
+
+    async def _call(
+        self, url: str, request: JSONRPCRequest, response_type: type[ResponseT]
+    ) -> ResponseT:
+        if self.load_balancer is not None:
+            self.load_balancer.acquire(url)
+        # A long poll's duration says nothing about the agent's speed.
+        timed = not self._wait_timeout(request)
+        start = time.monotonic()
+        latency = None
+        try:
+            if self.circuit_breaker is None:
+                response = await self._post(url, request, response_type)
+            else:
+                response = await self.circuit_breaker.call(
+                    lambda: self._post(url, request, response_type), timed=timed
+                )
+            if timed:
+                latency = time.monotonic() - start
+            return response
+        finally:
+            if self.load_balancer is not None:
+                self.load_balancer.release(url, latency)
+
+    async def _post(
+        self, url: str, request: JSONRPCRequest, response_type: type[ResponseT]
+    ) -> ResponseT:
+        try:
+            # Image generation could take time, adding timeout
+            response = await self.httpx_client.post(
+                url,
+                content=request.model_dump_json(),
+                headers={"Content-Type": "application/json"},
+                timeout=30 + self._wait_timeout(request),
+            )
+            response.raise_for_status()
+            return self._parse_response(response.content, response_type)
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+
+    @staticmethod
+    def _parse_response(data: str | bytes, response_type: type[ResponseT]) -> ResponseT:
+        """Parses and validates a JSON response in one pass, without an intermediate dict."""
+        try:
+            return response_type.model_validate_json(data)
+        except ValidationError as e:
+            if any(error["type"] == "json_invalid" for error in e.errors()):
                 raise A2AClientJSONError(str(e)) from e
+            raise
 
     async def get_task(self, payload: dict[str, Any]) -> GetTaskResponse:
         request = GetTaskRequest(params=payload)
-        return GetTaskResponse(**await self._send_request(request))
+        return await self._send_request(request, GetTaskResponse)
+
+    async def wait_for_task(
+        self,
+        payload: dict[str, Any],
+        timeout: float | None = None,
+        wait_timeout: float = DEFAULT_WAIT_TIMEOUT,
+        poll_interval: float = 0.5,
+    ) -> GetTaskResponse:
+        """Waits until a task is in a final state and returns the tasks/get response.
+
+        Agents that support it are long-polled, see TaskQueryParams.waitTimeout, so the
+        answer arrives as soon as the task finishes. Other agents are polled with an
+        adaptive backoff.
+
+        Args:
+            payload: The tasks/get params, e.g. {"id": task_id, "historyLength": 10}.
+            timeout: Seconds after which the latest response is returned even if the task is
+                still running, None to wait until it finishes. Raises TimeoutError if there
+                is no response by then.
+            wait_timeout: Seconds each long-poll may be held by the agent.
+            poll_interval: Initial polling interval for agents that do not long-poll.
+        """
+        response = None
+        try:
+            async with asyncio.timeout(timeout):
+                async with aclosing(
+                    self._watch_task(payload, poll_interval, wait_timeout)
+                ) as responses:
+                    async for response in responses:
+                        if response.error or response.result.status.state in FINAL_TASK_STATES:
+                            return response
+        except TimeoutError:
+            if response is None:
+                raise
+        return response
 
     async def cancel_task(self, payload: dict[str, Any]) -> CancelTaskResponse:
         request = CancelTaskRequest(params=payload)
-        return CancelTaskResponse(**await self._send_request(request))
+        return await self._send_request(request, CancelTaskResponse)
 
     async def set_task_callback(
         self, payload: dict[str, Any]
     ) -> SetTaskPushNotificationResponse:
         request = SetTaskPushNotificationRequest(params=payload)
-        return SetTaskPushNotificationResponse(**await self._send_request(request))
+        return await self._send_request(request, SetTaskPushNotificationResponse)
 
     async def get_task_callback(
         self, payload: dict[str, Any]
     ) -> GetTaskPushNotificationResponse:
         request = GetTaskPushNotificationRequest(params=payload)
-        return GetTaskPushNotificationResponse(**await self._send_request(request))
+        return await self._send_request(request, GetTaskPushNotificationResponse)
+
+    async def list_tasks(self, payload: dict[str, Any] | None = None) -> ListTasksResponse:
+        request = ListTasksRequest(params=payload or {})
+        return await self._send_request(request, ListTasksResponse)
+
+    async def upload_file(
+        self, path: str, mime_type: str | None = None, chunk_size: int = 64 * 1024
+    ) -> FileContent:
+        """Uploads a file to the agent's blob store and returns file content referencing it by uri.
+
+        The file is streamed from disk chunk_size bytes at a time and sent as raw bytes, it is
+        never read into memory at once nor base64 encoded. The agent is asked first whether it
+        accepts uploads, so an agent without a blob store fails fast with a 404 before the file
+        is sent.
+        """
+        mime_type = mime_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        upload_url = urljoin(self.url, "/blobs")
+
+        async def read_chunks() -> AsyncIterable[bytes]:
+            with open(path, "rb") as f:
+                while chunk := await asyncio.to_thread(f.read, chunk_size):
+                    yield chunk
+
+        try:
+            response = await self.httpx_client.head(upload_url, timeout=30)
+            # Agents that predate the check answer 405, they may still accept the upload.
+            if response.status_code != 405:
+                response.raise_for_status()
+            response = await self.httpx_client.post(
+                upload_url,
+                params={"name": os.path.basename(path)},
+                content=read_chunks(),
+                headers={
+                    "Content-Type": mime_type,
+                    "Content-Length": str(os.path.getsize(path)),
+                },
+                timeout=httpx.Timeout(30, write=None),
+            )
+            response.raise_for_status()
+            return self._parse_response(response.content, FileContent)
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
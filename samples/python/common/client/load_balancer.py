@@ -0,0 +1,119 @@
+"""Client-side load balancing across the replicas of one agent."""
+
+from collections import OrderedDict
+from enum import Enum
+from typing import Sequence
+import random
+import threading
+
+
+class BalancingStrategy(str, Enum):
+    # Of two random replicas, the one with fewer requests in flight.
+    POWER_OF_TWO_CHOICES = "p2c"
+    # The replica with the lowest latency average, weighted by its requests in flight.
+    EWMA = "ewma"
+
+
+class Replica:
+    __slots__ = ("url", "in_flight", "latency_ewma")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.in_flight = 0
+        # None until the first response, so new replicas are tried first.
+        self.latency_ewma: float | None = None
+
+    def load(self) -> float:
+        return (self.latency_ewma or 0.0) * (self.in_flight + 1)
+
+
+class LoadBalancer:
+    """Picks a replica of an agent for each request.
+
+    The replica that received the first request for a task also gets every later request for
+    it, since tasks, their streams and their history live on that replica. The affinity of
+    the least recently used tasks is forgotten once more than max_affinities are tracked.
+
+    Thread-safe, so one balancer can serve clients on several event loops.
+
+    Args:
+        urls: The urls of the replicas.
+        strategy: How to pick a replica for requests without affinity.
+        ewma_decay: Weight of the latest latency in the moving average.
+        max_affinities: Number of tasks whose replica is remembered.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        strategy: BalancingStrategy | str = BalancingStrategy.POWER_OF_TWO_CHOICES,
+        ewma_decay: float = 0.3,
+        max_affinities: int = 10000,
+    ):
+        if not urls:
+            raise ValueError("At least one replica url is required")
+        self.replicas = {url: Replica(url) for url in urls}
+        self.strategy = BalancingStrategy(strategy)
+        self.ewma_decay = ewma_decay
+        self.max_affinities = max_affinities
+        self._affinities: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def urls(self) -> list[str]:
+        return list(self.replicas)
+
+    def select(self, task_id: str | None = None) -> str:
+        """Returns the url to send a request to, the replica owning task_id if it has one."""
+        with self._lock:
+            if task_id is not None:
+                url = self._affinities.get(task_id)
+                if url is not None:
+                    self._affinities.move_to_end(task_id)
+                    return url
+            url = self._pick().url
+            if task_id is not None:
+                self._affinities[task_id] = url
+                if len(self._affinities) > self.max_affinities:
+                    self._affinities.popitem(last=False)
+            return url
+
+    def owner(self, task_id: str) -> str | None:
+        """The url of the replica that owns the task, if known."""
+        with self._lock:
+            return self._affinities.get(task_id)
+
+    def acquire(self, url: str):
+        """Counts a request to url as in flight until release is called."""
+        with self._lock:
+            self.replicas[url].in_flight += 1
+
+    def release(self, url: str, latency: float | None = None):
+        """Ends a request to url, with its latency if it was answered."""
+        with self._lock:
+            self.replicas[url].in_flight -= 1
+        if latency is not None:
+            self.observe(url, latency)
+
+    def observe(self, url: str, latency: float):
+        """Adds a response time of url to its moving average."""
+        with self._lock:
+            replica = self.replicas[url]
+            if replica.latency_ewma is None:
+                replica.latency_ewma = latency
+            else:
+                replica.latency_ewma = (
+                    self.ewma_decay * latency + (1 - self.ewma_decay) * replica.latency_ewma
+                )
+
+    def _pick(self) -> Replica:
+        replicas = list(self.replicas.values())
+        if len(replicas) == 1:
+            return replicas[0]
+        if self.strategy == BalancingStrategy.EWMA:
+            unmeasured = [replica for replica in replicas if replica.latency_ewma is None]
+            if unmeasured:
+                return random.choice(unmeasured)
+            return min(replicas, key=Replica.load)
+        first, second = random.sample(replicas, 2)
+        return first if first.in_flight <= second.in_flight else second
@@ -0,0 +1,230 @@
+"""Retries and hedging of idempotent A2A requests."""
+
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Sequence, TypeVar
+import asyncio
+import random
+import time
+
+import httpx
+
+from common.types import (
+    IDEMPOTENCY_KEY,
+    A2AClientHTTPError,
+    GetTaskPushNotificationRequest,
+    GetTaskRequest,
+    JSONRPCRequest,
+    ListTasksRequest,
+    SendTaskRequest,
+)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+def is_idempotent(request: JSONRPCRequest) -> bool:
+    """Whether sending the request twice has the same effect as sending it once."""
+    if isinstance(request, (GetTaskRequest, GetTaskPushNotificationRequest, ListTasksRequest)):
+        return True
+    if isinstance(request, SendTaskRequest):
+        return bool(request.params.metadata and request.params.metadata.get(IDEMPOTENCY_KEY))
+    return False
+
+
+class RetryBudget:
+    """Limits retries and hedges to a fraction of the requests.
+
+    Every request deposits ratio tokens, up to max_tokens, and every retry or hedge withdraws
+    one. When an agent fails persistently the budget runs dry, so clients stop multiplying the
+    load on it instead of retrying every request.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self):
+        self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        """Takes a token for a retry, returns False if none is left."""
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RetryMetrics:
+    """Counters of what a retry policy did."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.retries_denied = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return dict(vars(self))
+
+
+class RetryPolicy:
+    """Retries idempotent requests with jittered exponential backoff, optionally hedged.
+
+    Transport errors and the status codes in retry_status_codes are retried, up to
+    max_attempts in total and as long as the budget allows. The delay before attempt n is
+    drawn uniformly from [0, min(max_backoff, initial_backoff * 2 ** (n - 2))].
+
+    With hedge, a request that has not been answered after the hedge_percentile of recent
+    latencies of its method is sent a second time to one of the replica urls and the first
+    answer is used.
+
+    A policy can be shared by the clients of one agent, they then share its budget, latency
+    statistics and metrics.
+
+    Args:
+        max_attempts: Attempts per request, including the first.
+        initial_backoff: Upper bound of the delay before the first retry, in seconds.
+        max_backoff: Upper bound of the delay before any retry, in seconds.
+        retry_status_codes: HTTP status codes that are retried.
+        budget: Shared limit on retries and hedges, a new budget if None.
+        hedge: Send a second request to a replica when the first one is slow.
+        hedge_percentile: Latency percentile after which a request is hedged.
+        hedge_delay: Fixed delay after which a request is hedged, instead of the percentile.
+        latency_window: Number of recent latencies per method the percentile is computed from.
+    """
+
+    # Hedging waits for this many latency samples, unless hedge_delay is set.
+    MIN_LATENCY_SAMPLES = 20
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        initial_backoff: float = 0.1,
+        max_backoff: float = 5.0,
+        retry_status_codes: frozenset[int] = RETRYABLE_STATUS_CODES,
+        budget: RetryBudget | None = None,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_delay: float | None = None,
+        latency_window: int = 200,
+    ):
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.retry_status_codes = retry_status_codes
+        self.budget = budget or RetryBudget()
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.metrics = RetryMetrics()
+        # Recent latencies by method, methods differ too much in speed to share one window.
+        self._latencies: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=latency_window)
+        )
+
+    def is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, A2AClientHTTPError):
+            return error.status_code in self.retry_status_codes
+        return isinstance(error, httpx.TransportError)
+
+    def backoff(self, attempt: int) -> float:
+        """The delay before the given attempt, counting the first one as 1."""
+        return random.uniform(
+            0, min(self.max_backoff, self.initial_backoff * 2 ** (attempt - 2))
+        )
+
+    def current_hedge_delay(self, method: str = "") -> float | None:
+        """How long to wait for an answer to method before hedging, None while there is too
+        little data."""
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        if len(self._latencies[method]) < self.MIN_LATENCY_SAMPLES:
+            return None
+        latencies = sorted(self._latencies[method])
+        return latencies[min(int(len(latencies) * self.hedge_percentile), len(latencies) - 1)]
+
+    async def call(
+        self,
+        send: Callable[[str], Awaitable[T]],
+        url: str,
+        replica_urls: Sequence[str] = (),
+        hedge: bool = True,
+        method: str = "",
+    ) -> T:
+        """Sends a request with retries.
+
+        Args:
+            send: Sends the request to the given url and returns the response.
+            url: The url of the agent.
+            replica_urls: Other urls serving the same agent, used for hedging.
+            hedge: False for requests that must not be hedged: those that are slow on
+                purpose, such as long polls, and those that must not run twice on different
+                replicas. Their latency is not recorded.
+            method: The JSON-RPC method, latencies are tracked per method.
+        """
+        self.metrics.requests += 1
+        self.budget.deposit()
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                await asyncio.sleep(self.backoff(attempt))
+            try:
+                if not hedge:
+                    return await send(url)
+                return await self._hedged(send, url, replica_urls, method)
+            except Exception as e:
+                if not self.is_retryable(e) or attempt == self.max_attempts:
+                    self.metrics.failures += 1
+                    raise
+                if not self.budget.withdraw():
+                    self.metrics.retries_denied += 1
+                    self.metrics.failures += 1
+                    raise
+                self.metrics.retries += 1
+
+    async def _timed(self, send: Callable[[str], Awaitable[T]], url: str, method: str) -> T:
+        start = time.monotonic()
+        result = await send(url)
+        self._latencies[method].append(time.monotonic() - start)
+        return result
+
+    async def _hedged(
+        self,
+        send: Callable[[str], Awaitable[T]],
+        url: str,
+        replica_urls: Sequence[str],
+        method: str,
+    ) -> T:
+        delay = self.current_hedge_delay(method) if self.hedge and replica_urls else None
+        if delay is None:
+            return await self._timed(send, url, method)
+
+        primary = asyncio.ensure_future(self._timed(send, url, method))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            if not self.budget.withdraw():
+                return await primary
+            self.metrics.hedges += 1
+            hedge = asyncio.ensure_future(
+                self._timed(send, random.choice(replica_urls), method)
+            )
+            pending.add(hedge)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.metrics.hedge_wins += 1
+                        return task.result()
+                if not pending:
+                    # Both failed, report the error of the original request.
+                    return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
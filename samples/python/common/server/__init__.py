@@ -1,4 +1,5 @@
 from .server import A2AServer
 from .task_manager import TaskManager, InMemoryTaskManager
+from .blob_store import BlobStore, FileSystemBlobStore
 
-__all__ = ["A2AServer", "TaskManager", "InMemoryTaskManager"]
+__all__ = ["A2AServer", "TaskManager", "InMemoryTaskManager", "BlobStore", "FileSystemBlobStore"]
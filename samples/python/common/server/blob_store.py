@@ -0,0 +1,145 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterable, Iterator
+import asyncio
+import mmap
+import os
+import tempfile
+import uuid
+
+
+class BlobNotFoundError(KeyError):
+    pass
+
+
+class BlobTooLargeError(ValueError):
+    pass
+
+
+class BlobStore(ABC):
+    """Stores file contents out of band so tasks only carry a uri reference."""
+
+    @abstractmethod
+    def put(self, data: bytes, content_type: str | None = None) -> str:
+        """Stores the data and returns the id of the new blob."""
+
+    async def put_stream(
+        self, chunks: AsyncIterable[bytes], content_type: str | None = None
+    ) -> str:
+        """Stores the data read from chunks and returns the id of the new blob.
+
+        Stores that can write incrementally override this to avoid holding the whole blob in memory.
+        """
+        data = b"".join([chunk async for chunk in chunks])
+        return await asyncio.to_thread(self.put, data, content_type)
+
+    @abstractmethod
+    def size(self, blob_id: str) -> int:
+        pass
+
+    @abstractmethod
+    def content_type(self, blob_id: str) -> str | None:
+        pass
+
+    @abstractmethod
+    def iter_range(
+        self, blob_id: str, start: int, end: int, chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        """Yields the bytes in [start, end) of the blob in chunks of at most chunk_size."""
+
+    @abstractmethod
+    def delete(self, blob_id: str) -> bool:
+        pass
+
+
+class FileSystemBlobStore(BlobStore):
+    """Keeps every blob in its own file and serves ranges through mmap.
+
+    Reads never load the whole file, the OS pages in only the requested range.
+    The content type of a blob is kept in a file next to it, so a store reopened
+    on the same root_dir serves its blobs as they were stored.
+    """
+
+    CONTENT_TYPE_SUFFIX = ".content-type"
+
+    def __init__(self, root_dir: str | None = None):
+        self.root_dir = root_dir or tempfile.mkdtemp(prefix="a2a-blobs-")
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _path(self, blob_id: str) -> str:
+        # Blob ids are generated by the store, reject anything that could escape root_dir.
+        if not blob_id.isalnum():
+            raise BlobNotFoundError(blob_id)
+        return os.path.join(self.root_dir, blob_id)
+
+    def _write_content_type(self, path: str, content_type: str | None):
+        # Written before the blob is published, so readers never see a blob without it.
+        if content_type is not None:
+            with open(path + self.CONTENT_TYPE_SUFFIX, "w") as f:
+                f.write(content_type)
+
+    def put(self, data: bytes, content_type: str | None = None) -> str:
+        blob_id = uuid.uuid4().hex
+        path = self._path(blob_id)
+        # Write to a temporary file first so readers never see a partial blob.
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        self._write_content_type(path, content_type)
+        os.replace(path + ".tmp", path)
+        return blob_id
+
+    async def put_stream(
+        self, chunks: AsyncIterable[bytes], content_type: str | None = None
+    ) -> str:
+        blob_id = uuid.uuid4().hex
+        path = self._path(blob_id)
+        f = await asyncio.to_thread(open, path + ".tmp", "wb")
+        try:
+            with f:
+                async for chunk in chunks:
+                    await asyncio.to_thread(f.write, chunk)
+        except BaseException:
+            os.remove(path + ".tmp")
+            raise
+        await asyncio.to_thread(self._write_content_type, path, content_type)
+        os.replace(path + ".tmp", path)
+        return blob_id
+
+    def size(self, blob_id: str) -> int:
+        try:
+            return os.path.getsize(self._path(blob_id))
+        except FileNotFoundError:
+            raise BlobNotFoundError(blob_id)
+
+    def content_type(self, blob_id: str) -> str | None:
+        try:
+            with open(self._path(blob_id) + self.CONTENT_TYPE_SUFFIX) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def iter_range(
+        self, blob_id: str, start: int, end: int, chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        try:
+            f = open(self._path(blob_id), "rb")
+        except FileNotFoundError:
+            raise BlobNotFoundError(blob_id)
+
+        with f:
+            if start >= end:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(start, end, chunk_size):
+                    yield mapped[offset : min(offset + chunk_size, end)]
+
+    def delete(self, blob_id: str) -> bool:
+        try:
+            path = self._path(blob_id)
+            os.remove(path)
+        except (FileNotFoundError, BlobNotFoundError):
+            return False
+        try:
+            os.remove(path + self.CONTENT_TYPE_SUFFIX)
+        except FileNotFoundError:
+            pass
+        return True
@@ -1,7 +1,9 @@
 from starlette.applications import Starlette
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response, StreamingResponse
 from sse_starlette.sse import EventSourceResponse
 from starlette.requests import Request
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
 from common.types import (
     A2ARequest,
     JSONRPCResponse,
@@ -16,16 +18,34 @@ from common.types import (
     AgentCard,
     TaskResubscriptionRequest,
     SendTaskStreamingRequest,
+    ListTasksRequest,
+    FileContent,
+    IDEMPOTENCY_KEY,
 )
 from pydantic import ValidationError
 import json
-from typing import AsyncIterable, Any
-from common.server.task_manager import TaskManager
+from typing import AsyncIterable, Any, Awaitable, Callable
+from common.server.task_manager import TaskManager, InMemoryTaskManager
+from common.server.blob_store import BlobStore, BlobNotFoundError, BlobTooLargeError
+from common.server.utils import parse_range_header
+from urllib.parse import urljoin
+from collections import OrderedDict
+import asyncio
+import hashlib
+import time
 
 import logging
 
+try:
+    # Starlette parses multipart forms with python-multipart, raw uploads work without it.
+    import python_multipart
+except ImportError:
+    python_multipart = None
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_UPLOAD_SIZE = 100 * 1024 * 1024
+
 
 class A2AServer:
     def __init__(
@@ -35,18 +55,53 @@ class A2AServer:
         endpoint="/",
         agent_card: AgentCard = None,
         task_manager: TaskManager = None,
+        blob_store: BlobStore = None,
+        max_upload_size: int | None = DEFAULT_MAX_UPLOAD_SIZE,
+        upload_ttl: float | None = None,
+        idempotency_cache_size: int = 1024,
+        authenticate: Callable[[Request], Awaitable[bool]] | None = None,
     ):
         self.host = host
         self.port = port
         self.endpoint = endpoint
         self.task_manager = task_manager
         self.agent_card = agent_card
+        self.blob_store = blob_store
+        self.max_upload_size = max_upload_size
+        # Uploaded blobs are deleted this many seconds after the upload, None keeps them.
+        # Tasks keep referencing the blobs of their file parts, only set it if tasks do not
+        # outlive it.
+        self.upload_ttl = upload_ttl
+        # Uploaded blob ids by the monotonic time they expire at, oldest first.
+        self._upload_expiry: OrderedDict[str, float] = OrderedDict()
+        # Checks the credentials of requests to the endpoint and the blob routes, required
+        # with a blob store if the agent card declares authentication.
+        self.authenticate = authenticate
+        self.idempotency_cache_size = idempotency_cache_size
+        # Responses to tasks/send by task id and idempotency key, oldest first.
+        self._idempotent_sends: OrderedDict[tuple[str, str], asyncio.Future] = OrderedDict()
         self.app = Starlette()
         self.app.add_route(self.endpoint, self._process_request, methods=["POST"])
         self.app.add_route(
             "/.well-known/agent.json", self._get_agent_card, methods=["GET"]
         )
 
+        if self.blob_store is not None:
+            if self.agent_card is None:
+                raise ValueError("blob_store requires agent_card, blob uris are built from its url")
+            if self.agent_card.authentication and self.authenticate is None:
+                # Blobs are served here, not by the task manager that checks task requests.
+                raise ValueError(
+                    "agent_card declares authentication, pass authenticate to check blob requests"
+                )
+            # Large file parts are kept in the blob store, uploaded and downloaded from here.
+            self.blob_base_url = urljoin(self.agent_card.url, "/blobs/")
+            # HEAD lets clients check for upload support before sending a file.
+            self.app.add_route("/blobs", self._upload_blob, methods=["POST", "HEAD"])
+            self.app.add_route("/blobs/{blob_id}", self._get_blob, methods=["GET"])
+            if isinstance(self.task_manager, InMemoryTaskManager):
+                self.task_manager.set_blob_store(self.blob_store, self.blob_base_url)
+
     def start(self):
         if self.agent_card is None:
             raise ValueError("agent_card is not defined")
@@ -58,18 +113,153 @@ class A2AServer:
 
         uvicorn.run(self.app, host=self.host, port=self.port)
 
-    def _get_agent_card(self, request: Request) -> JSONResponse:
-        return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+    def _get_agent_card(self, request: Request) -> Response:
+        body = self.agent_card.model_dump_json(exclude_none=True).encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        # Resolvers revalidate their cached card, answer without a body if it is unchanged.
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    async def _is_authenticated(self, request: Request) -> bool:
+        return self.authenticate is None or await self.authenticate(request)
+
+    def _unauthenticated_response(self) -> Response:
+        authentication = self.agent_card.authentication if self.agent_card else None
+        schemes = authentication.schemes if authentication else []
+        return Response(
+            status_code=401, headers={"WWW-Authenticate": ", ".join(schemes) or "Bearer"}
+        )
+
+    async def _get_blob(self, request: Request) -> Response:
+        if not await self._is_authenticated(request):
+            return self._unauthenticated_response()
+        blob_id = request.path_params["blob_id"]
+        if self._is_expired_upload(blob_id):
+            await self._delete_expired_uploads()
+            return Response(status_code=404)
+        try:
+            size = self.blob_store.size(blob_id)
+        except BlobNotFoundError:
+            return Response(status_code=404)
+
+        headers = {"Accept-Ranges": "bytes"}
+        try:
+            byte_range = parse_range_header(request.headers.get("Range"), size)
+        except ValueError:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+        status_code = 200
+        start, end = 0, size
+        if byte_range is not None:
+            status_code = 206
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        headers["Content-Length"] = str(end - start)
+
+        return StreamingResponse(
+            self.blob_store.iter_range(blob_id, start, end),
+            status_code=status_code,
+            headers=headers,
+            media_type=self.blob_store.content_type(blob_id) or "application/octet-stream",
+        )
+
+    async def _upload_blob(self, request: Request) -> Response:
+        """Stores an uploaded file and returns file content referencing it by uri.
+
+        Accepts either the raw file as the request body, with its name in the name query
+        parameter, or a multipart form with the file in the "file" field. The request body,
+        including a multipart envelope, may be at most max_upload_size bytes; it is rejected
+        as soon as it grows larger, before the rest is read. With upload_ttl, uploaded blobs
+        are deleted upload_ttl seconds later.
+        """
+        if not await self._is_authenticated(request):
+            return self._unauthenticated_response()
+        if request.method == "HEAD":
+            return Response(status_code=204)
+        content_length = request.headers.get("content-length", "")
+        if (
+            self.max_upload_size is not None
+            and content_length.isdigit()
+            and int(content_length) > self.max_upload_size
+        ):
+            return Response(status_code=413)
+
+        await self._delete_expired_uploads()
+        body = self._limit_upload_size(request.stream())
+        content_type = request.headers.get("content-type", "")
+        try:
+            if content_type.startswith("multipart/form-data"):
+                if python_multipart is None:
+                    return JSONResponse(
+                        {"error": "Multipart uploads require python-multipart, upload the raw file instead"},
+                        status_code=415,
+                    )
+                try:
+                    form = await MultiPartParser(request.headers, body, max_files=1).parse()
+                except MultiPartException as e:
+                    return JSONResponse({"error": e.message}, status_code=400)
+                try:
+                    upload = form.get("file")
+                    if not isinstance(upload, UploadFile):
+                        return JSONResponse({"error": "Missing file field"}, status_code=400)
+                    name, mime_type = upload.filename, upload.content_type
+                    blob_id = await self.blob_store.put_stream(
+                        self._iter_upload_file(upload), mime_type
+                    )
+                finally:
+                    await form.close()
+            else:
+                name = request.query_params.get("name")
+                mime_type = content_type.split(";")[0].strip() or None
+                blob_id = await self.blob_store.put_stream(body, mime_type)
+        except BlobTooLargeError:
+            return Response(status_code=413)
+
+        if self.upload_ttl is not None:
+            self._upload_expiry[blob_id] = time.monotonic() + self.upload_ttl
+        file = FileContent(name=name, mimeType=mime_type, uri=self.blob_base_url + blob_id)
+        return JSONResponse(file.model_dump(exclude_none=True), status_code=201)
+
+    @staticmethod
+    async def _iter_upload_file(
+        upload: UploadFile, chunk_size: int = 64 * 1024
+    ) -> AsyncIterable[bytes]:
+        while chunk := await upload.read(chunk_size):
+            yield chunk
+
+    async def _limit_upload_size(self, chunks: AsyncIterable[bytes]) -> AsyncIterable[bytes]:
+        size = 0
+        async for chunk in chunks:
+            size += len(chunk)
+            if self.max_upload_size is not None and size > self.max_upload_size:
+                raise BlobTooLargeError(size)
+            yield chunk
+
+    def _is_expired_upload(self, blob_id: str) -> bool:
+        expires = self._upload_expiry.get(blob_id)
+        return expires is not None and expires <= time.monotonic()
+
+    async def _delete_expired_uploads(self):
+        now = time.monotonic()
+        while self._upload_expiry:
+            blob_id, expires = next(iter(self._upload_expiry.items()))
+            if expires > now:
+                break
+            del self._upload_expiry[blob_id]
+            await asyncio.to_thread(self.blob_store.delete, blob_id)
 
     async def _process_request(self, request: Request):
+        if not await self._is_authenticated(request):
+            return self._unauthenticated_response()
         try:
-            body = await request.json()
-            json_rpc_request = A2ARequest.validate_python(body)
+            # Parse and validate in one pass, without an intermediate dict.
+            json_rpc_request = A2ARequest.validate_json(await request.body())
 
             if isinstance(json_rpc_request, GetTaskRequest):
-                result = await self.task_manager.on_get_task(json_rpc_request)
+                return await self._get_task(request, json_rpc_request)
             elif isinstance(json_rpc_request, SendTaskRequest):
-                result = await self.task_manager.on_send_task(json_rpc_request)
+                result = await self._send_task_once(json_rpc_request)
             elif isinstance(json_rpc_request, SendTaskStreamingRequest):
                 result = await self.task_manager.on_send_task_subscribe(
                     json_rpc_request
@@ -84,6 +274,8 @@ class A2AServer:
                 result = await self.task_manager.on_resubscribe_to_task(
                     json_rpc_request
                 )
+            elif isinstance(json_rpc_request, ListTasksRequest):
+                result = await self.task_manager.on_list_tasks(json_rpc_request)
             else:
                 logger.warning(f"Unexpected request type: {type(json_rpc_request)}")
                 raise ValueError(f"Unexpected request type: {type(request)}")
@@ -93,8 +285,81 @@ class A2AServer:
         except Exception as e:
             return self._handle_exception(e)
 
+    async def _get_task(self, request: Request, get_task_request: GetTaskRequest) -> Response:
+        """Handles tasks/get, answering with the version of the task as ETag.
+
+        A request whose If-None-Match holds an ETag of the task is answered with the changes
+        since that version, like one with the ifVersionNewerThan param.
+        """
+        params = get_task_request.params
+        version = self._parse_task_etag(request.headers.get("if-none-match"), params.id)
+        if version is not None and params.ifVersionNewerThan is None:
+            get_task_request = get_task_request.model_copy(
+                update={"params": params.model_copy(update={"ifVersionNewerThan": version})}
+            )
+
+        result = await self.task_manager.on_get_task(get_task_request)
+        response = self._create_response(result)
+        version = getattr(getattr(result, "result", None), "version", None)
+        if version is not None:
+            response.headers["ETag"] = self._task_etag(params.id, version)
+        return response
+
+    @staticmethod
+    def _task_etag(task_id: str, version: int) -> str:
+        # Weak, the body also depends on historyLength.
+        return f'W/"{version}-{hashlib.sha256(task_id.encode()).hexdigest()[:16]}"'
+
+    @classmethod
+    def _parse_task_etag(cls, if_none_match: str | None, task_id: str) -> int | None:
+        """The task version in an If-None-Match header, None if it has no ETag of the task."""
+        for etag in (if_none_match or "").split(","):
+            # Compare weakly, as If-None-Match does.
+            etag = etag.strip().removeprefix("W/")
+            version = etag.strip('"').partition("-")[0]
+            if version.isdigit() and cls._task_etag(task_id, int(version)) == "W/" + etag:
+                return int(version)
+        return None
+
+    async def _send_task_once(self, request: SendTaskRequest) -> JSONRPCResponse:
+        """Handles tasks/send, answering a repeated idempotency key with the first response.
+
+        A retry that arrives while the first request is still running waits for its response.
+        """
+        idempotency_key = (request.params.metadata or {}).get(IDEMPOTENCY_KEY)
+        if not idempotency_key:
+            return await self.task_manager.on_send_task(request)
+
+        key = (request.params.id, idempotency_key)
+        future = self._idempotent_sends.get(key)
+        if future is not None:
+            response = await asyncio.shield(future)
+            return response.model_copy(update={"id": request.id})
+
+        future = asyncio.get_running_loop().create_future()
+        self._idempotent_sends[key] = future
+        while len(self._idempotent_sends) > self.idempotency_cache_size:
+            self._idempotent_sends.popitem(last=False)
+        try:
+            response = await self.task_manager.on_send_task(request)
+        except BaseException as e:
+            # Failed requests are not remembered, so they can be retried.
+            self._idempotent_sends.pop(key, None)
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Mark the exception as retrieved in case no retry is waiting for it.
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        future.set_result(response)
+        return response
+
     def _handle_exception(self, e: Exception) -> JSONResponse:
-        if isinstance(e, json.decoder.JSONDecodeError):
+        if isinstance(e, json.decoder.JSONDecodeError) or (
+            isinstance(e, ValidationError)
+            and any(error["type"] == "json_invalid" for error in e.errors())
+        ):
             json_rpc_error = JSONParseError()
         elif isinstance(e, ValidationError):
             json_rpc_error = InvalidRequestError(data=json.loads(e.json()))
@@ -105,7 +370,7 @@ class A2AServer:
         response = JSONRPCResponse(id=None, error=json_rpc_error)
         return JSONResponse(response.model_dump(exclude_none=True), status_code=400)
 
-    def _create_response(self, result: Any) -> JSONResponse | EventSourceResponse:
+    def _create_response(self, result: Any) -> Response | EventSourceResponse:
         if isinstance(result, AsyncIterable):
 
             async def event_generator(result) -> AsyncIterable[dict[str, str]]:
@@ -114,7 +379,9 @@ class A2AServer:
 
             return EventSourceResponse(event_generator(result))
         elif isinstance(result, JSONRPCResponse):
-            return JSONResponse(result.model_dump(exclude_none=True))
+            return Response(
+                result.model_dump_json(exclude_none=True), media_type="application/json"
+            )
         else:
             logger.error(f"Unexpected result type: {type(result)}")
             raise ValueError(f"Unexpected result type: {type(result)}")
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Union, AsyncIterable, List
+from bisect import bisect_left
+from typing import Union, AsyncIterable, Iterator, List
 from common.types import Task
 from common.types import (
     JSONRPCResponse,
@@ -30,8 +31,24 @@ from common.types import (
     JSONRPCError,
     TaskPushNotificationConfig,
     InternalError,
+    InvalidParamsError,
+    ListTasksRequest,
+    ListTasksResponse,
+    TaskListParams,
+    TaskListResult,
+    Message,
+    TextPart,
+    Part,
+    FilePart,
+    FileContent,
+    FINAL_TASK_STATES,
 )
+from common.server.blob_store import BlobStore
+from common.server.task_store import TaskIndexKeys, TaskStore
 from common.server.utils import new_not_implemented_error
+from common.utils.artifact_chunks import chunk_artifact
+from common.utils.content_store import ContentStore, get_content_store
+from contextlib import asynccontextmanager
 import asyncio
 import logging
 
@@ -74,41 +91,197 @@ class TaskManager(ABC):
     ) -> Union[AsyncIterable[SendTaskResponse], JSONRPCResponse]:
         pass
 
+    async def on_list_tasks(
+        self, request: ListTasksRequest
+    ) -> Union[ListTasksResponse, JSONRPCResponse]:
+        # Optional, task managers that cannot list their tasks keep this default.
+        return new_not_implemented_error(request.id)
+
+
+class _UpdateIndex:
+    """Task ids ordered by update sequence number, for keyset pagination of tasks/list.
+
+    Sequence numbers only grow, so new entries are appended to a sorted list that bisect
+    can seek into. Removed entries are dropped from the list lazily, once they make up half
+    of it.
+    """
+
+    __slots__ = ("task_ids", "sequences")
+
+    def __init__(self):
+        # sequence -> task id, in insertion and so in sequence order.
+        self.task_ids: dict[int, str] = {}
+        self.sequences: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.task_ids)
+
+    def add(self, sequence: int, task_id: str):
+        self.task_ids[sequence] = task_id
+        self.sequences.append(sequence)
+
+    def remove(self, sequence: int):
+        del self.task_ids[sequence]
+        if len(self.sequences) > 2 * len(self.task_ids) + 16:
+            self.sequences = list(self.task_ids)
+
+    def newest_first(self, before: int | None = None) -> Iterator[tuple[int, str]]:
+        """Yields (sequence, task id), newest first, starting below sequence before."""
+        end = len(self.sequences) if before is None else bisect_left(self.sequences, before)
+        for i in range(end - 1, -1, -1):
+            task_id = self.task_ids.get(self.sequences[i])
+            if task_id is not None:
+                yield self.sequences[i], task_id
+
 
 class InMemoryTaskManager(TaskManager):
     def __init__(self):
-        self.tasks: dict[str, Task] = {}
+        # Tasks are stored compactly and materialized into Task objects when read.
+        self.tasks = TaskStore()
         self.push_notification_infos: dict[str, PushNotificationConfig] = {}
         self.lock = asyncio.Lock()
+        # Notified, with self.lock held, whenever a stored task changes. Long-polling
+        # tasks/get requests wait on it.
+        self.task_updated = asyncio.Condition(self.lock)
+        self.max_wait_timeout = 60.0
         self.task_sse_subscribers: dict[str, List[asyncio.Queue]] = {}
         self.subscriber_lock = asyncio.Lock()
+        # task id -> sequence number of its last update.
+        self.task_update_order: dict[str, int] = {}
+        # Secondary indexes for tasks/list, each ordered by update sequence number.
+        self.task_update_index = _UpdateIndex()
+        self.session_task_index: dict[str, _UpdateIndex] = {}
+        self.state_task_index: dict[TaskState, _UpdateIndex] = {}
+        self.task_index_keys: dict[str, tuple[str | None, TaskState]] = {}
+        self.update_sequence = 0
+        # Per-session FIFO of futures, each resolved when that piece of work has finished.
+        self.session_queues: dict[str, List[asyncio.Future]] = {}
+        # If set, e.g. to DEFAULT_ARTIFACT_CHUNK_SIZE, artifacts with larger parts are streamed
+        # to SSE subscribers in several chunks. Off by default since clients must reassemble them.
+        self.artifact_chunk_size: int | None = None
+        # Optional out-of-band storage for large file parts, see set_blob_store.
+        self.blob_store: BlobStore | None = None
+        self.blob_base_url: str | None = None
+        self.blob_offload_threshold = 64 * 1024
+        # Identical inline file contents are held once, shared with other task managers and caches.
+        self.content_store: ContentStore = get_content_store()
+        # content digest -> blob id, so identical large files are offloaded once.
+        self.blob_ids_by_digest: dict[str, str] = {}
 
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
         logger.info(f"Getting task {request.params.id}")
         task_query_params: TaskQueryParams = request.params
 
         async with self.lock:
-            task = self.tasks.get(task_query_params.id)
-            if task is None:
+            if task_query_params.id not in self.tasks:
                 return GetTaskResponse(id=request.id, error=TaskNotFoundError())
 
-            task_result = self.append_task_history(
-                task, task_query_params.historyLength
-            )
+            if task_query_params.waitTimeout:
+                await self._wait_for_update(
+                    task_query_params.id,
+                    min(task_query_params.waitTimeout, self.max_wait_timeout),
+                    task_query_params.ifVersionNewerThan,
+                )
+
+            history_length = self._history_length(task_query_params.historyLength)
+            task_result = None
+            if task_query_params.ifVersionNewerThan is not None:
+                task_result = self.tasks.delta(
+                    task_query_params.id, task_query_params.ifVersionNewerThan, history_length
+                )
+            if task_result is None:
+                task_result = self.tasks.materialize(task_query_params.id, history_length)
 
         return GetTaskResponse(id=request.id, result=task_result)
 
+    async def _wait_for_update(
+        self, task_id: str, timeout: float, newer_than: int | None = None
+    ):
+        """Waits until the task changes or timeout seconds pass, with self.lock held.
+
+        With newer_than, waits until the task version is newer than it, otherwise for the next
+        change. Returns right away if the task is in a final state, since it only changes
+        once the client sends new input.
+        """
+        task_state = self.task_index_keys.get(task_id, (None, None))[1]
+        if task_state in FINAL_TASK_STATES:
+            return
+
+        if newer_than is not None:
+            changed = lambda: self.tasks.version(task_id) > newer_than
+        else:
+            sequence = self.task_update_order.get(task_id)
+            changed = lambda: self.task_update_order.get(task_id) != sequence
+        try:
+            await asyncio.wait_for(self.task_updated.wait_for(changed), timeout)
+        except asyncio.TimeoutError:
+            pass
+
     async def on_cancel_task(self, request: CancelTaskRequest) -> CancelTaskResponse:
         logger.info(f"Cancelling task {request.params.id}")
         task_id_params: TaskIdParams = request.params
 
         async with self.lock:
-            task = self.tasks.get(task_id_params.id)
-            if task is None:
+            if task_id_params.id not in self.tasks:
                 return CancelTaskResponse(id=request.id, error=TaskNotFoundError())
 
         return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
 
+    async def on_list_tasks(self, request: ListTasksRequest) -> ListTasksResponse:
+        logger.info(f"Listing tasks {request.params}")
+        task_list_params: TaskListParams = request.params
+
+        try:
+            before = int(task_list_params.cursor) if task_list_params.cursor else None
+        except ValueError:
+            return ListTasksResponse(
+                id=request.id, error=InvalidParamsError(message="Invalid cursor")
+            )
+
+        tasks = []
+        next_cursor = None
+        # The update sequence of the last task on the page, the next page starts after it.
+        last_sequence = None
+        async with self.lock:
+            # Scan the smallest index that satisfies the filters, newest update first.
+            candidates = self.task_update_index
+            if task_list_params.sessionId is not None:
+                candidates = self.session_task_index.get(
+                    task_list_params.sessionId, _UpdateIndex()
+                )
+            if task_list_params.state is not None:
+                state_index = self.state_task_index.get(task_list_params.state, _UpdateIndex())
+                if task_list_params.sessionId is None or len(state_index) < len(candidates):
+                    candidates = state_index
+
+            for sequence, task_id in candidates.newest_first(before):
+                session_id, state = self.task_index_keys[task_id]
+                if (
+                    task_list_params.sessionId is not None
+                    and session_id != task_list_params.sessionId
+                ) or (
+                    task_list_params.state is not None
+                    and state != task_list_params.state
+                ):
+                    continue
+
+                if len(tasks) == task_list_params.pageSize:
+                    next_cursor = str(last_sequence)
+                    break
+
+                tasks.append(
+                    self.tasks.materialize(
+                        task_id,
+                        self._history_length(task_list_params.historyLength),
+                        include_artifacts=task_list_params.includeArtifacts,
+                    )
+                )
+                last_sequence = sequence
+
+        return ListTasksResponse(
+            id=request.id, result=TaskListResult(tasks=tasks, nextCursor=next_cursor)
+        )
+
     @abstractmethod
     async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
         pass
@@ -121,8 +294,7 @@ class InMemoryTaskManager(TaskManager):
 
     async def set_push_notification_info(self, task_id: str, notification_config: PushNotificationConfig):
         async with self.lock:
-            task = self.tasks.get(task_id)
-            if task is None:
+            if task_id not in self.tasks:
                 raise ValueError(f"Task not found for {task_id}")
 
             self.push_notification_infos[task_id] = notification_config
@@ -131,8 +303,7 @@ class InMemoryTaskManager(TaskManager):
     
     async def get_push_notification_info(self, task_id: str) -> PushNotificationConfig:
         async with self.lock:
-            task = self.tasks.get(task_id)
-            if task is None:
+            if task_id not in self.tasks:
                 raise ValueError(f"Task not found for {task_id}")
 
             return self.push_notification_infos[task_id]
@@ -182,23 +353,68 @@ class InMemoryTaskManager(TaskManager):
         
         return GetTaskPushNotificationResponse(id=request.id, result=TaskPushNotificationConfig(id=task_params.id, pushNotificationConfig=notification_info))
 
+    def set_blob_store(
+        self, blob_store: BlobStore, blob_base_url: str, offload_threshold: int | None = None
+    ):
+        """Stores large file parts in blob_store and references them by uri under blob_base_url."""
+        self.blob_store = blob_store
+        self.blob_base_url = blob_base_url.rstrip("/") + "/"
+        if offload_threshold is not None:
+            self.blob_offload_threshold = offload_threshold
+
+    async def offload_file_parts(self, parts: List[Part]):
+        """Replaces, in place, inline file bytes by the shared copy in the content store.
+
+        With a blob store set, large file parts are instead replaced by uri references into it.
+        """
+        for i, part in enumerate(parts):
+            if not isinstance(part, FilePart) or not part.file.bytes:
+                continue
+
+            if (
+                self.blob_store is None
+                or len(part.file.bytes) <= self.blob_offload_threshold
+            ):
+                _, part.file.bytes = self.content_store.intern(part.file.bytes)
+                continue
+
+            digest = ContentStore.digest(part.file.bytes)
+            blob_id = self.blob_ids_by_digest.get(digest)
+            if blob_id is None:
+                blob_id = await asyncio.to_thread(
+                    self.blob_store.put, part.file.decoded_bytes, part.file.mimeType
+                )
+                self.blob_ids_by_digest[digest] = blob_id
+            parts[i] = FilePart(
+                file=FileContent(
+                    name=part.file.name,
+                    mimeType=part.file.mimeType,
+                    uri=self.blob_base_url + blob_id,
+                ),
+                metadata=part.metadata,
+            )
+
     async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
         logger.info(f"Upserting task {task_send_params.id}")
+        # The agent still reads the inline bytes from the request, only the stored copy is offloaded.
+        message = task_send_params.message.model_copy(
+            update={"parts": list(task_send_params.message.parts)}
+        )
+        await self.offload_file_parts(message.parts)
+
         async with self.lock:
-            task = self.tasks.get(task_send_params.id)
-            if task is None:
-                task = Task(
+            if task_send_params.id not in self.tasks:
+                self.tasks[task_send_params.id] = Task(
                     id=task_send_params.id,
                     sessionId = task_send_params.sessionId,
-                    messages=[task_send_params.message],
                     status=TaskStatus(state=TaskState.SUBMITTED),
-                    history=[task_send_params.message],
+                    history=[message],
                 )
-                self.tasks[task_send_params.id] = task
+                index_keys = self.tasks.index_keys(task_send_params.id)
             else:
-                task.history.append(task_send_params.message)
-
-            return task
+                index_keys = self.tasks.append_message(task_send_params.id, message)
+            self.index_task(index_keys)
+            return self.tasks[task_send_params.id]
 
     async def on_resubscribe_to_task(
         self, request: TaskResubscriptionRequest
@@ -206,26 +422,139 @@ class InMemoryTaskManager(TaskManager):
         return new_not_implemented_error(request.id)
 
     async def update_store(
-        self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
+        self,
+        task_id: str,
+        status: TaskStatus,
+        artifacts: list[Artifact],
+        append_status_message: bool = True,
     ) -> Task:
+        """Stores a status update and artifacts of a task and returns the updated task."""
+        await self.record_update(task_id, status, artifacts, append_status_message)
+        return self.tasks[task_id]
+
+    async def record_update(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        artifacts: list[Artifact] | None,
+        append_status_message: bool = True,
+    ) -> TaskIndexKeys:
+        """Like update_store, without building the updated task for callers that do not read it."""
+        if status.message is not None:
+            await self.offload_file_parts(status.message.parts)
+        for artifact in artifacts or []:
+            await self.offload_file_parts(artifact.parts)
+
         async with self.lock:
             try:
-                task = self.tasks[task_id]
+                index_keys = self.tasks.update_task(
+                    task_id, status, artifacts, append_status_message
+                )
             except KeyError:
                 logger.error(f"Task {task_id} not found for updating the task")
                 raise ValueError(f"Task {task_id} not found")
 
-            task.status = status
-
-            if status.message is not None:
-                task.history.append(status.message)
-
-            if artifacts is not None:
-                if task.artifacts is None:
-                    task.artifacts = []
-                task.artifacts.extend(artifacts)
+            self.index_task(index_keys)
+            return index_keys
+
+    def index_task(self, index_keys: TaskIndexKeys):
+        """Moves the task to the most recent position of the tasks/list indexes.
+
+        Must be called with self.lock held whenever a stored task changes.
+        """
+        task_id, session_id, state = index_keys
+        self.update_sequence += 1
+        previous_keys = self.task_index_keys.get(task_id)
+        if previous_keys is not None:
+            previous_session_id, previous_state = previous_keys
+            previous_sequence = self.task_update_order[task_id]
+            self.task_update_index.remove(previous_sequence)
+            if previous_session_id is not None:
+                session_index = self.session_task_index[previous_session_id]
+                session_index.remove(previous_sequence)
+                if not session_index:
+                    del self.session_task_index[previous_session_id]
+            self.state_task_index[previous_state].remove(previous_sequence)
+
+        self.task_index_keys[task_id] = (session_id, state)
+        self.task_update_order[task_id] = self.update_sequence
+        self.task_update_index.add(self.update_sequence, task_id)
+        if session_id is not None:
+            self.session_task_index.setdefault(session_id, _UpdateIndex()).add(
+                self.update_sequence, task_id
+            )
+        self.state_task_index.setdefault(state, _UpdateIndex()).add(
+            self.update_sequence, task_id
+        )
+        self.task_updated.notify_all()
+
+    @asynccontextmanager
+    async def run_in_session(self, session_id: str, task_id: str):
+        """Runs the body after all earlier work in the same session has finished.
+
+        Work within a session is serialized in FIFO order so agents never touch the same
+        conversation state concurrently, while different sessions run in parallel.
+        """
+        ahead = list(self.session_queues.get(session_id, []))
+        done = asyncio.get_running_loop().create_future()
+        queue = self.session_queues.setdefault(session_id, [])
+        queue.append(done)
+        started = False
+        try:
+            reported_position = None
+            for previous in ahead:
+                # Waiters that were cancelled have left the queue and no longer count.
+                position = queue.index(done)
+                if position and position != reported_position:
+                    await self.on_session_queue_position(session_id, task_id, position)
+                    reported_position = position
+                # Shield so a cancelled waiter does not cancel the work ahead of it.
+                await asyncio.shield(previous)
+            started = True
+            yield
+        finally:
+            queue.remove(done)
+            if not queue:
+                del self.session_queues[session_id]
 
-            return task
+            if started:
+                done.set_result(None)
+            else:
+                # Cancelled while waiting, only release the work behind us once everything
+                # ahead of us has finished to preserve the FIFO order.
+                ahead[-1].add_done_callback(lambda _: done.set_result(None))
+
+    async def on_session_queue_position(self, session_id: str, task_id: str, position: int):
+        """Reports that the task waits behind `position` earlier tasks of its session."""
+        logger.info(f"Task {task_id} is queued at position {position} in session {session_id}")
+        task_status = TaskStatus(
+            state=TaskState.WORKING,
+            message=Message(
+                role="agent",
+                parts=[
+                    TextPart(
+                        text=f"Waiting for {position} earlier task(s) in this session to finish"
+                    )
+                ],
+                metadata={"queuePosition": position},
+            ),
+        )
+        # The position is transient, keep it out of the task history.
+        await self.record_update(task_id, task_status, None, append_status_message=False)
+        await self.enqueue_events_for_sse(
+            task_id,
+            TaskStatusUpdateEvent(
+                id=task_id,
+                status=task_status,
+                final=False,
+                metadata={"queuePosition": position},
+            ),
+        )
+
+    @staticmethod
+    def _history_length(historyLength: int | None) -> int:
+        # A missing or non-positive historyLength returns no history, see append_task_history.
+        return historyLength if historyLength is not None and historyLength > 0 else 0
 
     def append_task_history(self, task: Task, historyLength: int | None):
         new_task = task.model_copy()
@@ -257,6 +586,13 @@ class InMemoryTaskManager(TaskManager):
             for subscriber in current_subscribers:
                 await subscriber.put(task_update_event)
 
+    async def enqueue_artifact_for_sse(self, task_id: str, artifact: Artifact):
+        """Streams an artifact to the SSE subscribers, split into bounded-size chunks."""
+        for task_artifact_update_event in chunk_artifact(
+            task_id, artifact, self.artifact_chunk_size
+        ):
+            await self.enqueue_events_for_sse(task_id, task_artifact_update_event)
+
     async def dequeue_events_for_sse(
         self, request_id, task_id, sse_event_queue: asyncio.Queue
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
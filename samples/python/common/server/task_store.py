@@ -0,0 +1,271 @@
+from collections.abc import MutableMapping
+from typing import Iterator, List, NamedTuple
+import sys
+
+from pydantic import BaseModel
+
+from common.types import Artifact, FilePart, Message, Task, TaskDelta, TaskState, TaskStatus
+
+# A stored model is either its JSON serialization or, when it holds inline file bytes,
+# the model itself so the bytes stay shared with the content store.
+StoredModel = bytes | BaseModel
+
+
+class TaskIndexKeys(NamedTuple):
+    """The fields of a task that tasks/list indexes it by, known without materializing it."""
+
+    id: str
+    session_id: str | None
+    state: TaskState
+
+
+def _has_inline_file(model: Message | Artifact | TaskStatus) -> bool:
+    if isinstance(model, TaskStatus):
+        return model.message is not None and _has_inline_file(model.message)
+    return any(isinstance(part, FilePart) and part.file.bytes for part in model.parts)
+
+
+def _compact(model: Message | Artifact | TaskStatus) -> StoredModel:
+    if _has_inline_file(model):
+        return model
+    return model.model_dump_json(exclude_none=True).encode()
+
+
+def _materialize(stored: StoredModel, model_type: type[BaseModel]):
+    if isinstance(stored, bytes):
+        return model_type.model_validate_json(stored)
+    return stored
+
+
+class _StoredTask:
+    __slots__ = (
+        "id",
+        "session_id",
+        "state",
+        "status",
+        "history",
+        "artifacts",
+        "metadata",
+        "version",
+        "status_version",
+        "base_version",
+        "sizes",
+    )
+
+    def __init__(self, task: Task, version: int = 1):
+        self.id = task.id
+        # Many tasks share a session, keep one copy of its id.
+        self.session_id = sys.intern(task.sessionId) if task.sessionId else None
+        # Kept apart from the compacted status so indexing never parses it.
+        self.state = task.status.state
+        self.status = _compact(task.status)
+        self.history = (
+            [_compact(message) for message in task.history]
+            if task.history is not None
+            else None
+        )
+        self.artifacts = (
+            [_compact(artifact) for artifact in task.artifacts]
+            if task.artifacts is not None
+            else None
+        )
+        self.metadata = task.metadata
+        self.version = version
+        self.status_version = version
+        # Deltas can be computed from base_version on, older versions were replaced.
+        self.base_version = version
+        # (history length, artifact count) at each version since base_version. History and
+        # artifacts are only appended to, so the entries added after a version follow these.
+        # Bounded by TaskStore.max_delta_versions.
+        self.sizes = [self._size()]
+
+    def index_keys(self) -> TaskIndexKeys:
+        return TaskIndexKeys(self.id, self.session_id, self.state)
+
+    def _size(self) -> tuple[int, int]:
+        return (len(self.history or ()), len(self.artifacts or ()))
+
+    def bump_version(self, max_versions: int):
+        self.version += 1
+        self.sizes.append(self._size())
+        if len(self.sizes) > max_versions:
+            # Deltas from the oldest version fall back to the full task from now on.
+            del self.sizes[0]
+            self.base_version += 1
+
+
+class TaskStore(MutableMapping):
+    """Compact in-memory storage of tasks, keyed by task id.
+
+    Messages, artifacts and statuses are kept as immutable JSON fragments in slotted
+    records instead of pydantic models, which is several times smaller per task. Reading a
+    task materializes a new Task, so changes to it are not stored until it is set again;
+    use append_message and update_task to change stored tasks in place.
+
+    Every change increases the version of the task, and delta returns what changed since one
+    of the last max_delta_versions versions without materializing the rest of the task.
+    """
+
+    def __init__(self, max_delta_versions: int = 64):
+        self._tasks: dict[str, _StoredTask] = {}
+        self.max_delta_versions = max_delta_versions
+
+    def __getitem__(self, task_id: str) -> Task:
+        return self.materialize(task_id)
+
+    def __setitem__(self, task_id: str, task: Task):
+        previous = self._tasks.get(task_id)
+        # Versions keep increasing when a task is replaced.
+        version = previous.version + 1 if previous is not None else 1
+        self._tasks[task_id] = _StoredTask(task, version)
+
+    def __delitem__(self, task_id: str):
+        del self._tasks[task_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tasks)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, task_id: object) -> bool:
+        return task_id in self._tasks
+
+    def materialize(
+        self,
+        task_id: str,
+        history_length: int | None = None,
+        include_artifacts: bool = True,
+    ) -> Task:
+        """Builds a Task from the stored record.
+
+        Args:
+            task_id: The id of the task.
+            history_length: Number of most recent history messages to include, all if None.
+            include_artifacts: Whether to include the artifacts.
+
+        Raises:
+            KeyError: If the task is not stored.
+        """
+        stored = self._tasks[task_id]
+        history = stored.history
+        if history is not None and history_length is not None:
+            history = history[-history_length:] if history_length > 0 else []
+        return Task(
+            id=stored.id,
+            sessionId=stored.session_id,
+            status=_materialize(stored.status, TaskStatus),
+            history=[_materialize(message, Message) for message in history]
+            if history is not None
+            else None,
+            artifacts=[_materialize(artifact, Artifact) for artifact in stored.artifacts]
+            if include_artifacts and stored.artifacts is not None
+            else None,
+            metadata=stored.metadata,
+            version=stored.version,
+        )
+
+    def index_keys(self, task_id: str) -> TaskIndexKeys:
+        """The id, session id and state of a stored task.
+
+        Raises:
+            KeyError: If the task is not stored.
+        """
+        return self._tasks[task_id].index_keys()
+
+    def version(self, task_id: str) -> int:
+        """The current version of a stored task.
+
+        Raises:
+            KeyError: If the task is not stored.
+        """
+        return self._tasks[task_id].version
+
+    def delta(
+        self, task_id: str, since_version: int, history_length: int | None = None
+    ) -> TaskDelta | None:
+        """Builds the changes to a stored task since since_version.
+
+        Returns None if the changes cannot be told, because the task was replaced after
+        since_version, since_version is older than the last max_delta_versions versions or
+        newer than the task.
+
+        Args:
+            task_id: The id of the task.
+            since_version: The version of the task the caller has.
+            history_length: Number of most recent new history messages to include, all if None.
+
+        Raises:
+            KeyError: If the task is not stored.
+        """
+        stored = self._tasks[task_id]
+        if not stored.base_version <= since_version <= stored.version:
+            return None
+        if since_version == stored.version:
+            return TaskDelta(id=stored.id, version=stored.version, baseVersion=since_version)
+
+        history_size, artifacts_size = stored.sizes[since_version - stored.base_version]
+        history = (stored.history or [])[history_size:]
+        if history_length is not None:
+            history = history[-history_length:] if history_length > 0 else []
+        artifacts = (stored.artifacts or [])[artifacts_size:]
+        return TaskDelta(
+            id=stored.id,
+            version=stored.version,
+            baseVersion=since_version,
+            status=_materialize(stored.status, TaskStatus)
+            if stored.status_version > since_version
+            else None,
+            history=[_materialize(message, Message) for message in history] or None,
+            artifacts=[_materialize(artifact, Artifact) for artifact in artifacts] or None,
+        )
+
+    def append_message(self, task_id: str, message: Message) -> TaskIndexKeys:
+        """Appends a message to the history of a stored task.
+
+        Returns:
+            The index keys of the task, so callers need not materialize it to reindex it.
+
+        Raises:
+            KeyError: If the task is not stored.
+        """
+        stored = self._tasks[task_id]
+        self._append_message(stored, message)
+        stored.bump_version(self.max_delta_versions)
+        return stored.index_keys()
+
+    @staticmethod
+    def _append_message(stored: _StoredTask, message: Message):
+        if stored.history is None:
+            stored.history = []
+        stored.history.append(_compact(message))
+
+    def update_task(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        artifacts: List[Artifact] | None = None,
+        append_status_message: bool = True,
+    ) -> TaskIndexKeys:
+        """Sets the status of a stored task and appends artifacts.
+
+        With append_status_message, the message of the status is also appended to the history.
+
+        Returns:
+            The index keys of the task, so callers need not materialize it to reindex it.
+
+        Raises:
+            KeyError: If the task is not stored.
+        """
+        stored = self._tasks[task_id]
+        stored.state = status.state
+        stored.status = _compact(status)
+        if append_status_message and status.message is not None:
+            self._append_message(stored, status.message)
+        if artifacts is not None:
+            if stored.artifacts is None:
+                stored.artifacts = []
+            stored.artifacts.extend(_compact(artifact) for artifact in artifacts)
+        stored.bump_version(self.max_delta_versions)
+        stored.status_version = stored.version
+        return stored.index_keys()
@@ -26,3 +26,36 @@ def new_incompatible_types_error(request_id):
 
 def new_not_implemented_error(request_id):
     return JSONRPCResponse(id=request_id, error=UnsupportedOperationError())
+
+
+def parse_range_header(range_header: str | None, size: int) -> tuple[int, int] | None:
+    """Parses a single-range HTTP Range header into a [start, end) byte range.
+
+    Returns None when the whole content should be served and raises ValueError
+    when the range cannot be satisfied.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+
+    ranges = range_header[len("bytes="):].split(",")
+    if len(ranges) != 1:
+        # Multiple ranges are not supported, serve the whole content instead.
+        return None
+
+    start_str, _, end_str = ranges[0].strip().partition("-")
+    try:
+        if not start_str:
+            # Suffix range, the last N bytes.
+            suffix_length = int(end_str)
+            if suffix_length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(size - suffix_length, 0), size
+
+        start = int(start_str)
+        end = int(end_str) + 1 if end_str else size
+    except ValueError:
+        raise ValueError(f"Invalid range: {range_header}")
+
+    if start >= size or end <= start:
+        raise ValueError(f"Range not satisfiable: {range_header}")
+    return start, min(end, size)
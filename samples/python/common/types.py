@@ -1,8 +1,10 @@
 from typing import Union, Any
-from pydantic import BaseModel, Field, TypeAdapter
-from typing import Literal, List, Annotated, Optional
+from pydantic import BaseModel, Field, TypeAdapter, PrivateAttr
+from typing import Literal, List, Annotated, Optional, BinaryIO
 from datetime import datetime
 from pydantic import model_validator, ConfigDict, field_serializer
+import base64
+import builtins
 from uuid import uuid4
 from enum import Enum
 from typing_extensions import Self
@@ -18,6 +20,16 @@ class TaskState(str, Enum):
     UNKNOWN = "unknown"
 
 
+# States after which a task sends no more updates without new input.
+FINAL_TASK_STATES = frozenset(
+    {
+        TaskState.COMPLETED,
+        TaskState.CANCELED,
+        TaskState.FAILED,
+        TaskState.INPUT_REQUIRED,
+    }
+)
+
 class TextPart(BaseModel):
     type: Literal["text"] = "text"
     text: str
@@ -30,6 +42,11 @@ class FileContent(BaseModel):
     bytes: str | None = None
     uri: str | None = None
 
+    # bytes holds the base64 encoded contents and is what gets serialized. The decoded
+    # contents are computed on first access and cached for the string they came from.
+    _decoded: Optional[builtins.bytes] = PrivateAttr(default=None)
+    _decoded_from: Optional[str] = PrivateAttr(default=None)
+
     @model_validator(mode="after")
     def check_content(self) -> Self:
         if not (self.bytes or self.uri):
@@ -40,6 +57,58 @@ class FileContent(BaseModel):
             )
         return self
 
+    @classmethod
+    def from_bytes(
+        cls, data: builtins.bytes, name: str | None = None, mimeType: str | None = None
+    ) -> "FileContent":
+        """Creates file content from raw bytes, keeping them as the decoded contents."""
+        content = cls(name=name, mimeType=mimeType, bytes=base64.b64encode(data).decode("ascii"))
+        content._decoded = data
+        content._decoded_from = content.bytes
+        return content
+
+    @property
+    def decoded_bytes(self) -> builtins.bytes | None:
+        """The decoded contents, or None for file content referenced by uri."""
+        if self.bytes is None:
+            return None
+        if self._decoded is None or self._decoded_from is not self.bytes:
+            self._decoded = base64.b64decode(self.bytes)
+            self._decoded_from = self.bytes
+        return self._decoded
+
+    @property
+    def decoded(self) -> memoryview | None:
+        """A zero-copy view of the decoded contents."""
+        data = self.decoded_bytes
+        return memoryview(data) if data is not None else None
+
+    def write_decoded(self, file: BinaryIO, chunk_size: int = 64 * 1024) -> int:
+        """Writes the decoded contents to a binary file and returns the number of bytes written.
+
+        Contents that were not decoded yet are decoded chunk by chunk, without holding the
+        whole decoded file in memory.
+        """
+        if self.bytes is None:
+            raise ValueError("File content referenced by uri has no inline bytes")
+        if self._decoded is not None and self._decoded_from is self.bytes:
+            return file.write(self._decoded)
+
+        # 4 base64 characters decode to 3 bytes, so aligned slices decode independently.
+        encoded_chunk_size = max(4, chunk_size // 3 * 4)
+        written = 0
+        for start in range(0, len(self.bytes), encoded_chunk_size):
+            written += file.write(
+                base64.b64decode(self.bytes[start : start + encoded_chunk_size])
+            )
+        return written
+
+    def __eq__(self, other: Any) -> bool:
+        # The decoded cache is not part of the value.
+        if not isinstance(other, FileContent):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
+
 
 class FilePart(BaseModel):
     type: Literal["file"] = "file"
@@ -89,6 +158,47 @@ class Task(BaseModel):
     artifacts: List[Artifact] | None = None
     history: List[Message] | None = None
     metadata: dict[str, Any] | None = None
+    # Increases with every change to the task, see TaskQueryParams.ifVersionNewerThan.
+    version: int | None = None
+
+    def apply_delta(self, delta: "TaskDelta", history_length: int | None = None) -> Self:
+        """Returns a copy of the task with the changes in delta applied.
+
+        Args:
+            delta: Changes since the version of this task.
+            history_length: Number of most recent history messages to keep, all if None.
+        """
+        history = None
+        if self.history is not None or delta.history:
+            history = (self.history or []) + (delta.history or [])
+            if history_length is not None:
+                history = history[-history_length:] if history_length > 0 else []
+        artifacts = self.artifacts
+        if delta.artifacts:
+            artifacts = (artifacts or []) + delta.artifacts
+        return self.model_copy(
+            update={
+                "status": delta.status or self.status,
+                "history": history,
+                "artifacts": artifacts,
+                "version": delta.version,
+            }
+        )
+
+
+class TaskDelta(BaseModel):
+    """The changes to a task since baseVersion, see TaskQueryParams.ifVersionNewerThan.
+
+    status is only set if it changed, history and artifacts only hold the entries added since
+    baseVersion. A delta whose version equals baseVersion means the task is not modified.
+    """
+
+    id: str
+    version: int
+    baseVersion: int
+    status: TaskStatus | None = None
+    history: List[Message] | None = None
+    artifacts: List[Artifact] | None = None
 
 
 class TaskStatusUpdateEvent(BaseModel):
@@ -124,6 +234,16 @@ class TaskIdParams(BaseModel):
 
 class TaskQueryParams(TaskIdParams):
     historyLength: int | None = None
+    # Seconds to wait for the task to change before answering, unless it is in a final state.
+    waitTimeout: float | None = None
+    # Answer with a TaskDelta of the changes since this version of the task, which is not
+    # modified if there are none. Agents answer with the whole task if they cannot tell.
+    ifVersionNewerThan: int | None = None
+
+
+# A tasks/send whose params metadata carries this key may be retried, the server answers a
+# repeated key for the same task with the response to the first request.
+IDEMPOTENCY_KEY = "idempotencyKey"
 
 
 class TaskSendParams(BaseModel):
@@ -141,6 +261,21 @@ class TaskPushNotificationConfig(BaseModel):
     pushNotificationConfig: PushNotificationConfig
 
 
+class TaskListParams(BaseModel):
+    sessionId: str | None = None
+    state: TaskState | None = None
+    cursor: str | None = None
+    pageSize: int = Field(default=50, ge=1, le=1000)
+    historyLength: int | None = None
+    includeArtifacts: bool = True
+    metadata: dict[str, Any] | None = None
+
+
+class TaskListResult(BaseModel):
+    tasks: List[Task]
+    nextCursor: str | None = None
+
+
 ## RPC Messages
 
 
@@ -189,7 +324,8 @@ class GetTaskRequest(JSONRPCRequest):
 
 
 class GetTaskResponse(JSONRPCResponse):
-    result: Task | None = None
+    # A TaskDelta is recognized by its baseVersion, which tasks do not have.
+    result: TaskDelta | Task | None = Field(default=None, union_mode="left_to_right")
 
 
 class CancelTaskRequest(JSONRPCRequest):
@@ -224,6 +360,15 @@ class TaskResubscriptionRequest(JSONRPCRequest):
     params: TaskIdParams
 
 
+class ListTasksRequest(JSONRPCRequest):
+    method: Literal["tasks/list",] = "tasks/list"
+    params: TaskListParams = Field(default_factory=TaskListParams)
+
+
+class ListTasksResponse(JSONRPCResponse):
+    result: TaskListResult | None = None
+
+
 A2ARequest = TypeAdapter(
     Annotated[
         Union[
@@ -234,6 +379,7 @@ A2ARequest = TypeAdapter(
             GetTaskPushNotificationRequest,
             TaskResubscriptionRequest,
             SendTaskStreamingRequest,
+            ListTasksRequest,
         ],
         Field(discriminator="method"),
     ]
@@ -359,6 +505,15 @@ class A2AClientJSONError(A2AClientError):
         super().__init__(f"JSON Error: {message}")
 
 
+class A2AClientCircuitOpenError(A2AClientError):
+    def __init__(self, url: str, retry_after: float):
+        self.url = url
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuit open for {url}, not calling it for {retry_after:.1f}s"
+        )
+
+
 class MissingAPIKeyError(Exception):
     """Exception for missing API key."""
 
@@ -0,0 +1,182 @@
+"""Splitting of large artifacts into streamable chunks and their reassembly.
+
+Chunks follow the protocol's artifact streaming fields: the first chunk has
+append unset, following chunks have append=True and the last one has
+lastChunk=True. A part that is too large for one chunk is split into
+fragments. The first fragment keeps the part's metadata, every following
+fragment is marked with PART_CONTINUATION_METADATA_KEY so it can be joined
+back onto the previous part. File bytes are split on base64 quantum
+boundaries, so every fragment is valid base64 on its own.
+
+Chunking is opt-in: only clients that reassemble the chunks, such as
+A2AClient.send_task_streaming with reassemble_artifacts=True, see the
+artifact as it was produced.
+"""
+
+from typing import Iterator
+
+from common.types import (
+    Artifact,
+    DataPart,
+    FileContent,
+    FilePart,
+    Part,
+    TaskArtifactUpdateEvent,
+    TextPart,
+)
+
+PART_CONTINUATION_METADATA_KEY = "partContinuation"
+DEFAULT_ARTIFACT_CHUNK_SIZE = 256 * 1024
+
+
+def _part_size(part: Part) -> int:
+    if isinstance(part, TextPart):
+        return len(part.text)
+    if isinstance(part, FilePart):
+        return len(part.file.bytes or "")
+    return 0
+
+
+def _split_part(part: Part, max_chunk_size: int) -> Iterator[Part]:
+    """Yields the fragments of a part, none larger than max_chunk_size."""
+    if isinstance(part, TextPart) and len(part.text) > max_chunk_size:
+        for start in range(0, len(part.text), max_chunk_size):
+            yield TextPart(
+                text=part.text[start : start + max_chunk_size],
+                metadata=part.metadata
+                if start == 0
+                else {PART_CONTINUATION_METADATA_KEY: True},
+            )
+    elif (
+        isinstance(part, FilePart)
+        and part.file.bytes
+        and len(part.file.bytes) > max_chunk_size
+    ):
+        # Keep fragments aligned to 4 characters so each one decodes on its own.
+        fragment_size = max(4, max_chunk_size - max_chunk_size % 4)
+        for start in range(0, len(part.file.bytes), fragment_size):
+            yield FilePart(
+                file=FileContent(
+                    name=part.file.name,
+                    mimeType=part.file.mimeType,
+                    bytes=part.file.bytes[start : start + fragment_size],
+                ),
+                metadata=part.metadata
+                if start == 0
+                else {PART_CONTINUATION_METADATA_KEY: True},
+            )
+    else:
+        yield part
+
+
+def chunk_artifact(
+    task_id: str,
+    artifact: Artifact,
+    max_chunk_size: int | None = DEFAULT_ARTIFACT_CHUNK_SIZE,
+) -> list[TaskArtifactUpdateEvent]:
+    """Splits an artifact into artifact update events of bounded size.
+
+    Artifacts that already fit into one chunk, or any artifact if max_chunk_size
+    is None, are returned as a single event unchanged.
+    """
+    if max_chunk_size is None or sum(_part_size(part) for part in artifact.parts) <= max_chunk_size:
+        return [TaskArtifactUpdateEvent(id=task_id, artifact=artifact)]
+
+    chunks: list[list[Part]] = [[]]
+    chunk_size = 0
+    for part in artifact.parts:
+        for fragment in _split_part(part, max_chunk_size):
+            fragment_size = _part_size(fragment)
+            if chunks[-1] and chunk_size + fragment_size > max_chunk_size:
+                chunks.append([])
+                chunk_size = 0
+            chunks[-1].append(fragment)
+            chunk_size += fragment_size
+
+    events = []
+    for i, parts in enumerate(chunks):
+        is_first = i == 0
+        is_last = i == len(chunks) - 1
+        events.append(
+            TaskArtifactUpdateEvent(
+                id=task_id,
+                artifact=Artifact(
+                    name=artifact.name if is_first else None,
+                    description=artifact.description if is_first else None,
+                    metadata=artifact.metadata if is_first else None,
+                    parts=parts,
+                    index=artifact.index,
+                    append=artifact.append if is_first else True,
+                    lastChunk=(
+                        True if artifact.lastChunk is None else artifact.lastChunk
+                    )
+                    if is_last
+                    else False,
+                ),
+            )
+        )
+    return events
+
+
+class ArtifactAssembler:
+    """Reassembles chunked artifacts from a stream of artifact update events."""
+
+    def __init__(self):
+        # (task id, artifact index) -> artifact being assembled and the fragments of each part
+        self._pending: dict[tuple[str, int], tuple[Artifact, list[list[Part]]]] = {}
+
+    def add(self, event: TaskArtifactUpdateEvent) -> Artifact | None:
+        """Adds a chunk and returns the complete artifact once its last chunk arrived."""
+        artifact = event.artifact
+        key = (event.id, artifact.index)
+        if not artifact.append and (artifact.lastChunk is None or artifact.lastChunk):
+            # The entire payload in one event, nothing to assemble.
+            self._pending.pop(key, None)
+            return artifact
+
+        if not artifact.append or key not in self._pending:
+            self._pending[key] = (artifact, [])
+        pending_artifact, fragments = self._pending[key]
+        self._group_fragments(artifact.parts, fragments)
+
+        if not artifact.lastChunk:
+            return None
+
+        del self._pending[key]
+        return self._assemble(pending_artifact, fragments)
+
+    @staticmethod
+    def _group_fragments(parts: list[Part], fragments: list[list[Part]]):
+        for part in parts:
+            if part.metadata and part.metadata.get(PART_CONTINUATION_METADATA_KEY) and fragments:
+                fragments[-1].append(part)
+            else:
+                fragments.append([part])
+
+    @staticmethod
+    def _join_fragments(fragments: list[Part]) -> Part:
+        first = fragments[0]
+        if len(fragments) == 1 or isinstance(first, DataPart):
+            return first
+        if isinstance(first, TextPart):
+            return TextPart(
+                text="".join(fragment.text for fragment in fragments),
+                metadata=first.metadata,
+            )
+        return FilePart(
+            file=FileContent(
+                name=first.file.name,
+                mimeType=first.file.mimeType,
+                bytes="".join(fragment.file.bytes for fragment in fragments),
+            ),
+            metadata=first.metadata,
+        )
+
+    def _assemble(self, artifact: Artifact, fragments: list[list[Part]]) -> Artifact:
+        return Artifact(
+            name=artifact.name,
+            description=artifact.description,
+            metadata=artifact.metadata,
+            parts=[self._join_fragments(part_fragments) for part_fragments in fragments],
+            index=artifact.index,
+        )
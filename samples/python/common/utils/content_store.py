@@ -0,0 +1,72 @@
+"""Content-addressed store for file contents."""
+
+import hashlib
+import threading
+from typing import Dict, Optional
+
+
+class ContentStore:
+    """A thread-safe, append-only store of file contents keyed by hash.
+
+    Storing contents that are already present returns the copy held by the
+    store instead of keeping a second one, so identical files sent across
+    turns, tasks and sessions are held in memory once. Contents are never
+    freed: the task store and the UI cache that share them keep their tasks
+    and messages for the life of the process and would hold them anyway.
+    """
+
+    def __init__(self):
+        # digest -> contents
+        self._entries: Dict[str, str] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def digest(contents: str) -> str:
+        """Return the key under which contents are stored."""
+        return hashlib.sha256(contents.encode("utf-8")).hexdigest()
+
+    def intern(self, contents: str) -> tuple[str, str]:
+        """Store contents unless identical contents are stored already.
+
+        Args:
+            contents: The file contents, usually base64 encoded bytes.
+
+        Returns:
+            The digest of the contents and the shared copy to keep instead of contents.
+        """
+        digest = self.digest(contents)
+        with self._lock:
+            return digest, self._entries.setdefault(digest, contents)
+
+    def get(self, digest: str) -> Optional[str]:
+        """Return the contents stored under digest."""
+        with self._lock:
+            return self._entries.get(digest)
+
+    @property
+    def size(self) -> int:
+        """Total length of all stored contents."""
+        with self._lock:
+            return sum(len(contents) for contents in self._entries.values())
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            return digest in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_shared_content_store: Optional[ContentStore] = None
+_shared_content_store_lock = threading.Lock()
+
+
+def get_content_store() -> ContentStore:
+    """Return the content store shared by task storage, caches and the UI in this process."""
+    global _shared_content_store
+    if _shared_content_store is None:
+        with _shared_content_store_lock:
+            if _shared_content_store is None:
+                _shared_content_store = ContentStore()
+    return _shared_content_store
@@ -10,34 +10,101 @@ import json
 import hashlib
 import httpx
 import logging
+import asyncio
 
-from jwt import PyJWK, PyJWKClient
+from jwt import PyJWK, PyJWKSet
+
+from common.utils.replay_cache import TokenReplayCache
 
 logger = logging.getLogger(__name__)
 AUTH_HEADER_PREFIX = 'Bearer '
+# How long a push-notification URL stays verified before it is challenged again.
+VERIFIED_URL_TTL_SECONDS = 60 * 60
+# Failed verifications are cached for a shorter time so a fixed endpoint recovers quickly.
+FAILED_URL_TTL_SECONDS = 60
+# Minimum time between two JWKS refreshes triggered by tokens signed with an unknown key.
+JWKS_REFRESH_MIN_INTERVAL_SECONDS = 30
+# Push-notifications older than this are rejected, and token ids are remembered this long.
+PUSH_NOTIFICATION_MAX_AGE_SECONDS = 60 * 5
+# Clock skew tolerated for tokens issued by a sender whose clock is ahead.
+PUSH_NOTIFICATION_CLOCK_LEEWAY_SECONDS = 30
 
 class PushNotificationAuth:
-    def _calculate_request_body_sha256(self, data: dict[str, Any]):
-        """Calculates the SHA256 hash of a request body.
-
-        This logic needs to be same for both the agent who signs the payload and the client verifier.
-        """
-        body_str = json.dumps(
+    @staticmethod
+    def _serialize_request_body(data: dict[str, Any]) -> bytes:
+        """Serializes a request body to the canonical form that is hashed and sent on the wire."""
+        return json.dumps(
             data,
             ensure_ascii=False,
             allow_nan=False,
             indent=None,
             separators=(",", ":"),
-        )
-        return hashlib.sha256(body_str.encode()).hexdigest()
+        ).encode()
+
+    def _calculate_request_body_sha256(self, data: dict[str, Any]):
+        """Calculates the SHA256 hash of a request body.
+
+        This logic needs to be same for both the agent who signs the payload and the client verifier.
+        """
+        return hashlib.sha256(self._serialize_request_body(data)).hexdigest()
 
 class PushNotificationSenderAuth(PushNotificationAuth):
-    def __init__(self):
+    def __init__(
+        self,
+        verified_url_ttl: float = VERIFIED_URL_TTL_SECONDS,
+        failed_url_ttl: float = FAILED_URL_TTL_SECONDS,
+    ):
         self.public_keys = []
         self.private_key_jwk: PyJWK = None
+        self.verified_url_ttl = verified_url_ttl
+        self.failed_url_ttl = failed_url_ttl
+        # url -> (is_verified, expires_at)
+        self._url_verifications: dict[str, tuple[bool, float]] = {}
+        self._pending_url_verifications: dict[str, asyncio.Task] = {}
+
+    async def verify_push_notification_url(self, url: str) -> bool:
+        """Verifies the ownership of a push-notification URL.
+
+        Results are cached per URL (failures for a shorter time) and concurrent
+        verifications of the same URL share a single challenge request.
+        """
+        cached = self._url_verifications.get(url)
+        if cached is not None:
+            is_verified, expires_at = cached
+            if time.monotonic() < expires_at:
+                return is_verified
+            del self._url_verifications[url]
+
+        verification = self._pending_url_verifications.get(url)
+        if verification is None:
+            verification = asyncio.create_task(self._challenge_push_notification_url(url))
+            self._pending_url_verifications[url] = verification
+            verification.add_done_callback(
+                lambda task: self._record_url_verification(url, task)
+            )
+
+        # Shield the shared challenge so one cancelled caller does not cancel it for the others.
+        return await asyncio.shield(verification)
+
+    def _record_url_verification(self, url: str, verification: asyncio.Task):
+        self._pending_url_verifications.pop(url, None)
+        if verification.cancelled() or verification.exception() is not None:
+            return
+
+        is_verified = verification.result()
+        ttl = self.verified_url_ttl if is_verified else self.failed_url_ttl
+        now = time.monotonic()
+        for cached_url, (_, expires_at) in list(self._url_verifications.items()):
+            if expires_at <= now:
+                del self._url_verifications[cached_url]
+        self._url_verifications[url] = (is_verified, now + ttl)
+
+    def invalidate_push_notification_url(self, url: str):
+        """Forgets a cached verification so the next use of the URL is challenged again."""
+        self._url_verifications.pop(url, None)
 
     @staticmethod
-    async def verify_push_notification_url(url: str) -> bool:
+    async def _challenge_push_notification_url(url: str) -> bool:
         async with httpx.AsyncClient(timeout=10) as client:
             try:
                 validation_token = str(uuid.uuid4())
@@ -71,65 +138,163 @@ class PushNotificationSenderAuth(PushNotificationAuth):
         """JWT is generated by signing both the request payload SHA digest and time of token generation.
 
         Payload is signed with private key and it ensures the integrity of payload for client.
-        Including iat prevents from replay attack.
+        Including iat and a unique jti prevents from replay attack.
         """
-        
+        return self._sign_request_body(self._serialize_request_body(data))
+
+    def _sign_request_body(self, body: bytes):
         iat = int(time.time())
 
         return jwt.encode(
-            {"iat": iat, "request_body_sha256": self._calculate_request_body_sha256(data)},
+            {
+                "iat": iat,
+                "jti": uuid.uuid4().hex,
+                "request_body_sha256": hashlib.sha256(body).hexdigest(),
+            },
             key=self.private_key_jwk,
             headers={"kid": self.private_key_jwk.key_id},
             algorithm="RS256"
         )
 
     async def send_push_notification(self, url: str, data: dict[str, Any]):
-        jwt_token = self._generate_jwt(data)
-        headers = {'Authorization': f"Bearer {jwt_token}"}
+        # Send exactly the canonical bytes that were hashed so receivers can verify them without re-serializing.
+        body = self._serialize_request_body(data)
+        jwt_token = self._sign_request_body(body)
+        headers = {'Authorization': f"Bearer {jwt_token}", 'Content-Type': 'application/json'}
         async with httpx.AsyncClient(timeout=10) as client: 
             try:
                 response = await client.post(
                     url,
-                    json=data,
+                    content=body,
                     headers=headers
                 )
                 response.raise_for_status()
                 logger.info(f"Push-notification sent for URL: {url}")                            
             except Exception as e:
                 logger.warning(f"Error during sending push-notification for URL {url}: {e}")
+                # The endpoint may have changed hands, re-verify it before it is trusted again.
+                self.invalidate_push_notification_url(url)
 
 class PushNotificationReceiverAuth(PushNotificationAuth):
-    def __init__(self):
+    def __init__(
+        self,
+        jwks_refresh_interval: float = JWKS_REFRESH_MIN_INTERVAL_SECONDS,
+        verify_in_thread: bool = False,
+        replay_cache: TokenReplayCache | None = None,
+    ):
         self.public_keys_jwks = []
-        self.jwks_client = None
+        self.jwks_url: str | None = None
+        self.signing_keys: dict[str, PyJWK] = {}
+        self.jwks_refresh_interval = jwks_refresh_interval
+        # Offload signature verification to the default thread pool so the event loop keeps serving.
+        self.verify_in_thread = verify_in_thread
+        self._last_jwks_refresh: float | None = None
+        self._jwks_refresh_lock = asyncio.Lock()
+        self.replay_cache = replay_cache or TokenReplayCache(
+            window_seconds=PUSH_NOTIFICATION_MAX_AGE_SECONDS
+        )
 
     async def load_jwks(self, jwks_url: str):
-        self.jwks_client = PyJWKClient(jwks_url)
-    
+        self.jwks_url = jwks_url
+        try:
+            await self._refresh_jwks()
+        except Exception as e:
+            # Keys are fetched again on the first notification signed with an unknown key.
+            logger.warning(f"Error while loading JWKS from {jwks_url}: {e}")
+
+    async def _fetch_jwks(self) -> dict[str, Any]:
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.get(self.jwks_url)
+            response.raise_for_status()
+            return response.json()
+
+    async def _refresh_jwks(self):
+        self._last_jwks_refresh = time.monotonic()
+        jwks = await self._fetch_jwks()
+        jwk_set = PyJWKSet.from_dict(jwks)
+        self.public_keys_jwks = jwks["keys"]
+        self.signing_keys = {key.key_id: key for key in jwk_set.keys}
+        logger.info(f"Loaded {len(self.signing_keys)} signing keys from {self.jwks_url}")
+
+    async def _get_signing_key(self, kid: str | None) -> PyJWK:
+        signing_key = self.signing_keys.get(kid)
+        if signing_key is not None:
+            return signing_key
+
+        async with self._jwks_refresh_lock:
+            # Another notification may have refreshed the keys while we waited.
+            signing_key = self.signing_keys.get(kid)
+            if signing_key is not None:
+                return signing_key
+
+            if (
+                self._last_jwks_refresh is None
+                or time.monotonic() - self._last_jwks_refresh >= self.jwks_refresh_interval
+            ):
+                await self._refresh_jwks()
+
+        signing_key = self.signing_keys.get(kid)
+        if signing_key is None:
+            raise ValueError(f"Unknown signing key: {kid}")
+        return signing_key
+
+    @staticmethod
+    def _decode_token(token: str, signing_key: PyJWK) -> dict[str, Any]:
+        return jwt.decode(
+            token,
+            signing_key,
+            options={"require": ["iat", "request_body_sha256"]},
+            algorithms=["RS256"],
+            leeway=PUSH_NOTIFICATION_CLOCK_LEEWAY_SECONDS,
+        )
+
     async def verify_push_notification(self, request: Request) -> bool:
+        is_verified, _ = await self.verify_and_parse_push_notification(request)
+        return is_verified
+
+    async def verify_and_parse_push_notification(
+        self, request: Request
+    ) -> tuple[bool, dict[str, Any] | None]:
+        """Verifies a push-notification and returns the verdict together with the parsed payload.
+
+        The raw request body is hashed as received and parsed once. Bodies from senders that do not
+        send the canonical serialization fall back to hashing the re-serialized payload.
+        """
         auth_header = request.headers.get("Authorization")
         if not auth_header or not auth_header.startswith(AUTH_HEADER_PREFIX):
             print("Invalid authorization header")
-            return False
+            return False, None
         
         token = auth_header[len(AUTH_HEADER_PREFIX):]
-        signing_key = self.jwks_client.get_signing_key_from_jwt(token)
+        signing_key = await self._get_signing_key(jwt.get_unverified_header(token).get("kid"))
 
-        decode_token = jwt.decode(
-            token,
-            signing_key,
-            options={"require": ["iat", "request_body_sha256"]},
-            algorithms=["RS256"],
-        )
+        if self.verify_in_thread:
+            decode_token = await asyncio.to_thread(self._decode_token, token, signing_key)
+        else:
+            decode_token = self._decode_token(token, signing_key)
 
-        actual_body_sha256 = self._calculate_request_body_sha256(await request.json())
-        if actual_body_sha256 != decode_token["request_body_sha256"]:
+        body = await request.body()
+        data = json.loads(body)
+        if (
+            hashlib.sha256(body).hexdigest() != decode_token["request_body_sha256"]
+            and self._calculate_request_body_sha256(data) != decode_token["request_body_sha256"]
+        ):
             # Payload signature does not match the digest in signed token.
             raise ValueError("Invalid request body")
         
-        if time.time() - decode_token["iat"] > 60 * 5:
+        now = time.time()
+        if now - decode_token["iat"] > PUSH_NOTIFICATION_MAX_AGE_SECONDS:
             # Do not allow push-notifications older than 5 minutes.
             # This is to prevent replay attack.
             raise ValueError("Token is expired")
+        if decode_token["iat"] - now > PUSH_NOTIFICATION_CLOCK_LEEWAY_SECONDS:
+            # A token from the future would stay valid longer than the replay cache keeps it.
+            raise ValueError("Token is issued in the future")
+
+        # Reject tokens already seen within the window. Tokens from senders that
+        # do not include a jti are identified by their signature.
+        jti = decode_token.get("jti") or token.rsplit(".", 1)[-1]
+        if not self.replay_cache.add(jti, decode_token["iat"], now):
+            raise ValueError("Token has already been used")
         
-        return True
+        return True, data
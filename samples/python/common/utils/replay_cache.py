@@ -0,0 +1,76 @@
+"""Replay protection cache utility."""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class TokenReplayCache:
+    """A thread-safe cache of token ids (jti) seen within a validity window.
+
+    Token ids are grouped into time buckets by the time they expire, and whole
+    buckets are dropped once they fall out of the window. Memory is therefore
+    bounded by the number of tokens accepted within one window, no matter how
+    long the receiver runs, as long as the receiver rejects tokens issued
+    further in the future than a small leeway.
+    """
+
+    def __init__(self, window_seconds: float = 60 * 5, bucket_seconds: float = 10):
+        """Initialize the cache.
+
+        Args:
+            window_seconds: How long a token is accepted after it was issued.
+            bucket_seconds: Width of one expiry bucket. Smaller buckets evict
+                more precisely at the cost of more frequent evictions.
+        """
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self._seen: Dict[str, int] = {}
+        self._buckets: Dict[int, List[str]] = {}
+        self._evicted_until: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def add(self, jti: str, issued_at: float, now: Optional[float] = None) -> bool:
+        """Record a token id.
+
+        Args:
+            jti: The unique id of the token.
+            issued_at: The time the token was issued, in seconds since the epoch.
+            now: The current time, defaults to time.time().
+
+        Returns:
+            True if the token id was not seen within the window, False if it is a replay.
+        """
+        if now is None:
+            now = time.time()
+        # A token issued ahead of the receiver's clock stays valid until issued_at + window.
+        expires_at = max(issued_at, now) + self.window_seconds
+        bucket_id = int(expires_at // self.bucket_seconds)
+
+        with self._lock:
+            self._evict_expired(now)
+            if jti in self._seen:
+                return False
+            self._seen[jti] = bucket_id
+            self._buckets.setdefault(bucket_id, []).append(jti)
+            return True
+
+    def _evict_expired(self, now: float) -> None:
+        current_bucket_id = int(now // self.bucket_seconds)
+        if current_bucket_id <= self._evicted_until:
+            return
+
+        for bucket_id in [b for b in self._buckets if b < current_bucket_id]:
+            for jti in self._buckets.pop(bucket_id):
+                del self._seen[jti]
+        self._evicted_until = current_bucket_id
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._seen)
+
+    def clear(self) -> None:
+        """Remove all token ids."""
+        with self._lock:
+            self._seen.clear()
+            self._buckets.clear()
@@ -0,0 +1,160 @@
+"""Routes requests to the agent whose skills match them, without asking a model."""
+
+from collections import Counter
+import math
+import re
+import threading
+
+from common.types import AgentCard
+
+# Words that say nothing about which agent should handle a request.
+STOPWORDS = frozenset(
+    """
+    a an and are as at be by can could do for from get give help how i in is it me my of on
+    or please some that the this to what which with would you your
+    """.split()
+)
+# Tags name the skill most directly, so they count as if they appeared this often.
+TAG_WEIGHT = 2
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase words of text without stopwords, plurals reduced to the singular."""
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class RouterMetrics:
+    """Counters of how requests were routed."""
+
+    def __init__(self):
+        self.requests = 0
+        # Routed directly to an agent.
+        self.hits = 0
+        # Matched several agents too closely to pick one.
+        self.ambiguous = 0
+        # Matched no agent well enough.
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {**vars(self), "hit_rate": self.hit_rate}
+
+
+class SkillRouter:
+    """Picks the agent for a request from the skills in the agent cards, using BM25.
+
+    Every skill is a document made of its name, description, tags and examples, and so is
+    the description of each agent. An agent scores as its best matching document. A request
+    is routed only if the best agent scores at least min_score and min_margin times as much
+    as the runner-up; otherwise route returns None and the caller should let a model decide.
+
+    Thread-safe, hosts may route turns from several threads.
+
+    Args:
+        min_score: Lowest BM25 score that routes a request.
+        min_margin: How many times the runner-up's score the best agent must score.
+        k1: BM25 term frequency saturation.
+        b: BM25 document length normalization.
+    """
+
+    def __init__(
+        self,
+        min_score: float = 1.5,
+        min_margin: float = 2.0,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.k1 = k1
+        self.b = b
+        self.metrics = RouterMetrics()
+        self._documents: dict[str, list[Counter]] = {}
+        self._document_frequency: Counter = Counter()
+        self._average_length = 0.0
+        self._lock = threading.Lock()
+
+    def add_agent(self, card: AgentCard):
+        """Indexes the skills of an agent, replacing those indexed before under its name."""
+        documents = []
+        for skill in card.skills:
+            text = " ".join([skill.name, skill.description or "", *(skill.examples or [])])
+            tokens = tokenize(text)
+            for tag in skill.tags or []:
+                tokens.extend(tokenize(tag) * TAG_WEIGHT)
+            documents.append(Counter(tokens))
+        if card.description:
+            documents.append(Counter(tokenize(card.description)))
+        with self._lock:
+            self._documents[card.name] = [document for document in documents if document]
+            self._reindex()
+
+    def remove_agent(self, name: str):
+        with self._lock:
+            if self._documents.pop(name, None) is not None:
+                self._reindex()
+
+    def scores(self, request: str) -> list[tuple[str, float]]:
+        """The agents matching request with their scores, best first."""
+        terms = set(tokenize(request))
+        with self._lock:
+            count = sum(len(documents) for documents in self._documents.values())
+            idf = {
+                term: math.log(
+                    1 + (count - self._document_frequency[term] + 0.5)
+                    / (self._document_frequency[term] + 0.5)
+                )
+                for term in terms
+                if term in self._document_frequency
+            }
+            scores = []
+            for name, documents in self._documents.items():
+                score = max((self._score(document, idf) for document in documents), default=0.0)
+                if score > 0:
+                    scores.append((name, score))
+        return sorted(scores, key=lambda item: item[1], reverse=True)
+
+    def route(self, request: str) -> str | None:
+        """The name of the agent that clearly matches request, None if none does."""
+        scores = self.scores(request)
+        with self._lock:
+            self.metrics.requests += 1
+            if not scores or scores[0][1] < self.min_score:
+                self.metrics.misses += 1
+                return None
+            if len(scores) > 1 and scores[0][1] < self.min_margin * scores[1][1]:
+                self.metrics.ambiguous += 1
+                return None
+            self.metrics.hits += 1
+            return scores[0][0]
+
+    def _score(self, document: Counter, idf: dict[str, float]) -> float:
+        length = sum(document.values())
+        norm = self.k1 * (1 - self.b + self.b * length / self._average_length)
+        score = 0.0
+        for term, weight in idf.items():
+            frequency = document.get(term, 0)
+            if frequency:
+                score += weight * frequency * (self.k1 + 1) / (frequency + norm)
+        return score
+
+    def _reindex(self):
+        documents = [document for docs in self._documents.values() for document in docs]
+        self._document_frequency = Counter(term for document in documents for term in document)
+        self._average_length = (
+            sum(sum(document.values()) for document in documents) / len(documents)
+            if documents
+            else 0.0
+        )
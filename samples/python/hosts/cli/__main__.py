@@ -6,7 +6,7 @@ import urllib
 from uuid import uuid4
 
 from common.client import A2AClient, A2ACardResolver
-from common.types import TaskState, Task, TextPart, FilePart, FileContent
+from common.types import TaskState, Task, TextPart, FilePart, FileContent, A2AClientHTTPError
 from common.utils.push_notification_auth import PushNotificationReceiverAuth
 
 
@@ -58,6 +58,8 @@ async def cli(agent, session, history, use_push_notifications: bool, push_notifi
             task_response = await client.get_task({"id": taskId, "historyLength": 10})
             print(task_response.model_dump_json(include={"result": {"history": True}}))
 
+    await client.aclose()
+
 async def completeTask(client: A2AClient, streaming, use_push_notifications: bool, notification_receiver_host: str, notification_receiver_port: int, taskId, sessionId):
     prompt = click.prompt(
         "\nWhat do you want to send to the agent? (:q or quit to exit)"
@@ -81,17 +83,23 @@ async def completeTask(client: A2AClient, streaming, use_push_notifications: boo
         show_default=False,
     )
     if file_path and file_path.strip() != "":
-        with open(file_path, "rb") as f:
-            file_content = base64.b64encode(f.read()).decode('utf-8')
-            file_name = os.path.basename(file_path)
+        try:
+            file = (await client.upload_file(file_path)).model_dump(exclude_none=True)
+        except A2AClientHTTPError as e:
+            if e.status_code not in (404, 405):
+                raise
+            # The agent does not accept uploads, send the file inline. upload_file asks the
+            # agent before sending the file, so this costs a HEAD request, not an upload.
+            with open(file_path, "rb") as f:
+                file = {
+                    "name": os.path.basename(file_path),
+                    "bytes": base64.b64encode(f.read()).decode('utf-8'),
+                }
         
         message["parts"].append(
             {
                 "type": "file",
-                "file": {
-                    "name": file_name,
-                    "bytes": file_content,
-                }
+                "file": file,
             }
         )
  
@@ -115,7 +123,7 @@ async def completeTask(client: A2AClient, streaming, use_push_notifications: boo
         response_stream = client.send_task_streaming(payload)
         async for result in response_stream:
             print(f"stream event => {result.model_dump_json(exclude_none=True)}")
-        taskResult = await client.get_task({"id": taskId})
+        taskResult = await client.wait_for_task({"id": taskId})
     else:
         taskResult = await client.send_task(payload)
         print(f"\n{taskResult.model_dump_json(exclude_none=True)}")
@@ -58,9 +58,9 @@ class PushNotificationListener():
         return Response(content=validation_token, status_code=200)
     
     async def handle_notification(self, request: Request):
-        data = await request.json()
         try:
-            if not await self.notification_receiver_auth.verify_push_notification(request):
+            is_verified, data = await self.notification_receiver_auth.verify_and_parse_push_notification(request)
+            if not is_verified:
                 print("push notification verification failed")
                 return
         except Exception as e:
@@ -7,18 +7,20 @@ import threading
 from typing import List, Optional, Callable
 
 from google.genai import types
-import base64
 
 from google.adk import Agent
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
 from google.adk.tools.tool_context import ToolContext
 from .remote_agent_connection import (
     RemoteAgentConnections,
     TaskUpdateCallback
 )
 from common.client import A2ACardResolver
+from common.utils.skill_router import SkillRouter
 from common.types import (
     AgentCard,
     Message,
@@ -28,9 +30,12 @@ from common.types import (
     TextPart,
     DataPart,
     Part,
+    TaskStatus,
     TaskStatusUpdateEvent,
 )
 
+DEFAULT_AGENT_TIMEOUT = 120.0
+
 
 class HostAgent:
   """The host agent.
@@ -42,17 +47,26 @@ class HostAgent:
   def __init__(
       self,
       remote_agent_addresses: List[str],
-      task_callback: TaskUpdateCallback | None = None
+      task_callback: TaskUpdateCallback | None = None,
+      agent_timeout: float = DEFAULT_AGENT_TIMEOUT,
+      skill_router: SkillRouter | None = None,
   ):
     self.task_callback = task_callback
+    # Seconds send_tasks waits for each agent before reporting it as failed.
+    self.agent_timeout = agent_timeout
+    # Sends requests that clearly match the skills of one agent to it without
+    # asking the model first, see before_model_callback.
+    self.skill_router = skill_router
     self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
     self.cards: dict[str, AgentCard] = {}
-    for address in remote_agent_addresses:
-      card_resolver = A2ACardResolver(address)
-      card = card_resolver.get_agent_card()
+    # Resolve all agents concurrently, startup takes as long as the slowest one.
+    cards = A2ACardResolver.get_agent_cards(remote_agent_addresses)
+    for card in cards:
       remote_connection = RemoteAgentConnections(card)
       self.remote_agent_connections[card.name] = remote_connection
       self.cards[card.name] = card
+      if self.skill_router:
+        self.skill_router.add_agent(card)
     agent_info = []
     for ra in self.list_remote_agents():
       agent_info.append(json.dumps(ra))
@@ -62,6 +76,8 @@ class HostAgent:
     remote_connection = RemoteAgentConnections(card)
     self.remote_agent_connections[card.name] = remote_connection
     self.cards[card.name] = card
+    if self.skill_router:
+      self.skill_router.add_agent(card)
     agent_info = []
     for ra in self.list_remote_agents():
       agent_info.append(json.dumps(ra))
@@ -80,6 +96,7 @@ class HostAgent:
         tools=[
             self.list_remote_agents,
             self.send_task,
+            self.send_tasks,
         ],
     )
 
@@ -95,6 +112,8 @@ can use to delegate the task.
 Execution:
 - For actionable tasks, you can use `create_task` to assign tasks to remote agents to perform.
 Be sure to include the remote agent name when you respond to the user.
+- When the request has independent parts for different agents, use `send_tasks`
+to send them all at once instead of calling `send_task` for one after the other.
 
 You can use `check_pending_task_states` to check the states of the pending
 tasks.
@@ -105,11 +124,15 @@ Focus on the most recent parts of the conversation primarily.
 If there is an active agent, send the request to that agent with the update task tool.
 
 Agents:
-{self.agents}
+{self.available_agents()}
 
 Current agent: {current_agent['active_agent']}
 """
 
+  def available_agents(self) -> str:
+    """The agents that can currently take tasks, one JSON object per line."""
+    return '\n'.join(json.dumps(ra) for ra in self.list_remote_agents())
+
   def check_state(self, context: ReadonlyContext):
     state = context.state
     if ('session_id' in state and
@@ -119,12 +142,46 @@ Current agent: {current_agent['active_agent']}
       return {"active_agent": f'{state["agent"]}'}
     return {"active_agent": "None"}
 
-  def before_model_callback(self, callback_context: CallbackContext, llm_request):
+  def before_model_callback(
+      self, callback_context: CallbackContext, llm_request: LlmRequest
+  ) -> LlmResponse | None:
     state = callback_context.state
+    # An agent waiting for input gets the next message, let the model handle it.
+    routable = not state.get('session_active') or 'agent' not in state
     if 'session_active' not in state or not state['session_active']:
       if 'session_id' not in state:
         state['session_id'] = str(uuid.uuid4())
       state['session_active'] = True
+    if self.skill_router and routable:
+      return self.route_request(llm_request)
+    return None
+
+  def route_request(self, llm_request: LlmRequest) -> LlmResponse | None:
+    """Answers for the model with a send_task call if the skill router is sure.
+
+    Only the model call that starts a turn is answered, later calls see the
+    task's response and summarize it as usual.
+    """
+    if not llm_request.contents:
+      return None
+    content = llm_request.contents[-1]
+    if content.role != 'user' or not content.parts or any(
+        part.function_response for part in content.parts):
+      return None
+    message = '\n'.join(part.text for part in content.parts if part.text)
+    if not message:
+      return None
+    agent_name = self.skill_router.route(message)
+    if (agent_name is None or
+        not self.remote_agent_connections[agent_name].available):
+      return None
+    return LlmResponse(content=types.Content(
+        role='model',
+        parts=[types.Part(function_call=types.FunctionCall(
+            name='send_task',
+            args={'agent_name': agent_name, 'message': message},
+        ))],
+    ))
 
   def list_remote_agents(self):
     """List the available remote agents you can use to delegate the task."""
@@ -132,7 +189,10 @@ Current agent: {current_agent['active_agent']}
       return []
 
     remote_agent_info = []
-    for card in self.cards.values():
+    for name, card in self.cards.items():
+      # Leave out agents that are failing, calls to them would fail fast anyway.
+      if not self.remote_agent_connections[name].available:
+        continue
       remote_agent_info.append(
           {"name": card.name, "description": card.description}
       )
@@ -167,8 +227,96 @@ Current agent: {current_agent['active_agent']}
       taskId = state['task_id']
     else:
       taskId = str(uuid.uuid4())
+    request = self._task_request(taskId, message, state)
+    task = await client.send_task(request, self.task_callback)
+    # Assume completion unless a state returns that isn't complete
+    state['session_active'] = task.status.state not in [
+        TaskState.COMPLETED,
+        TaskState.CANCELED,
+        TaskState.FAILED,
+        TaskState.UNKNOWN,
+    ]
+    if task.status.state == TaskState.INPUT_REQUIRED:
+      # Force user input back
+      tool_context.actions.skip_summarization = True
+      tool_context.actions.escalate = True
+    elif task.status.state == TaskState.CANCELED:
+      # Open question, should we return some info for cancellation instead
+      raise ValueError(f"Agent {agent_name} task {task.id} is cancelled")
+    elif task.status.state == TaskState.FAILED:
+      # Raise error for failure
+      raise ValueError(f"Agent {agent_name} task {task.id} failed")
+    return task_response(task, tool_context)
+
+  async def send_tasks(
+      self,
+      tasks: list[dict],
+      tool_context: ToolContext):
+    """Sends tasks to several remote agents at once and waits for all of them.
+
+    Use this instead of several send_task calls when the request has
+    independent parts for different agents.
+
+    Args:
+      tasks: The tasks to send, each a dictionary with the "agent_name" of the
+        remote agent and the "message" to send to it.
+      tool_context: The tool context this method runs in.
+
+    Returns:
+      A list with a dictionary for each task, in the order the agents finished,
+      holding the "agent_name" and either the "state" and "response" of the
+      task or the "error" that prevented it.
+    """
+    for task in tasks:
+      if task.get("agent_name") not in self.remote_agent_connections:
+        raise ValueError(f"Agent {task.get('agent_name')} not found")
+    state = tool_context.state
+
+    async def send(agent_name: str, message: str) -> tuple[dict, Task | None]:
+      taskId = str(uuid.uuid4())
+      request = self._task_request(taskId, message, state)
+      # Every task gets its own message id, so the tasks are told apart by it,
+      # and remembers the message it was sent for.
+      metadata = request.message.metadata
+      metadata['last_message_id'] = metadata['message_id']
+      metadata['message_id'] = str(uuid.uuid4())
+      client = self.remote_agent_connections[agent_name]
+      try:
+        # Progress of each agent reaches task_callback while the others run.
+        task = await asyncio.wait_for(
+            client.send_task(request, self.task_callback), self.agent_timeout)
+      except asyncio.TimeoutError:
+        error = f"No answer within {self.agent_timeout} seconds"
+        self._report_failure(agent_name, request, error)
+        return {"agent_name": agent_name, "error": error}, None
+      except Exception as e:
+        self._report_failure(agent_name, request, str(e))
+        return {"agent_name": agent_name, "error": str(e)}, None
+      return {
+          "agent_name": agent_name,
+          "state": task.status.state.value,
+          "response": task_response(task, tool_context),
+      }, task
+
+    results = []
+    input_required = None
+    for sent in asyncio.as_completed(
+        [send(task["agent_name"], task["message"]) for task in tasks]):
+      result, task = await sent
+      results.append(result)
+      if task and task.status.state == TaskState.INPUT_REQUIRED:
+        input_required = result["agent_name"], task.id
+
+    state['session_active'] = input_required is not None
+    if input_required:
+      # The user answers the agent that asked, in its task, as after send_task.
+      state['agent'], state['task_id'] = input_required
+      tool_context.actions.skip_summarization = True
+      tool_context.actions.escalate = True
+    return results
+
+  def _task_request(self, taskId: str, message: str, state) -> TaskSendParams:
     sessionId = state['session_id']
-    task: Task
     messageId = ""
     metadata = {}
     if 'input_message_metadata' in state:
@@ -178,7 +326,7 @@ Current agent: {current_agent['active_agent']}
     if not messageId:
       messageId = str(uuid.uuid4())
     metadata.update(**{'conversation_id': sessionId, 'message_id': messageId})
-    request: TaskSendParams = TaskSendParams(
+    return TaskSendParams(
         id=taskId,
         sessionId=sessionId,
         message=Message(
@@ -190,32 +338,37 @@ Current agent: {current_agent['active_agent']}
         # pushNotification=None,
         metadata={'conversation_id': sessionId},
     )
-    task = await client.send_task(request, self.task_callback)
-    # Assume completion unless a state returns that isn't complete
-    state['session_active'] = task.status.state not in [
-        TaskState.COMPLETED,
-        TaskState.CANCELED,
-        TaskState.FAILED,
-        TaskState.UNKNOWN,
-    ]
-    if task.status.state == TaskState.INPUT_REQUIRED:
-      # Force user input back
-      tool_context.actions.skip_summarization = True
-      tool_context.actions.escalate = True
-    elif task.status.state == TaskState.CANCELED:
-      # Open question, should we return some info for cancellation instead
-      raise ValueError(f"Agent {agent_name} task {task.id} is cancelled")
-    elif task.status.state == TaskState.FAILED:
-      # Raise error for failure
-      raise ValueError(f"Agent {agent_name} task {task.id} failed")
-    response = []
-    if task.status.message:
-      # Assume the information is in the task message.
-      response.extend(convert_parts(task.status.message.parts, tool_context))
-    if task.artifacts:
-      for artifact in task.artifacts:
-        response.extend(convert_parts(artifact.parts, tool_context))
-    return response
+
+  def _report_failure(self, agent_name: str, request: TaskSendParams, error: str):
+    """Tells task_callback that a task failed without a final update from its agent."""
+    if not self.task_callback:
+      return
+    self.task_callback(TaskStatusUpdateEvent(
+        id=request.id,
+        status=TaskStatus(
+            state=TaskState.FAILED,
+            message=Message(
+                role="agent",
+                parts=[TextPart(text=error)],
+                metadata={
+                    'conversation_id': request.sessionId,
+                    'message_id': str(uuid.uuid4()),
+                },
+            ),
+        ),
+        final=True,
+        metadata=request.metadata,
+    ), self.cards[agent_name])
+
+def task_response(task: Task, tool_context: ToolContext):
+  response = []
+  if task.status.message:
+    # Assume the information is in the task message.
+    response.extend(convert_parts(task.status.message.parts, tool_context))
+  if task.artifacts:
+    for artifact in task.artifacts:
+      response.extend(convert_parts(artifact.parts, tool_context))
+  return response
 
 def convert_parts(parts: list[Part], tool_context: ToolContext):
   rval = []
@@ -232,7 +385,7 @@ def convert_part(part: Part, tool_context: ToolContext):
     # Repackage A2A FilePart to google.genai Blob
     # Currently not considering plain text as files    
     file_id = part.file.name
-    file_bytes = base64.b64decode(part.file.bytes)    
+    file_bytes = part.file.decoded_bytes
     file_part = types.Part(
       inline_data=types.Blob(
         mime_type=part.file.mimeType,
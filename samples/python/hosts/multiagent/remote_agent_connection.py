@@ -9,7 +9,12 @@ from common.types import (
     TaskStatus,
     TaskState,
 )
-from common.client import A2AClient
+from common.client import (
+    A2AClient,
+    CircuitBreaker,
+    IDEMPOTENCY_KEY,
+    RetryPolicy,
+)
 
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
@@ -18,7 +23,12 @@ class RemoteAgentConnections:
   """A class to hold the connections to the remote agents."""
 
   def __init__(self, agent_card: AgentCard):
-    self.agent_client = A2AClient(agent_card)
+    self.circuit_breaker = CircuitBreaker(agent_card.url)
+    self.agent_client = A2AClient(
+        agent_card,
+        retry_policy=RetryPolicy(),
+        circuit_breaker=self.circuit_breaker,
+    )
     self.card = agent_card
 
     self.conversation_name = None
@@ -28,6 +38,11 @@ class RemoteAgentConnections:
   def get_agent(self) -> AgentCard:
     return self.card
 
+  @property
+  def available(self) -> bool:
+    """False while the agent is failing and calls to it would fail fast."""
+    return self.circuit_breaker.available
+
   async def send_task(
       self,
       request: TaskSendParams,
@@ -45,7 +60,9 @@ class RemoteAgentConnections:
             ),
             history=[request.message],
         ), self.card)
-      async for response in self.agent_client.send_task_streaming(request.model_dump()):
+      async for response in self.agent_client.send_task_streaming(
+          request.model_dump(), reassemble_artifacts=True
+      ):
         merge_metadata(response.result, request)
         # For task status updates, we need to propagate metadata and provide
         # a unique message id.
@@ -65,7 +82,12 @@ class RemoteAgentConnections:
           break
       return task
     else: # Non-streaming
-      response = await self.agent_client.send_task(request.model_dump())
+      payload = request.model_dump()
+      # Lets the client retry the send if the agent is briefly unavailable.
+      payload["metadata"] = {
+          **(payload["metadata"] or {}), IDEMPOTENCY_KEY: uuid.uuid4().hex
+      }
+      response = await self.agent_client.send_task(payload)
       merge_metadata(response.result, request)
       # For task status updates, we need to propagate metadata and provide
       # a unique message id.
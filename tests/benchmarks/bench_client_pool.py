@@ -0,0 +1,83 @@
+"""Round-trip latency of A2AClient calls with a pooled client and with a new client per call.
+
+Serves canned tasks/get responses from a local keep-alive HTTP server, so the difference is
+the cost of setting up a connection and an httpx client on every call.
+
+Run from samples/python:
+    uv run python ../../tests/benchmarks/bench_client_pool.py
+"""
+import asyncio
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common.client import A2AClient
+from common.types import GetTaskResponse, Task, TaskState, TaskStatus
+
+CALLS = 500
+
+RESPONSE = GetTaskResponse(
+    id="1",
+    result=Task(id="task", sessionId="session", status=TaskStatus(state=TaskState.COMPLETED)),
+).model_dump_json(exclude_none=True).encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, avoid delayed-ACK stalls on kept-alive connections.
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def pooled(url: str) -> list[float]:
+    timings = []
+    async with A2AClient(url=url) as client:
+        for _ in range(CALLS):
+            start = time.perf_counter()
+            await client.get_task({"id": "task"})
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def unpooled(url: str) -> list[float]:
+    timings = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        async with A2AClient(url=url) as client:
+            await client.get_task({"id": "task"})
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    timings = sorted(timings)
+    print(
+        f"{name:<22} mean {statistics.mean(timings) * 1e6:8.0f} us"
+        f"   p50 {timings[len(timings) // 2] * 1e6:8.0f} us"
+        f"   p99 {timings[int(len(timings) * 0.99)] * 1e6:8.0f} us"
+    )
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    report("new client per call", asyncio.run(unpooled(url)))
+    report("pooled client", asyncio.run(pooled(url)))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
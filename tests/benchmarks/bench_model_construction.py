@@ -0,0 +1,117 @@
+"""Per-event cost of building streaming updates and of moving them through JSON.
+
+Compares validated construction, model_construct and the models' compiled validators
+for server-generated events, and dict-based against one-pass JSON parsing and
+serialization at the network edge.
+
+Run from samples/python:
+    uv run python ../../tests/benchmarks/bench_model_construction.py
+"""
+import json
+import time
+
+from common.types import (
+    Artifact,
+    Message,
+    SendTaskResponse,
+    SendTaskStreamingResponse,
+    Task,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+
+def validated_event(text: str) -> SendTaskStreamingResponse:
+    status = TaskStatus(
+        state=TaskState.WORKING,
+        message=Message(role="agent", parts=[{"type": "text", "text": text}]),
+    )
+    return SendTaskStreamingResponse(
+        id="request", result=TaskStatusUpdateEvent(id="task", status=status, final=False)
+    )
+
+
+def constructed_event(text: str) -> SendTaskStreamingResponse:
+    status = TaskStatus.model_construct(
+        state=TaskState.WORKING,
+        message=Message.model_construct(
+            role="agent", parts=[TextPart.model_construct(text=text)]
+        ),
+    )
+    return SendTaskStreamingResponse.model_construct(
+        id="request",
+        result=TaskStatusUpdateEvent.model_construct(id="task", status=status, final=False),
+    )
+
+
+_validate_status = TaskStatus.__pydantic_validator__.validate_python
+_validate_event = TaskStatusUpdateEvent.__pydantic_validator__.validate_python
+_validate_response = SendTaskStreamingResponse.__pydantic_validator__.validate_python
+
+
+def compiled_validator_event(text: str) -> SendTaskStreamingResponse:
+    status = _validate_status(
+        {
+            "state": TaskState.WORKING,
+            "message": {"role": "agent", "parts": [{"type": "text", "text": text}]},
+        }
+    )
+    return _validate_response(
+        {"id": "request", "result": _validate_event({"id": "task", "status": status})}
+    )
+
+
+def bench(operation, num_operations: int) -> float:
+    """Returns the cost of one operation in microseconds."""
+    start = time.perf_counter()
+    for i in range(num_operations):
+        operation(i)
+    return (time.perf_counter() - start) / num_operations * 1e6
+
+
+if __name__ == "__main__":
+    num_events = 100_000
+    print("building one status update event:")
+    for build in (validated_event, constructed_event, compiled_validator_event):
+        cost = bench(lambda i: build(f"update {i}"), num_events)
+        print(f"  {build.__name__:<26} {cost:6.2f} us")
+
+    event_json = validated_event("x" * 200).model_dump_json(exclude_none=True)
+    task = Task(
+        id="task",
+        status=TaskStatus(state=TaskState.COMPLETED),
+        history=[Message(role="agent", parts=[TextPart(text="x" * 200)])] * 20,
+        artifacts=[Artifact(parts=[TextPart(text="y" * 2000)])],
+    )
+    response = SendTaskResponse(id="request", result=task)
+    response_json = response.model_dump_json(exclude_none=True)
+
+    print("parsing one streaming event:")
+    print(
+        f"  {'json.loads + __init__':<26} "
+        f"{bench(lambda i: SendTaskStreamingResponse(**json.loads(event_json)), num_events):6.2f} us"
+    )
+    print(
+        f"  {'model_validate_json':<26} "
+        f"{bench(lambda i: SendTaskStreamingResponse.model_validate_json(event_json), num_events):6.2f} us"
+    )
+    print("parsing one tasks/send response with 20 history messages:")
+    print(
+        f"  {'json.loads + __init__':<26} "
+        f"{bench(lambda i: SendTaskResponse(**json.loads(response_json)), num_events // 10):6.2f} us"
+    )
+    print(
+        f"  {'model_validate_json':<26} "
+        f"{bench(lambda i: SendTaskResponse.model_validate_json(response_json), num_events // 10):6.2f} us"
+    )
+    print("serializing the same response:")
+    print(
+        f"  {'model_dump + json.dumps':<26} "
+        f"{bench(lambda i: json.dumps(response.model_dump(exclude_none=True)), num_events // 10):6.2f} us"
+    )
+    print(
+        f"  {'model_dump_json':<26} "
+        f"{bench(lambda i: response.model_dump_json(exclude_none=True), num_events // 10):6.2f} us"
+    )
@@ -0,0 +1,61 @@
+"""Memory retained per task by plain Task objects and by the compact TaskStore.
+
+Run from samples/python:
+    uv run python ../../tests/benchmarks/bench_task_store.py
+"""
+import time
+import tracemalloc
+from uuid import uuid4
+
+from common.server.task_store import TaskStore
+from common.types import Artifact, Message, Task, TaskState, TaskStatus, TextPart
+
+
+def new_task(session_id: str, num_messages: int) -> Task:
+    history = []
+    for i in range(num_messages):
+        history.append(Message(role="user", parts=[TextPart(text=f"How much is {i} USD in EUR?")]))
+        history.append(
+            Message(role="agent", parts=[TextPart(text=f"{i} USD is {i * 0.92:.2f} EUR.")])
+        )
+    return Task(
+        id=uuid4().hex,
+        sessionId=session_id,
+        status=TaskStatus(state=TaskState.COMPLETED),
+        history=history,
+        artifacts=[Artifact(parts=[TextPart(text=history[-1].parts[0].text)], index=0)],
+    )
+
+
+def retained_bytes_per_task(store, num_tasks: int, num_messages: int) -> float:
+    session_ids = [uuid4().hex for _ in range(num_tasks // 10)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(num_tasks):
+        task = new_task(session_ids[i % len(session_ids)], num_messages)
+        store[task.id] = task
+    del task
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained / num_tasks
+
+
+def materialize_seconds(store: TaskStore, history_length: int | None) -> float:
+    start = time.perf_counter()
+    for task_id in store:
+        store.materialize(task_id, history_length)
+    return (time.perf_counter() - start) / len(store)
+
+
+if __name__ == "__main__":
+    num_tasks = 10_000
+    for num_messages in (1, 5, 20):
+        plain = retained_bytes_per_task({}, num_tasks, num_messages)
+        task_store = TaskStore()
+        compact = retained_bytes_per_task(task_store, num_tasks, num_messages)
+        print(
+            f"{num_messages * 2:>3} history messages: dict of Task {plain:8,.0f} B/task, "
+            f"TaskStore {compact:8,.0f} B/task ({plain / compact:.1f}x smaller), "
+            f"materialize {materialize_seconds(task_store, None) * 1e6:6.1f} us "
+            f"(last 2 messages {materialize_seconds(task_store, 2) * 1e6:5.1f} us)"
+        )
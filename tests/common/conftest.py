@@ -0,0 +1,46 @@
+"""Fixtures shared by the tests in this directory.
+
+The tests are unittest test cases, which cannot take fixtures as arguments. They request
+them with @pytest.mark.usefixtures, and the fixtures set what they provide on the class.
+"""
+
+import pytest
+
+from common.server import InMemoryTaskManager
+from common.types import AgentCapabilities, AgentCard, AgentSkill
+
+
+class StubTaskManager(InMemoryTaskManager):
+    """A task manager that does no work, for tests of the machinery it inherits."""
+
+    async def on_send_task(self, request):
+        pass
+
+    async def on_send_task_subscribe(self, request):
+        pass
+
+
+def make_agent_card(
+    name: str = "test", description: str | None = None, *skills: AgentSkill
+) -> AgentCard:
+    return AgentCard(
+        name=name,
+        description=description,
+        url="http://localhost:10000/",
+        version="1.0.0",
+        capabilities=AgentCapabilities(),
+        skills=list(skills),
+    )
+
+
+@pytest.fixture(scope="class")
+def stub_task_manager(request):
+    """Sets StubTaskManager on the test case class."""
+    request.cls.StubTaskManager = StubTaskManager
+
+
+@pytest.fixture(scope="class")
+def agent_card(request):
+    """Sets agent_card(name, description, *skills) on the test case class, it builds the
+    card of an agent at http://localhost:10000/."""
+    request.cls.agent_card = staticmethod(make_agent_card)
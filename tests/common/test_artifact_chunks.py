@@ -0,0 +1,89 @@
+import base64
+import unittest
+
+from common.types import Artifact, DataPart, FileContent, FilePart, TextPart
+from common.utils.artifact_chunks import (
+    PART_CONTINUATION_METADATA_KEY,
+    ArtifactAssembler,
+    chunk_artifact,
+)
+
+
+class TestArtifactChunks(unittest.TestCase):
+    def setUp(self):
+        self.image_bytes = base64.b64encode(bytes(range(256)) * 40).decode()
+        self.artifact = Artifact(
+            name="image",
+            metadata={"source": "test"},
+            parts=[
+                TextPart(text="caption"),
+                FilePart(
+                    file=FileContent(
+                        name="image.png", mimeType="image/png", bytes=self.image_bytes
+                    )
+                ),
+                DataPart(data={"width": 10}),
+            ],
+        )
+
+    def test_small_artifact_is_not_chunked(self):
+        events = chunk_artifact("task", self.artifact, max_chunk_size=len(self.image_bytes) * 2)
+        self.assertEqual(len(events), 1)
+        self.assertIs(events[0].artifact, self.artifact)
+
+    def test_large_artifact_is_chunked(self):
+        events = chunk_artifact("task", self.artifact, max_chunk_size=1001)
+        self.assertGreater(len(events), 1)
+
+        first, *middle, last = [event.artifact for event in events]
+        self.assertEqual(first.name, "image")
+        self.assertFalse(first.append)
+        self.assertFalse(first.lastChunk)
+        self.assertTrue(all(chunk.append and not chunk.lastChunk for chunk in middle))
+        self.assertTrue(last.append)
+        self.assertTrue(last.lastChunk)
+
+        for event in events:
+            size = 0
+            for part in event.artifact.parts:
+                if isinstance(part, FilePart):
+                    size += len(part.file.bytes)
+                    # Every fragment decodes on its own
+                    base64.b64decode(part.file.bytes, validate=True)
+                elif isinstance(part, TextPart):
+                    size += len(part.text)
+            self.assertLessEqual(size, 1001)
+
+    def test_assembler_restores_artifact(self):
+        assembler = ArtifactAssembler()
+        results = [
+            assembler.add(event)
+            for event in chunk_artifact("task", self.artifact, max_chunk_size=1000)
+        ]
+        self.assertTrue(all(result is None for result in results[:-1]))
+        assembled = results[-1]
+        self.assertEqual(assembled.name, "image")
+        self.assertEqual(assembled.metadata, {"source": "test"})
+        self.assertEqual(assembled.parts, self.artifact.parts)
+
+    def test_assembler_splits_long_text(self):
+        artifact = Artifact(parts=[TextPart(text="x" * 2500, metadata={"lang": "en"})])
+        events = chunk_artifact("task", artifact, max_chunk_size=1000)
+        self.assertEqual(len(events), 3)
+        self.assertEqual(
+            events[1].artifact.parts[0].metadata, {PART_CONTINUATION_METADATA_KEY: True}
+        )
+
+        assembler = ArtifactAssembler()
+        assembled = [assembler.add(event) for event in events][-1]
+        self.assertEqual(assembled.parts, artifact.parts)
+
+    def test_assembler_passes_through_whole_artifact(self):
+        assembler = ArtifactAssembler()
+        events = chunk_artifact("task", self.artifact)
+        self.assertIs(assembler.add(events[0]), self.artifact)
+
+    def test_chunking_disabled(self):
+        events = chunk_artifact("task", self.artifact, max_chunk_size=None)
+        self.assertEqual(len(events), 1)
+        self.assertIs(events[0].artifact, self.artifact)
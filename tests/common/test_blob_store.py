@@ -0,0 +1,308 @@
+import base64
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import httpx
+import pytest
+from starlette.testclient import TestClient
+
+from common.client import A2AClient
+from common.server import A2AServer, FileSystemBlobStore
+from common.server.utils import parse_range_header
+from common.types import (
+    A2AClientHTTPError,
+    AgentAuthentication,
+    Artifact,
+    FileContent,
+    FilePart,
+    Message,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+
+def blob_files(blob_store: FileSystemBlobStore) -> list[str]:
+    return [
+        name
+        for name in os.listdir(blob_store.root_dir)
+        if not name.endswith(FileSystemBlobStore.CONTENT_TYPE_SUFFIX)
+    ]
+
+
+class TestParseRangeHeader(unittest.TestCase):
+    def test_no_range(self):
+        self.assertIsNone(parse_range_header(None, 100))
+
+    def test_ranges(self):
+        self.assertEqual(parse_range_header("bytes=0-9", 100), (0, 10))
+        self.assertEqual(parse_range_header("bytes=90-", 100), (90, 100))
+        self.assertEqual(parse_range_header("bytes=-10", 100), (90, 100))
+        self.assertEqual(parse_range_header("bytes=50-500", 100), (50, 100))
+
+    def test_unsatisfiable_range(self):
+        with self.assertRaises(ValueError):
+            parse_range_header("bytes=100-", 100)
+        with self.assertRaises(ValueError):
+            parse_range_header("bytes=abc", 100)
+
+
+class TestFileSystemBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.blob_store = FileSystemBlobStore(tempfile.mkdtemp())
+
+    def test_put_and_read_range(self):
+        blob_id = self.blob_store.put(bytes(range(256)), "application/octet-stream")
+        self.assertEqual(self.blob_store.size(blob_id), 256)
+        self.assertEqual(
+            b"".join(self.blob_store.iter_range(blob_id, 10, 20, chunk_size=3)),
+            bytes(range(10, 20)),
+        )
+
+    def test_delete(self):
+        blob_id = self.blob_store.put(b"data", "text/plain")
+        self.assertTrue(self.blob_store.delete(blob_id))
+        self.assertFalse(self.blob_store.delete(blob_id))
+        self.assertEqual(os.listdir(self.blob_store.root_dir), [])
+
+    def test_content_type_survives_reopening(self):
+        blob_id = self.blob_store.put(b"data", "text/plain")
+        untyped_id = self.blob_store.put(b"data")
+        reopened = FileSystemBlobStore(self.blob_store.root_dir)
+        self.assertEqual(reopened.content_type(blob_id), "text/plain")
+        self.assertIsNone(reopened.content_type(untyped_id))
+
+
+@pytest.mark.usefixtures("stub_task_manager", "agent_card")
+class TestBlobOffloading(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.data = bytes(range(256)) * 100
+        self.blob_store = FileSystemBlobStore(tempfile.mkdtemp())
+        self.task_manager = self.StubTaskManager()
+        self.server = A2AServer(
+            agent_card=self.agent_card(),
+            task_manager=self.task_manager,
+            blob_store=self.blob_store,
+        )
+        self.task_manager.blob_offload_threshold = 1024
+
+    def file_part(self):
+        return FilePart(
+            file=FileContent(
+                name="data.bin",
+                mimeType="application/octet-stream",
+                bytes=base64.b64encode(self.data).decode(),
+            )
+        )
+
+    async def test_artifact_file_parts_are_offloaded(self):
+        await self.task_manager.upsert_task(
+            TaskSendParams(id="task", message=Message(role="user", parts=[TextPart(text="hi")]))
+        )
+        artifact = Artifact(parts=[self.file_part(), TextPart(text="small")])
+        task = await self.task_manager.update_store(
+            "task", TaskStatus(state=TaskState.COMPLETED), [artifact]
+        )
+        stored_file = task.artifacts[0].parts[0].file
+        self.assertIsNone(stored_file.bytes)
+        self.assertTrue(stored_file.uri.startswith("http://localhost:10000/blobs/"))
+        self.assertEqual(task.artifacts[0].parts[1].text, "small")
+
+        client = TestClient(self.server.app)
+        path = stored_file.uri[len("http://localhost:10000"):]
+        response = client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.data)
+
+        response = client.get(path, headers={"Range": "bytes=100-199"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.headers["Content-Range"], f"bytes 100-199/{len(self.data)}")
+        self.assertEqual(response.content, self.data[100:200])
+
+        response = client.get(path, headers={"Range": f"bytes={len(self.data)}-"})
+        self.assertEqual(response.status_code, 416)
+
+    async def test_request_message_keeps_inline_bytes(self):
+        params = TaskSendParams(id="task", message=Message(role="user", parts=[self.file_part()]))
+        task = await self.task_manager.upsert_task(params)
+        self.assertIsNotNone(params.message.parts[0].file.bytes)
+        self.assertIsNotNone(task.history[0].parts[0].file.uri)
+
+    def test_unknown_blob(self):
+        client = TestClient(self.server.app)
+        self.assertEqual(client.get("/blobs/unknown").status_code, 404)
+        self.assertEqual(client.get("/blobs/..%2Fetc").status_code, 404)
+
+    async def test_identical_file_parts_are_offloaded_once(self):
+        await self.task_manager.upsert_task(
+            TaskSendParams(id="task", message=Message(role="user", parts=[self.file_part()]))
+        )
+        task = await self.task_manager.update_store(
+            "task",
+            TaskStatus(state=TaskState.COMPLETED),
+            [Artifact(parts=[self.file_part()])],
+        )
+        self.assertEqual(
+            task.history[0].parts[0].file.uri, task.artifacts[0].parts[0].file.uri
+        )
+        self.assertEqual(len(blob_files(self.blob_store)), 1)
+
+    def test_blob_store_requires_agent_card(self):
+        with self.assertRaises(ValueError):
+            A2AServer(task_manager=self.StubTaskManager(), blob_store=self.blob_store)
+
+
+@pytest.mark.usefixtures("stub_task_manager", "agent_card")
+class TestBlobUpload(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.data = bytes(range(256)) * 1000
+        self.blob_store = FileSystemBlobStore(tempfile.mkdtemp())
+        self.server = A2AServer(
+            agent_card=self.agent_card(),
+            task_manager=self.StubTaskManager(),
+            blob_store=self.blob_store,
+            # Leave room for the multipart envelope.
+            max_upload_size=len(self.data) + 1024,
+        )
+        self.client = TestClient(self.server.app)
+
+    def download(self, uri):
+        return self.client.get(uri[len("http://localhost:10000"):])
+
+    def test_raw_upload(self):
+        response = self.client.post(
+            "/blobs?name=data.bin",
+            content=self.data,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        self.assertEqual(response.status_code, 201)
+        file = FileContent(**response.json())
+        self.assertEqual(file.name, "data.bin")
+        self.assertEqual(file.mimeType, "application/octet-stream")
+        self.assertTrue(file.uri.startswith("http://localhost:10000/blobs/"))
+        self.assertEqual(self.download(file.uri).content, self.data)
+
+    def test_multipart_upload(self):
+        response = self.client.post(
+            "/blobs", files={"file": ("image.png", self.data, "image/png")}
+        )
+        self.assertEqual(response.status_code, 201)
+        file = FileContent(**response.json())
+        self.assertEqual(file.name, "image.png")
+        self.assertEqual(file.mimeType, "image/png")
+        download = self.download(file.uri)
+        self.assertEqual(download.content, self.data)
+        self.assertEqual(download.headers["Content-Type"], "image/png")
+
+    def test_multipart_upload_without_file(self):
+        response = self.client.post("/blobs", data={"name": "data.bin"}, files={"other": b""})
+        self.assertEqual(response.status_code, 400)
+
+    def test_upload_too_large(self):
+        too_large = self.data + b"x" * 1025
+        response = self.client.post("/blobs", content=too_large)
+        self.assertEqual(response.status_code, 413)
+
+        # Without a Content-Length the body is cut off as soon as it grows too large.
+        def body():
+            for start in range(0, len(too_large), 64 * 1024):
+                yield too_large[start : start + 64 * 1024]
+
+        response = self.client.post("/blobs", content=body())
+        self.assertEqual(response.status_code, 413)
+        response = self.client.post(
+            "/blobs", files={"file": ("image.png", too_large, "image/png")}
+        )
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(os.listdir(self.blob_store.root_dir), [])
+
+    def test_uploads_are_kept(self):
+        file = FileContent(**self.client.post("/blobs", content=b"kept").json())
+        self.client.post("/blobs", content=b"other")
+        self.assertEqual(self.download(file.uri).content, b"kept")
+
+    def test_uploads_expire(self):
+        self.server.upload_ttl = 0
+        first = FileContent(**self.client.post("/blobs", content=b"first").json())
+        self.assertEqual(self.download(first.uri).status_code, 404)
+        self.client.post("/blobs", content=b"second")
+        self.assertEqual(len(blob_files(self.blob_store)), 1)
+
+    def test_head_reports_upload_support(self):
+        self.assertEqual(self.client.head("/blobs").status_code, 204)
+
+    def test_authentication(self):
+        async def authenticate(request):
+            return request.headers.get("authorization") == "Bearer secret"
+
+        card = self.server.agent_card.model_copy(
+            update={"authentication": AgentAuthentication(schemes=["Bearer"])}
+        )
+        with self.assertRaises(ValueError):
+            A2AServer(
+                agent_card=card, task_manager=self.StubTaskManager(), blob_store=self.blob_store
+            )
+        # Without a blob store, checking credentials is left to the task manager.
+        A2AServer(agent_card=card, task_manager=self.StubTaskManager())
+        server = A2AServer(
+            agent_card=card,
+            task_manager=self.StubTaskManager(),
+            blob_store=self.blob_store,
+            authenticate=authenticate,
+        )
+        client = TestClient(server.app)
+        response = client.post("/blobs", content=self.data)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.headers["WWW-Authenticate"], "Bearer")
+        self.assertEqual(client.post("/", content=b"{}").status_code, 401)
+        self.assertEqual(os.listdir(self.blob_store.root_dir), [])
+
+        response = client.post(
+            "/blobs", content=self.data, headers={"Authorization": "Bearer secret"}
+        )
+        self.assertEqual(response.status_code, 201)
+        path = response.json()["uri"][len("http://localhost:10000"):]
+        self.assertEqual(client.get(path).status_code, 401)
+        self.assertEqual(
+            client.get(path, headers={"Authorization": "Bearer secret"}).content, self.data
+        )
+
+    async def test_client_upload_file(self):
+        path = os.path.join(tempfile.mkdtemp(), "image.png")
+        with open(path, "wb") as f:
+            f.write(self.data)
+
+        transport = httpx.ASGITransport(app=self.server.app)
+        async_client = httpx.AsyncClient
+        with patch(
+            "httpx.AsyncClient", lambda **kwargs: async_client(transport=transport, **kwargs)
+        ):
+            file = await A2AClient(url="http://localhost:10000/").upload_file(
+                path, chunk_size=4096
+            )
+
+        self.assertEqual(file.name, "image.png")
+        self.assertEqual(file.mimeType, "image/png")
+        self.assertEqual(self.download(file.uri).content, self.data)
+
+    async def test_client_checks_upload_support_first(self):
+        path = os.path.join(tempfile.mkdtemp(), "image.png")
+        with open(path, "wb") as f:
+            f.write(self.data)
+        methods = []
+
+        def handle(request):
+            methods.append(request.method)
+            return httpx.Response(404)
+
+        client = A2AClient(
+            url="http://localhost:10000/",
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handle)),
+        )
+        with self.assertRaises(A2AClientHTTPError) as raised:
+            await client.upload_file(path)
+        self.assertEqual(raised.exception.status_code, 404)
+        self.assertEqual(methods, ["HEAD"])
@@ -0,0 +1,145 @@
+import asyncio
+import time
+import unittest
+
+import httpx
+
+from common.client import A2AClient, RateLimiter
+from common.types import SendTaskResponse, Task, TaskSendParams, TaskState, TaskStatus
+
+MESSAGE = {"role": "user", "parts": [{"type": "text", "text": "hi"}]}
+
+
+class TestSendTasks(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.running = 0
+        self.max_running = 0
+        # Task id -> seconds the agent takes to answer.
+        self.delays = {}
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        task_id = httpx.Response(200, content=request.content).json()["params"]["id"]
+        if task_id == "bad":
+            return httpx.Response(500)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delays.get(task_id, 0))
+        finally:
+            self.running -= 1
+        task = Task(id=task_id, status=TaskStatus(state=TaskState.COMPLETED))
+        return httpx.Response(200, content=SendTaskResponse(id=1, result=task).model_dump_json())
+
+    def client(self) -> A2AClient:
+        return A2AClient(
+            url="http://localhost:10000/",
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handle)),
+        )
+
+    @staticmethod
+    def params(*task_ids: str) -> list[TaskSendParams]:
+        return [TaskSendParams(id=task_id, message=MESSAGE) for task_id in task_ids]
+
+    async def test_concurrency_is_capped(self):
+        task_ids = [str(i) for i in range(20)]
+        self.delays = {task_id: 0.01 for task_id in task_ids}
+
+        results = [
+            result
+            async for result in self.client().send_tasks(self.params(*task_ids), concurrency=4)
+        ]
+
+        self.assertEqual(sorted(result.index for result in results), list(range(20)))
+        self.assertEqual(self.max_running, 4)
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(result.response.result.id, task_ids[result.index])
+            self.assertGreater(result.elapsed, 0)
+
+    async def test_unordered_yields_results_as_they_complete(self):
+        self.delays = {"slow": 0.1}
+        results = [
+            result.response.result.id
+            async for result in self.client().send_tasks(self.params("slow", "fast"))
+        ]
+        self.assertEqual(results, ["fast", "slow"])
+
+    async def test_ordered_keeps_batch_order(self):
+        self.delays = {"slow": 0.1}
+        results = [
+            result.response.result.id
+            async for result in self.client().send_tasks(
+                self.params("slow", "fast", "other"), ordered=True
+            )
+        ]
+        self.assertEqual(results, ["slow", "fast", "other"])
+
+    async def test_errors_do_not_end_the_batch(self):
+        results = [
+            result
+            async for result in self.client().send_tasks(self.params("bad", "good"), ordered=True)
+        ]
+        self.assertIsNotNone(results[0].error)
+        self.assertIsNone(results[0].response)
+        self.assertEqual(results[1].response.result.id, "good")
+
+    async def test_accepts_async_streams_and_dicts(self):
+        async def generate():
+            for i in range(3):
+                yield {"id": str(i), "message": MESSAGE}
+
+        results = [
+            result.index async for result in self.client().send_tasks(generate(), ordered=True)
+        ]
+        self.assertEqual(results, [0, 1, 2])
+
+    async def test_rate_limit(self):
+        start = time.monotonic()
+        results = [
+            result
+            async for result in self.client().send_tasks(
+                self.params(*"abcde"), rate_limit=100
+            )
+        ]
+        # The first request starts at once, the other four wait 10 ms each.
+        self.assertGreaterEqual(time.monotonic() - start, 0.035)
+        self.assertGreater(max(result.wait_time for result in results), 0.03)
+
+    async def test_concurrent_batches_share_the_rate_limit(self):
+        client = self.client()
+
+        async def batch(*task_ids):
+            return [
+                result
+                async for result in client.send_tasks(self.params(*task_ids), rate_limit=100)
+            ]
+
+        start = time.monotonic()
+        await asyncio.gather(batch(*"abc"), batch(*"def"))
+        # Six requests to one host, the first starts at once and the other five wait 10 ms each.
+        self.assertGreaterEqual(time.monotonic() - start, 0.045)
+        self.assertEqual(len(client._rate_limiters), 1)
+
+    async def test_closing_cancels_running_requests(self):
+        self.delays = {"a": 10, "b": 10, "c": 0}
+        results = self.client().send_tasks(self.params("a", "b", "c"))
+        first = await asyncio.wait_for(anext(results), timeout=5)
+        self.assertEqual(first.response.result.id, "c")
+        await results.aclose()
+        await asyncio.sleep(0)
+        self.assertEqual(self.running, 0)
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_burst(self):
+        limiter = RateLimiter(rate=10, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.05)
+        await limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_rate_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(rate=0)
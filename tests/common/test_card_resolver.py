@@ -0,0 +1,125 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+import httpx
+import pytest
+from starlette.testclient import TestClient
+
+from common.client import A2ACardResolver
+from common.server import A2AServer
+from common.types import A2AClientHTTPError
+
+
+@pytest.mark.usefixtures("stub_task_manager", "agent_card")
+class TestCardResolver(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        A2ACardResolver.clear_cache()
+        self.server = A2AServer(
+            agent_card=self.agent_card(), task_manager=self.StubTaskManager()
+        )
+        self.requests = []
+        transport = httpx.ASGITransport(app=self.server.app)
+
+        async def handle(request):
+            self.requests.append(request)
+            return await transport.handle_async_request(request)
+
+        self.httpx_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+    async def asyncTearDown(self):
+        await self.httpx_client.aclose()
+        A2ACardResolver.clear_cache()
+
+    def test_server_answers_unchanged_card_with_not_modified(self):
+        client = TestClient(self.server.app)
+        response = client.get("/.well-known/agent.json")
+        self.assertEqual(response.json()["name"], "test")
+        etag = response.headers["ETag"]
+
+        response = client.get("/.well-known/agent.json", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    async def test_card_is_cached_until_ttl(self):
+        resolver = A2ACardResolver("http://agent", httpx_client=self.httpx_client)
+        first = await resolver.aget_agent_card()
+        second = await resolver.aget_agent_card()
+
+        self.assertEqual(first.name, "test")
+        self.assertEqual(second, first)
+        self.assertIsNot(second, first)
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_expired_card_is_revalidated_with_etag(self):
+        resolver = A2ACardResolver("http://agent", ttl=0.01, httpx_client=self.httpx_client)
+        await resolver.aget_agent_card()
+        await asyncio.sleep(0.02)
+        card = await resolver.aget_agent_card()
+
+        self.assertEqual(card.name, "test")
+        self.assertEqual(len(self.requests), 2)
+        self.assertIn("if-none-match", self.requests[1].headers)
+
+    async def test_changes_to_returned_card_do_not_affect_cache(self):
+        resolver = A2ACardResolver("http://agent", httpx_client=self.httpx_client)
+        card = await resolver.aget_agent_card()
+        card.name = "changed"
+        self.assertEqual((await resolver.aget_agent_card()).name, "test")
+
+    async def test_http_error(self):
+        resolver = A2ACardResolver(
+            "http://agent", agent_card_path="/missing", httpx_client=self.httpx_client
+        )
+        with self.assertRaises(A2AClientHTTPError) as context:
+            await resolver.aget_agent_card()
+        self.assertEqual(context.exception.status_code, 404)
+
+
+@pytest.mark.usefixtures("agent_card")
+class TestResolveMany(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        A2ACardResolver.clear_cache()
+
+    def tearDown(self):
+        A2ACardResolver.clear_cache()
+
+    async def handle(self, request):
+        host = request.url.host
+        if host == "down":
+            raise httpx.ConnectError("connection refused")
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, content=self.agent_card(host).model_dump_json())
+
+    def patch_client(self):
+        async_client = httpx.AsyncClient
+        transport = httpx.MockTransport(self.handle)
+        return patch(
+            "httpx.AsyncClient", lambda **kwargs: async_client(transport=transport, **kwargs)
+        )
+
+    async def test_cards_are_fetched_concurrently(self):
+        urls = [f"http://agent{i}" for i in range(10)]
+        start = time.monotonic()
+        with self.patch_client():
+            cards = await A2ACardResolver.resolve_many(urls)
+
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual([card.name for card in cards], [f"agent{i}" for i in range(10)])
+
+    async def test_return_exceptions(self):
+        with self.patch_client():
+            cards = await A2ACardResolver.resolve_many(
+                ["http://up", "http://down"], return_exceptions=True
+            )
+            self.assertEqual(cards[0].name, "up")
+            self.assertIsInstance(cards[1], A2AClientHTTPError)
+
+            with self.assertRaises(A2AClientHTTPError):
+                await A2ACardResolver.resolve_many(["http://down"])
+
+    async def test_get_agent_cards_from_a_running_loop(self):
+        with self.patch_client():
+            cards = A2ACardResolver.get_agent_cards(["http://agent"])
+        self.assertEqual(cards[0].name, "agent")
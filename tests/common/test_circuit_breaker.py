@@ -0,0 +1,127 @@
+import time
+import unittest
+
+import httpx
+
+from common.client import A2AClient, CircuitBreaker, CircuitState
+from common.types import A2AClientCircuitOpenError, A2AClientHTTPError
+
+
+def fail(status_code: int = 503):
+    async def send():
+        raise A2AClientHTTPError(status_code, "error")
+
+    return send
+
+
+async def succeed():
+    return "ok"
+
+
+class TestCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+    async def fail_times(self, breaker: CircuitBreaker, times: int, status_code: int = 503):
+        for _ in range(times):
+            with self.assertRaises(A2AClientHTTPError):
+                await breaker.call(fail(status_code))
+
+    async def test_opens_on_failure_rate(self):
+        breaker = CircuitBreaker("http://agent", min_calls=4, failure_rate_threshold=0.5)
+        await breaker.call(succeed)
+        await breaker.call(succeed)
+        await self.fail_times(breaker, 1)
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+        await self.fail_times(breaker, 1)
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertFalse(breaker.available)
+        self.assertEqual(breaker.failure_rate(), 0.5)
+
+        with self.assertRaises(A2AClientCircuitOpenError) as context:
+            await breaker.call(succeed)
+        self.assertEqual(context.exception.url, "http://agent")
+        self.assertGreater(context.exception.retry_after, 0)
+
+    async def test_client_errors_do_not_count(self):
+        breaker = CircuitBreaker(min_calls=2)
+        await self.fail_times(breaker, 5, status_code=400)
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        self.assertEqual(breaker.failure_rate(), 0)
+
+    async def test_opens_on_slow_calls(self):
+        breaker = CircuitBreaker(
+            min_calls=2, slow_call_duration=0, slow_call_rate_threshold=1.0
+        )
+        await breaker.call(succeed)
+        await breaker.call(succeed)
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+
+    async def test_half_open_probe_closes_on_success(self):
+        breaker = CircuitBreaker(min_calls=1, open_duration=0.01)
+        await self.fail_times(breaker, 1)
+        time.sleep(0.02)
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+
+        breaker.acquire()
+        # Only one probe at a time.
+        self.assertFalse(breaker.available)
+        with self.assertRaises(A2AClientCircuitOpenError):
+            breaker.acquire()
+        breaker.record_success(0.001)
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        self.assertEqual(breaker.failure_rate(), 0)
+
+    async def test_half_open_probe_reopens_on_failure(self):
+        breaker = CircuitBreaker(min_calls=1, open_duration=0.01)
+        await self.fail_times(breaker, 1)
+        time.sleep(0.02)
+        await self.fail_times(breaker, 1)
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+
+    async def test_released_probe_frees_its_slot(self):
+        breaker = CircuitBreaker(min_calls=1, open_duration=0.01)
+        await self.fail_times(breaker, 1)
+        time.sleep(0.02)
+        breaker.acquire()
+        breaker.release()
+        self.assertTrue(breaker.available)
+
+
+class TestClientCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.calls = 0
+
+    def client(self, response: httpx.Response) -> A2AClient:
+        def handler(request):
+            self.calls += 1
+            return response
+
+        return A2AClient(
+            url="http://agent/",
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            circuit_breaker=CircuitBreaker(min_calls=2),
+        )
+
+    async def test_open_circuit_fails_fast(self):
+        client = self.client(httpx.Response(503))
+        for _ in range(2):
+            with self.assertRaises(A2AClientHTTPError):
+                await client.get_task({"id": "a"})
+
+        with self.assertRaises(A2AClientCircuitOpenError) as context:
+            await client.get_task({"id": "a"})
+        self.assertEqual(context.exception.url, "http://agent/")
+        self.assertEqual(self.calls, 2)
+
+    async def test_stream_connect_failures_count(self):
+        client = self.client(httpx.Response(502))
+        payload = {"id": "a", "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]}}
+        for _ in range(2):
+            with self.assertRaises(A2AClientHTTPError):
+                async for _ in client.send_task_streaming(payload):
+                    pass
+
+        self.assertEqual(client.circuit_breaker.state, CircuitState.OPEN)
+        with self.assertRaises(A2AClientCircuitOpenError):
+            async for _ in client.send_task_streaming(payload):
+                pass
+        self.assertEqual(self.calls, 2)
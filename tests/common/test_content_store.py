@@ -0,0 +1,88 @@
+import base64
+import unittest
+
+import pytest
+
+from common.types import (
+    Artifact,
+    FileContent,
+    FilePart,
+    Message,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+)
+from common.utils.content_store import ContentStore, get_content_store
+
+
+def encoded(data: bytes) -> str:
+    # Build a new string object every time, like decoding a request does.
+    return base64.b64encode(data).decode()
+
+
+class TestContentStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ContentStore()
+
+    def test_identical_contents_are_stored_once(self):
+        first = encoded(b"image")
+        second = encoded(b"image")
+        self.assertIsNot(first, second)
+
+        digest, shared = self.store.intern(first)
+        second_digest, second_shared = self.store.intern(second)
+        self.assertEqual(digest, second_digest)
+        self.assertIs(shared, first)
+        self.assertIs(second_shared, first)
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store.size, len(first))
+        self.assertIs(self.store.get(digest), first)
+
+    def test_unknown_digest(self):
+        self.assertIsNone(self.store.get("unknown"))
+        self.assertNotIn("unknown", self.store)
+
+    def test_shared_instance(self):
+        self.assertIs(get_content_store(), get_content_store())
+
+
+@pytest.mark.usefixtures("stub_task_manager")
+class TestTaskStorageDeduplication(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.task_manager = self.StubTaskManager()
+        self.task_manager.content_store = ContentStore()
+
+    def file_part(self):
+        return FilePart(
+            file=FileContent(
+                name="image.png", mimeType="image/png", bytes=encoded(b"\x89PNG" * 64)
+            )
+        )
+
+    async def test_identical_file_parts_share_contents(self):
+        for task_id in ("first", "second"):
+            await self.task_manager.upsert_task(
+                TaskSendParams(
+                    id=task_id,
+                    sessionId="session",
+                    message=Message(role="user", parts=[self.file_part()]),
+                )
+            )
+        await self.task_manager.update_store(
+            "second",
+            TaskStatus(state=TaskState.COMPLETED),
+            [Artifact(parts=[self.file_part()])],
+        )
+
+        first = self.task_manager.tasks["first"]
+        second = self.task_manager.tasks["second"]
+        self.assertIs(
+            first.history[0].parts[0].file.bytes, second.history[0].parts[0].file.bytes
+        )
+        self.assertIs(
+            first.history[0].parts[0].file.bytes, second.artifacts[0].parts[0].file.bytes
+        )
+        self.assertEqual(len(self.task_manager.content_store), 1)
+        self.assertEqual(
+            self.task_manager.content_store.size, len(self.file_part().file.bytes)
+        )
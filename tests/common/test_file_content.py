@@ -0,0 +1,54 @@
+import base64
+import io
+import unittest
+
+from common.types import FileContent, FilePart
+
+
+class TestFileContent(unittest.TestCase):
+    def setUp(self):
+        self.data = bytes(range(256)) * 100
+        self.encoded = base64.b64encode(self.data).decode()
+
+    def test_decoded_once_and_cached(self):
+        content = FileContent(name="data.bin", bytes=self.encoded)
+        decoded = content.decoded_bytes
+        self.assertEqual(decoded, self.data)
+        self.assertIs(content.decoded_bytes, decoded)
+        self.assertIs(content.decoded.obj, decoded)
+
+    def test_decoded_follows_bytes(self):
+        content = FileContent(bytes=self.encoded)
+        content.decoded_bytes
+        content.bytes = base64.b64encode(b"other").decode()
+        self.assertEqual(content.decoded_bytes, b"other")
+
+    def test_uri_content_has_no_decoded_bytes(self):
+        content = FileContent(uri="http://localhost/blobs/1")
+        self.assertIsNone(content.decoded_bytes)
+        self.assertIsNone(content.decoded)
+        with self.assertRaises(ValueError):
+            content.write_decoded(io.BytesIO())
+
+    def test_from_bytes_keeps_decoded_contents(self):
+        content = FileContent.from_bytes(self.data, name="data.bin", mimeType="image/png")
+        self.assertEqual(content.bytes, self.encoded)
+        self.assertIs(content.decoded_bytes, self.data)
+        self.assertEqual(
+            content.model_dump(),
+            {"name": "data.bin", "mimeType": "image/png", "bytes": self.encoded, "uri": None},
+        )
+
+    def test_write_decoded_in_chunks(self):
+        for chunk_size in (1, 1000, 64 * 1024):
+            f = io.BytesIO()
+            written = FileContent(bytes=self.encoded).write_decoded(f, chunk_size=chunk_size)
+            self.assertEqual(written, len(self.data))
+            self.assertEqual(f.getvalue(), self.data)
+
+    def test_equality_ignores_decoded_cache(self):
+        decoded = FileContent(bytes=self.encoded)
+        decoded.decoded_bytes
+        self.assertEqual(decoded, FileContent(bytes=self.encoded))
+        self.assertEqual(FilePart(file=decoded), FilePart(file=FileContent(bytes=self.encoded)))
+        self.assertNotEqual(decoded, FileContent(bytes=self.encoded, name="other"))
@@ -0,0 +1,129 @@
+import unittest
+
+import httpx
+
+from common.client import A2AClient, BalancingStrategy, LoadBalancer
+from common.types import (
+    GetTaskResponse,
+    SendTaskResponse,
+    SendTaskStreamingResponse,
+    Task,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+)
+
+URLS = ["http://replica0/", "http://replica1/", "http://replica2/"]
+MESSAGE = {"role": "user", "parts": [{"type": "text", "text": "hi"}]}
+
+
+class TestLoadBalancer(unittest.TestCase):
+    def test_power_of_two_choices_prefers_idle_replica(self):
+        balancer = LoadBalancer(URLS[:2])
+        for _ in range(3):
+            balancer.acquire(URLS[0])
+        self.assertEqual({balancer.select() for _ in range(20)}, {URLS[1]})
+
+        for _ in range(3):
+            balancer.release(URLS[0])
+        self.assertEqual(balancer.replicas[URLS[0]].in_flight, 0)
+
+    def test_ewma_prefers_fast_replica(self):
+        balancer = LoadBalancer(URLS, strategy=BalancingStrategy.EWMA)
+        # Replicas without measurements are tried first.
+        balancer.observe(URLS[0], 0.5)
+        balancer.observe(URLS[1], 0.1)
+        self.assertEqual(balancer.select(), URLS[2])
+
+        balancer.observe(URLS[2], 0.3)
+        self.assertEqual(balancer.select(), URLS[1])
+
+        # A fast replica that is busy loses against a slightly slower idle one.
+        for _ in range(3):
+            balancer.acquire(URLS[1])
+        self.assertEqual(balancer.select(), URLS[2])
+
+    def test_ewma_decay(self):
+        balancer = LoadBalancer(URLS[:1], strategy="ewma", ewma_decay=0.5)
+        balancer.observe(URLS[0], 1.0)
+        balancer.observe(URLS[0], 0.0)
+        self.assertEqual(balancer.replicas[URLS[0]].latency_ewma, 0.5)
+
+    def test_task_affinity(self):
+        balancer = LoadBalancer(URLS)
+        owner = balancer.select("task")
+        self.assertEqual(balancer.owner("task"), owner)
+        self.assertEqual({balancer.select("task") for _ in range(20)}, {owner})
+
+    def test_least_recently_used_affinities_are_forgotten(self):
+        balancer = LoadBalancer(URLS, max_affinities=2)
+        balancer.select("a")
+        balancer.select("b")
+        balancer.select("a")
+        balancer.select("c")
+        self.assertIsNotNone(balancer.owner("a"))
+        self.assertIsNone(balancer.owner("b"))
+
+    def test_requires_a_replica(self):
+        with self.assertRaises(ValueError):
+            LoadBalancer([])
+
+
+class TestClientLoadBalancing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.hosts: list[tuple[str, str]] = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        body = httpx.Response(200, content=request.content).json()
+        self.hosts.append((body["method"], request.url.host))
+        task = Task(id=body["params"]["id"], status=TaskStatus(state=TaskState.WORKING))
+        if body["method"] == "tasks/sendSubscribe":
+            event = SendTaskStreamingResponse(
+                id=1,
+                result=TaskStatusUpdateEvent(id=task.id, status=task.status, final=True),
+            )
+            return httpx.Response(
+                200,
+                headers={"Content-Type": "text/event-stream"},
+                content=f"data: {event.model_dump_json()}\n\n",
+            )
+        if body["method"] == "tasks/get":
+            return httpx.Response(200, content=GetTaskResponse(id=1, result=task).model_dump_json())
+        return httpx.Response(200, content=SendTaskResponse(id=1, result=task).model_dump_json())
+
+    def client(self) -> A2AClient:
+        return A2AClient(
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handle)),
+            load_balancer=LoadBalancer(URLS),
+        )
+
+    async def test_task_requests_stay_on_the_owning_replica(self):
+        client = self.client()
+        for i in range(10):
+            task_id = f"task{i}"
+            await client.send_task({"id": task_id, "message": MESSAGE})
+            await client.get_task({"id": task_id})
+            await client.send_task({"id": task_id, "message": MESSAGE})
+
+        by_task = {}
+        for i in range(0, len(self.hosts), 3):
+            hosts = {host for _, host in self.hosts[i : i + 3]}
+            self.assertEqual(len(hosts), 1)
+            by_task[i // 3] = hosts.pop()
+        # Tasks are spread over more than one replica.
+        self.assertGreater(len(set(by_task.values())), 1)
+        for replica in client.load_balancer.replicas.values():
+            self.assertEqual(replica.in_flight, 0)
+
+    async def test_streams_count_as_in_flight(self):
+        client = self.client()
+        stream = client.send_task_streaming({"id": "a", "message": MESSAGE})
+        await anext(stream)
+        owner = client.load_balancer.owner("a")
+        self.assertEqual(client.load_balancer.replicas[owner].in_flight, 1)
+        await stream.aclose()
+        self.assertEqual(client.load_balancer.replicas[owner].in_flight, 0)
+        self.assertIsNotNone(client.load_balancer.replicas[owner].latency_ewma)
+
+        await client.get_task({"id": "a"})
+        self.assertEqual(self.hosts[-1], ("tasks/get", httpx.URL(owner).host))
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import jwt
+from starlette.requests import Request
+
+from common.utils.push_notification_auth import (
+    PushNotificationReceiverAuth,
+    PushNotificationSenderAuth,
+)
+
+
+def make_push_notification_request(sender_auth, data, body=None):
+    token = sender_auth._generate_jwt(data)
+    if body is None:
+        body = sender_auth._serialize_request_body(data)
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/notify",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    }
+    return Request(scope, receive)
+
+
+class TestPushNotificationUrlVerification(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sender_auth = PushNotificationSenderAuth()
+
+    async def test_verified_url_is_cached(self):
+        with patch.object(
+            PushNotificationSenderAuth,
+            "_challenge_push_notification_url",
+            AsyncMock(return_value=True),
+        ) as challenge:
+            for _ in range(5):
+                self.assertTrue(
+                    await self.sender_auth.verify_push_notification_url("http://test.com/notify")
+                )
+        challenge.assert_awaited_once()
+
+    async def test_concurrent_verifications_share_one_challenge(self):
+        async def slow_challenge(url):
+            await asyncio.sleep(0.01)
+            return True
+
+        with patch.object(
+            PushNotificationSenderAuth,
+            "_challenge_push_notification_url",
+            AsyncMock(side_effect=slow_challenge),
+        ) as challenge:
+            results = await asyncio.gather(
+                *[
+                    self.sender_auth.verify_push_notification_url("http://test.com/notify")
+                    for _ in range(10)
+                ]
+            )
+        self.assertTrue(all(results))
+        self.assertEqual(challenge.await_count, 1)
+
+    async def test_failed_verification_is_cached_until_expiry(self):
+        self.sender_auth.failed_url_ttl = 0.05
+        with patch.object(
+            PushNotificationSenderAuth,
+            "_challenge_push_notification_url",
+            AsyncMock(return_value=False),
+        ) as challenge:
+            self.assertFalse(await self.sender_auth.verify_push_notification_url("http://test.com/notify"))
+            self.assertFalse(await self.sender_auth.verify_push_notification_url("http://test.com/notify"))
+            self.assertEqual(challenge.await_count, 1)
+
+            await asyncio.sleep(0.06)
+            await self.sender_auth.verify_push_notification_url("http://test.com/notify")
+            self.assertEqual(challenge.await_count, 2)
+
+    async def test_invalidate_push_notification_url(self):
+        with patch.object(
+            PushNotificationSenderAuth,
+            "_challenge_push_notification_url",
+            AsyncMock(return_value=True),
+        ) as challenge:
+            await self.sender_auth.verify_push_notification_url("http://test.com/notify")
+            self.sender_auth.invalidate_push_notification_url("http://test.com/notify")
+            await self.sender_auth.verify_push_notification_url("http://test.com/notify")
+        self.assertEqual(challenge.await_count, 2)
+
+
+class TestPushNotificationReceiverAuth(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sender_auth = PushNotificationSenderAuth()
+        self.sender_auth.generate_jwk()
+        self.receiver_auth = PushNotificationReceiverAuth()
+
+    def jwks(self):
+        return {"keys": self.sender_auth.public_keys}
+
+    async def test_keys_are_fetched_once(self):
+        with patch.object(
+            PushNotificationReceiverAuth, "_fetch_jwks", AsyncMock(side_effect=self.jwks)
+        ) as fetch_jwks:
+            await self.receiver_auth.load_jwks("http://test.com/.well-known/jwks.json")
+            for i in range(3):
+                request = make_push_notification_request(self.sender_auth, {"id": str(i)})
+                self.assertTrue(await self.receiver_auth.verify_push_notification(request))
+        fetch_jwks.assert_awaited_once()
+
+    async def test_unknown_kid_triggers_refresh(self):
+        with patch.object(
+            PushNotificationReceiverAuth, "_fetch_jwks", AsyncMock(side_effect=self.jwks)
+        ) as fetch_jwks:
+            await self.receiver_auth.load_jwks("http://test.com/.well-known/jwks.json")
+            self.receiver_auth._last_jwks_refresh = None
+            # Rotate the signing key on the sender side.
+            self.sender_auth.generate_jwk()
+            request = make_push_notification_request(self.sender_auth, {"id": "1"})
+            self.assertTrue(await self.receiver_auth.verify_push_notification(request))
+        self.assertEqual(fetch_jwks.await_count, 2)
+
+    async def test_unknown_kid_refresh_is_rate_limited(self):
+        with patch.object(
+            PushNotificationReceiverAuth, "_fetch_jwks", AsyncMock(side_effect=self.jwks)
+        ) as fetch_jwks:
+            await self.receiver_auth.load_jwks("http://test.com/.well-known/jwks.json")
+            self.sender_auth.generate_jwk()
+            for _ in range(3):
+                request = make_push_notification_request(self.sender_auth, {"id": "1"})
+                with self.assertRaises(ValueError):
+                    await self.receiver_auth.verify_push_notification(request)
+        fetch_jwks.assert_awaited_once()
+
+    async def test_verify_in_thread(self):
+        self.receiver_auth.verify_in_thread = True
+        with patch.object(
+            PushNotificationReceiverAuth, "_fetch_jwks", AsyncMock(side_effect=self.jwks)
+        ):
+            await self.receiver_auth.load_jwks("http://test.com/.well-known/jwks.json")
+            request = make_push_notification_request(self.sender_auth, {"id": "1"})
+            self.assertTrue(await self.receiver_auth.verify_push_notification(request))
+
+    async def test_verify_and_parse_returns_payload(self):
+        data = {"id": "1", "status": {"state": "completed", "message": "naïve"}}
+        with patch.object(
+            PushNotificationReceiverAuth, "_fetch_jwks", AsyncMock(side_effect=self.jwks)
+        ):
+            await self.receiver_auth.load_jwks("http://test.com/.well-known/jwks.json")
+            request = make_push_notification_request(self.sender_auth, data)
+            is_verified, payload = await self.receiver_auth.verify_and_parse_push_notification(request)
+        self.assertTrue(is_verified)
+        self.assertEqual(payload, data)
+
+    async def test_non_canonical_body_is_verified(self):
+        data = {"id": "1", "status": {"state": "completed"}}
+        with patch.object(
+            PushNotificationReceiverAuth, "_fetch_jwks", AsyncMock(side_effect=self.jwks)
+        ):
+            await self.receiver_auth.load_jwks("http://test.com/.well-known/jwks.json")
+            request = make_push_notification_request(
+                self.sender_auth, data, body=json.dumps(data, indent=2).encode()
+            )
+            self.assertTrue(await self.receiver_auth.verify_push_notification(request))
+
+    async def test_tampered_body_is_rejected(self):
+        with patch.object(
+            PushNotificationReceiverAuth, "_fetch_jwks", AsyncMock(side_effect=self.jwks)
+        ):
+            await self.receiver_auth.load_jwks("http://test.com/.well-known/jwks.json")
+            request = make_push_notification_request(
+                self.sender_auth, {"id": "1"}, body=b'{"id":"2"}'
+            )
+            with self.assertRaises(ValueError):
+                await self.receiver_auth.verify_push_notification(request)
+
+    async def test_token_from_the_future_is_rejected(self):
+        with patch.object(
+            PushNotificationReceiverAuth, "_fetch_jwks", AsyncMock(side_effect=self.jwks)
+        ):
+            await self.receiver_auth.load_jwks("http://test.com/.well-known/jwks.json")
+            with patch("time.time", return_value=time.time() + 3600):
+                request = make_push_notification_request(self.sender_auth, {"id": "1"})
+            # Recent PyJWT versions reject it while decoding, older ones leave it to the receiver.
+            with self.assertRaises((ValueError, jwt.InvalidTokenError)):
+                await self.receiver_auth.verify_push_notification(request)
+
+    async def test_replayed_notification_is_rejected(self):
+        data = {"id": "1"}
+        token = self.sender_auth._generate_jwt(data)
+        with patch.object(
+            PushNotificationReceiverAuth, "_fetch_jwks", AsyncMock(side_effect=self.jwks)
+        ), patch.object(PushNotificationSenderAuth, "_generate_jwt", return_value=token):
+            await self.receiver_auth.load_jwks("http://test.com/.well-known/jwks.json")
+            request = make_push_notification_request(self.sender_auth, data)
+            self.assertTrue(await self.receiver_auth.verify_push_notification(request))
+
+            replayed_request = make_push_notification_request(self.sender_auth, data)
+            with self.assertRaises(ValueError):
+                await self.receiver_auth.verify_push_notification(replayed_request)
@@ -0,0 +1,206 @@
+import asyncio
+import unittest
+
+import httpx
+import pytest
+from starlette.testclient import TestClient
+
+from common.client import A2AClient, RetryBudget, RetryPolicy
+from common.server import A2AServer, InMemoryTaskManager
+from common.types import (
+    IDEMPOTENCY_KEY,
+    A2AClientHTTPError,
+    CancelTaskRequest,
+    GetTaskRequest,
+    GetTaskResponse,
+    SendTaskRequest,
+    SendTaskResponse,
+    Task,
+    TaskState,
+    TaskStatus,
+)
+from common.client.retry import is_idempotent
+
+MESSAGE = {"role": "user", "parts": [{"type": "text", "text": "hi"}]}
+
+
+def task_response(request_id=1) -> httpx.Response:
+    task = Task(id="a", status=TaskStatus(state=TaskState.COMPLETED))
+    return httpx.Response(200, content=GetTaskResponse(id=request_id, result=task).model_dump_json())
+
+
+class TestIsIdempotent(unittest.TestCase):
+    def test_methods(self):
+        self.assertTrue(is_idempotent(GetTaskRequest(params={"id": "a"})))
+        self.assertFalse(is_idempotent(CancelTaskRequest(params={"id": "a"})))
+        self.assertFalse(is_idempotent(SendTaskRequest(params={"id": "a", "message": MESSAGE})))
+        self.assertTrue(
+            is_idempotent(
+                SendTaskRequest(
+                    params={"id": "a", "message": MESSAGE, "metadata": {IDEMPOTENCY_KEY: "k"}}
+                )
+            )
+        )
+
+
+class TestRetryBudget(unittest.TestCase):
+    def test_withdraw_until_empty(self):
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+        self.assertTrue(budget.withdraw())
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+
+
+class TestRetryPolicy(unittest.IsolatedAsyncioTestCase):
+    def client(self, handler, policy: RetryPolicy, replica_urls=None) -> A2AClient:
+        self.urls = []
+
+        async def record(request):
+            self.urls.append(str(request.url))
+            return await handler(request)
+
+        return A2AClient(
+            url="http://primary/",
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(record)),
+            retry_policy=policy,
+            replica_urls=replica_urls,
+        )
+
+    async def test_retries_transient_errors(self):
+        responses = [httpx.Response(502), httpx.Response(503), task_response()]
+
+        async def handler(request):
+            return responses.pop(0)
+
+        policy = RetryPolicy(initial_backoff=0)
+        response = await self.client(handler, policy).get_task({"id": "a"})
+
+        self.assertEqual(response.result.id, "a")
+        self.assertEqual(len(self.urls), 3)
+        self.assertEqual(policy.metrics.retries, 2)
+        self.assertEqual(policy.metrics.failures, 0)
+
+    async def test_does_not_retry_client_errors(self):
+        async def handler(request):
+            return httpx.Response(400)
+
+        policy = RetryPolicy(initial_backoff=0)
+        with self.assertRaises(A2AClientHTTPError):
+            await self.client(handler, policy).get_task({"id": "a"})
+        self.assertEqual(len(self.urls), 1)
+        self.assertEqual(policy.metrics.failures, 1)
+
+    async def test_does_not_retry_non_idempotent_requests(self):
+        async def handler(request):
+            return httpx.Response(502)
+
+        client = self.client(handler, RetryPolicy(initial_backoff=0))
+        with self.assertRaises(A2AClientHTTPError):
+            await client.send_task({"id": "a", "message": MESSAGE})
+        self.assertEqual(len(self.urls), 1)
+
+        self.urls.clear()
+        with self.assertRaises(A2AClientHTTPError):
+            await client.send_task(
+                {"id": "a", "message": MESSAGE, "metadata": {IDEMPOTENCY_KEY: "k"}}
+            )
+        self.assertEqual(len(self.urls), 3)
+
+    async def test_budget_limits_retries(self):
+        async def handler(request):
+            return httpx.Response(503)
+
+        policy = RetryPolicy(initial_backoff=0, budget=RetryBudget(ratio=0, max_tokens=1))
+        client = self.client(handler, policy)
+        for _ in range(2):
+            with self.assertRaises(A2AClientHTTPError):
+                await client.get_task({"id": "a"})
+
+        # The first request used the only token, the second one was not retried.
+        self.assertEqual(len(self.urls), 3)
+        self.assertEqual(policy.metrics.retries, 1)
+        self.assertEqual(policy.metrics.retries_denied, 2)
+
+    async def test_hedges_slow_requests_to_a_replica(self):
+        async def handler(request):
+            if request.url.host == "primary":
+                await asyncio.sleep(10)
+            return task_response()
+
+        policy = RetryPolicy(hedge=True, hedge_delay=0.01)
+        client = self.client(handler, policy, replica_urls=["http://replica/"])
+        response = await asyncio.wait_for(client.get_task({"id": "a"}), timeout=5)
+
+        self.assertEqual(response.result.id, "a")
+        self.assertEqual(self.urls, ["http://primary/", "http://replica/"])
+        self.assertEqual(policy.metrics.hedges, 1)
+        self.assertEqual(policy.metrics.hedge_wins, 1)
+
+    async def test_never_hedges_sends(self):
+        async def handler(request):
+            if request.url.host == "primary":
+                await asyncio.sleep(0.1)
+            return task_response()
+
+        policy = RetryPolicy(hedge=True, hedge_delay=0.01)
+        client = self.client(handler, policy, replica_urls=["http://replica/"])
+        await client.send_task({"id": "a", "message": MESSAGE, "metadata": {IDEMPOTENCY_KEY: "k"}})
+
+        self.assertEqual(self.urls, ["http://primary/"])
+        self.assertEqual(policy.metrics.hedges, 0)
+
+    async def test_hedge_delay_follows_latency_percentile(self):
+        policy = RetryPolicy(hedge=True, hedge_percentile=0.9)
+        self.assertIsNone(policy.current_hedge_delay("tasks/get"))
+        policy._latencies["tasks/get"].extend(i / 100 for i in range(1, 101))
+        self.assertAlmostEqual(policy.current_hedge_delay("tasks/get"), 0.91)
+        # Other methods keep their own window.
+        self.assertIsNone(policy.current_hedge_delay("tasks/send"))
+
+
+class CountingTaskManager(InMemoryTaskManager):
+    def __init__(self):
+        super().__init__()
+        self.sends = 0
+
+    async def on_send_task(self, request):
+        self.sends += 1
+        await self.upsert_task(request.params)
+        return SendTaskResponse(id=request.id, result=self.tasks[request.params.id])
+
+    async def on_send_task_subscribe(self, request):
+        pass
+
+
+@pytest.mark.usefixtures("agent_card")
+class TestServerIdempotency(unittest.TestCase):
+    def setUp(self):
+        self.task_manager = CountingTaskManager()
+        server = A2AServer(
+            agent_card=self.agent_card(),
+            task_manager=self.task_manager,
+        )
+        self.client = TestClient(server.app)
+
+    def send(self, request_id: int, metadata: dict | None = None) -> dict:
+        params = {"id": "a", "message": MESSAGE, "metadata": metadata}
+        return self.client.post(
+            "/", json={"jsonrpc": "2.0", "id": request_id, "method": "tasks/send", "params": params}
+        ).json()
+
+    def test_repeated_key_is_answered_once(self):
+        first = self.send(1, {IDEMPOTENCY_KEY: "k"})
+        second = self.send(2, {IDEMPOTENCY_KEY: "k"})
+
+        self.assertEqual(self.task_manager.sends, 1)
+        self.assertEqual(second["id"], 2)
+        self.assertEqual(second["result"], first["result"])
+        self.assertEqual(len(self.task_manager.tasks["a"].history), 1)
+
+    def test_sends_without_key_are_not_deduplicated(self):
+        self.send(1)
+        self.send(2)
+        self.assertEqual(self.task_manager.sends, 2)
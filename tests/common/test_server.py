@@ -0,0 +1,534 @@
+import asyncio
+import threading
+import unittest
+
+import httpx
+import pytest
+
+from starlette.testclient import TestClient
+
+from common.client import A2AClient
+from common.server import A2AServer
+from common.types import (
+    A2AClientHTTPError,
+    Artifact,
+    A2AClientJSONError,
+    GetTaskResponse,
+    JSONRPCResponse,
+    Message,
+    SendTaskStreamingResponse,
+    Task,
+    TaskDelta,
+    TaskSendParams,
+    TaskState,
+    TaskArtifactUpdateEvent,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+    UnsupportedOperationError,
+)
+from common.utils.artifact_chunks import chunk_artifact
+
+
+@pytest.mark.usefixtures("stub_task_manager", "agent_card")
+class TestA2AServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.task_manager = self.StubTaskManager()
+        server = A2AServer(
+            agent_card=self.agent_card(),
+            task_manager=self.task_manager,
+        )
+        self.client = TestClient(server.app)
+
+    async def test_get_task(self):
+        await self.task_manager.upsert_task(
+            TaskSendParams(id="task", message=Message(role="user", parts=[TextPart(text="hi")]))
+        )
+        response = self.client.post(
+            "/",
+            json={"jsonrpc": "2.0", "id": 1, "method": "tasks/get", "params": {"id": "task"}},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "application/json")
+        result = GetTaskResponse.model_validate_json(response.content).result
+        self.assertEqual(result.id, "task")
+        self.assertEqual(result.status.state, TaskState.SUBMITTED)
+
+    async def test_get_task_etag(self):
+        await self.task_manager.upsert_task(
+            TaskSendParams(id="task", message=Message(role="user", parts=[TextPart(text="hi")]))
+        )
+        request = {"jsonrpc": "2.0", "id": 1, "method": "tasks/get", "params": {"id": "task"}}
+        etag = self.client.post("/", json=request).headers["ETag"]
+
+        response = self.client.post("/", json=request, headers={"If-None-Match": etag})
+        delta = GetTaskResponse.model_validate_json(response.content).result
+        self.assertIsInstance(delta, TaskDelta)
+        self.assertEqual(delta.version, delta.baseVersion)
+        self.assertEqual(response.headers["ETag"], etag)
+
+        await self.task_manager.update_store("task", TaskStatus(state=TaskState.WORKING), None)
+        response = self.client.post("/", json=request, headers={"If-None-Match": etag})
+        delta = GetTaskResponse.model_validate_json(response.content).result
+        self.assertEqual(delta.status.state, TaskState.WORKING)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+        # The ETag of another task is ignored.
+        request["params"]["id"] = "other"
+        await self.task_manager.upsert_task(
+            TaskSendParams(id="other", message=Message(role="user", parts=[TextPart(text="hi")]))
+        )
+        response = self.client.post("/", json=request, headers={"If-None-Match": etag})
+        self.assertIsInstance(GetTaskResponse.model_validate_json(response.content).result, Task)
+
+    def test_invalid_json(self):
+        response = self.client.post("/", content=b'{"jsonrpc": "2.0",')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"]["code"], -32700)
+
+    def test_invalid_request(self):
+        response = self.client.post("/", json={"jsonrpc": "2.0", "id": 1, "method": "tasks/get"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"]["code"], -32600)
+
+
+class TestClientResponseParsing(unittest.TestCase):
+    def test_parse_response(self):
+        response = A2AClient._parse_response(
+            '{"jsonrpc": "2.0", "id": 1, "result": {"id": "task", "status": {"state": "working"}}}',
+            SendTaskStreamingResponse,
+        )
+        self.assertEqual(response.result.status.state, TaskState.WORKING)
+
+    def test_invalid_json(self):
+        with self.assertRaises(A2AClientJSONError):
+            A2AClient._parse_response('{"jsonrpc": ', SendTaskStreamingResponse)
+
+
+class TestClientConnectionPool(unittest.IsolatedAsyncioTestCase):
+    async def test_client_is_reused_until_closed(self):
+        client = A2AClient(url="http://localhost:10000/")
+        pooled = client.httpx_client
+        self.assertIs(client.httpx_client, pooled)
+
+        await client.aclose()
+        self.assertTrue(pooled.is_closed)
+        self.assertIsNot(client.httpx_client, pooled)
+        await client.aclose()
+
+    def test_each_event_loop_gets_its_own_pool(self):
+        client = A2AClient(url="http://localhost:10000/")
+
+        async def pool():
+            return client.httpx_client, client.httpx_client
+
+        first, again = asyncio.run(pool())
+        pools = []
+        thread = threading.Thread(target=lambda: pools.extend(asyncio.run(pool())))
+        thread.start()
+        thread.join()
+
+        self.assertIs(first, again)
+        self.assertIsNot(pools[0], first)
+        # Each pool was closed when its asyncio.run ended.
+        self.assertTrue(first.is_closed)
+        self.assertTrue(pools[0].is_closed)
+
+    async def test_shared_client_is_not_closed(self):
+        shared = httpx.AsyncClient()
+        async with A2AClient(url="http://localhost:10000/", httpx_client=shared) as client:
+            self.assertIs(client.httpx_client, shared)
+        self.assertFalse(shared.is_closed)
+        await shared.aclose()
+
+
+def status_event(task_id: str, state: TaskState, final: bool = False) -> bytes:
+    response = SendTaskStreamingResponse(
+        id=1,
+        result=TaskStatusUpdateEvent(id=task_id, status=TaskStatus(state=state), final=final),
+    )
+    return f"data: {response.model_dump_json()}\n\n".encode()
+
+
+def artifact_event(event: TaskArtifactUpdateEvent) -> bytes:
+    response = SendTaskStreamingResponse(id=1, result=event)
+    return f"data: {response.model_dump_json()}\n\n".encode()
+
+
+class EventStream(httpx.AsyncByteStream):
+    """Sends events one by one, then drops the connection or waits for the client to disconnect."""
+
+    def __init__(self, events: list[bytes], endless: bool = False, drop: bool = False):
+        self.events = events
+        self.endless = endless
+        self.drop = drop
+        self.closed = False
+
+    async def __aiter__(self):
+        for event in self.events:
+            await asyncio.sleep(0)
+            yield event
+        if self.drop:
+            raise httpx.ReadError("connection dropped")
+        if self.endless:
+            await asyncio.Event().wait()
+
+    async def aclose(self):
+        self.closed = True
+
+
+class TestClientStreaming(unittest.IsolatedAsyncioTestCase):
+    def stream_client(self, handler) -> A2AClient:
+        return A2AClient(
+            url="http://localhost:10000/",
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+    async def test_streams_are_consumed_concurrently(self):
+        def handler(request):
+            task_id = httpx.Response(200, content=request.content).json()["params"]["id"]
+            return httpx.Response(
+                200,
+                headers={"Content-Type": "text/event-stream"},
+                stream=EventStream(
+                    [status_event(task_id, TaskState.WORKING) for _ in range(3)]
+                    + [status_event(task_id, TaskState.COMPLETED, final=True)]
+                ),
+            )
+
+        client = self.stream_client(handler)
+        received = []
+
+        async def consume(task_id):
+            async for response in client.send_task_streaming(
+                {"id": task_id, "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]}}
+            ):
+                received.append((response.result.id, response.result.status.state))
+
+        await asyncio.gather(consume("a"), consume("b"))
+
+        self.assertEqual(len(received), 8)
+        # Neither stream blocked the loop until it was done.
+        self.assertNotEqual([task_id for task_id, _ in received[:4]], ["a"] * 4)
+        self.assertEqual(received[-1][1], TaskState.COMPLETED)
+
+    async def test_closing_the_iteration_closes_the_stream(self):
+        stream = EventStream([status_event("a", TaskState.WORKING)], endless=True)
+        client = self.stream_client(
+            lambda request: httpx.Response(
+                200, headers={"Content-Type": "text/event-stream"}, stream=stream
+            )
+        )
+
+        responses = client.send_task_streaming(
+            {"id": "a", "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]}}
+        )
+        response = await anext(responses)
+        self.assertEqual(response.result.status.state, TaskState.WORKING)
+        await responses.aclose()
+        self.assertTrue(stream.closed)
+
+    async def test_http_error(self):
+        client = self.stream_client(lambda request: httpx.Response(503))
+        with self.assertRaises(A2AClientHTTPError) as context:
+            async for _ in client.send_task_streaming(
+                {"id": "a", "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]}}
+            ):
+                pass
+        self.assertEqual(context.exception.status_code, 503)
+
+
+class TestClientStreamResumption(unittest.IsolatedAsyncioTestCase):
+    payload = {"id": "a", "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]}}
+
+    def setUp(self):
+        self.working = [status_event("a", TaskState.WORKING) for _ in range(3)]
+        self.completed = status_event("a", TaskState.COMPLETED, final=True)
+        self.methods = []
+
+    def stream_client(self, handler) -> A2AClient:
+        def record(request):
+            self.methods.append(httpx.Response(200, content=request.content).json()["method"])
+            return handler(request)
+
+        return A2AClient(
+            url="http://localhost:10000/",
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(record)),
+        )
+
+    @staticmethod
+    def sse(events: list[bytes], drop: bool = False) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "text/event-stream"},
+            stream=EventStream(events, drop=drop),
+        )
+
+    @staticmethod
+    def task(event: bytes, artifacts: list[Artifact] | None = None) -> httpx.Response:
+        """A tasks/get response for the task as of a status event."""
+        status = SendTaskStreamingResponse.model_validate_json(event[len("data: "):]).result.status
+        task = Task(id="a", status=status, artifacts=artifacts)
+        return httpx.Response(200, content=GetTaskResponse(id=1, result=task).model_dump_json())
+
+    async def states(self, client: A2AClient, **kwargs) -> list[TaskState]:
+        return [
+            response.result.status.state
+            async for response in client.send_task_streaming(
+                self.payload, reconnect_backoff=0, **kwargs
+            )
+        ]
+
+    async def test_resubscribes_and_skips_delivered_events(self):
+        def handler(request):
+            method = self.methods[-1]
+            if method == "tasks/sendSubscribe":
+                return self.sse(self.working[:2], drop=True)
+            if method == "tasks/get":
+                # Nothing happened while the connection was down.
+                return self.task(self.working[1])
+            # The agent only streams the events that follow the resubscription.
+            return self.sse(self.working[2:] + [self.completed])
+
+        states = await self.states(self.stream_client(handler))
+
+        self.assertEqual(self.methods, ["tasks/sendSubscribe", "tasks/resubscribe", "tasks/get"])
+        self.assertEqual(states, [TaskState.WORKING] * 3 + [TaskState.COMPLETED])
+
+    async def test_resubscribing_fetches_missed_events(self):
+        stream = EventStream([], endless=True)
+
+        def handler(request):
+            method = self.methods[-1]
+            if method == "tasks/sendSubscribe":
+                return self.sse(self.working[:1], drop=True)
+            if method == "tasks/get":
+                # The task completed while the connection was down.
+                return self.task(self.completed, [Artifact(parts=[TextPart(text="done")])])
+            return httpx.Response(
+                200, headers={"Content-Type": "text/event-stream"}, stream=stream
+            )
+
+        events = [
+            response.result
+            async for response in self.stream_client(handler).send_task_streaming(
+                self.payload, reconnect_backoff=0
+            )
+        ]
+
+        self.assertEqual(self.methods, ["tasks/sendSubscribe", "tasks/resubscribe", "tasks/get"])
+        self.assertEqual(events[1].artifact.parts[0].text, "done")
+        self.assertEqual(events[2].status.state, TaskState.COMPLETED)
+        self.assertTrue(events[2].final)
+        self.assertTrue(stream.closed)
+
+    async def test_polls_when_the_resumed_stream_is_silent(self):
+        def handler(request):
+            method = self.methods[-1]
+            if method == "tasks/sendSubscribe":
+                return self.sse(self.working[:1], drop=True)
+            if method == "tasks/resubscribe":
+                return httpx.Response(
+                    200,
+                    headers={"Content-Type": "text/event-stream"},
+                    stream=EventStream([], endless=True),
+                )
+            if self.methods.count("tasks/get") == 1:
+                return self.task(self.working[0])
+            # The final event was sent before the resubscription took effect.
+            return self.task(self.completed)
+
+        states = await asyncio.wait_for(
+            self.states(self.stream_client(handler), resume_idle_timeout=0.05), timeout=5
+        )
+
+        self.assertEqual(states, [TaskState.WORKING, TaskState.COMPLETED])
+        self.assertEqual(
+            self.methods[:4],
+            ["tasks/sendSubscribe", "tasks/resubscribe", "tasks/get", "tasks/get"],
+        )
+
+    async def test_identical_chunks_are_all_delivered(self):
+        # A uniform artifact splits into identical chunks that differ only in append and lastChunk.
+        chunks = chunk_artifact("a", Artifact(parts=[TextPart(text="x" * 5000)]), 1000)
+        client = self.stream_client(
+            lambda request: self.sse([artifact_event(chunk) for chunk in chunks] + [self.completed])
+        )
+
+        events = [
+            response.result
+            async for response in client.send_task_streaming(self.payload, reconnect_backoff=0)
+        ]
+
+        self.assertEqual(len(events), 6)
+        self.assertTrue(events[4].artifact.lastChunk)
+
+    async def test_polling_skips_delivered_artifacts_by_position(self):
+        first = Artifact(parts=[TextPart(text="same")])
+        task = Task(
+            id="a",
+            status=TaskStatus(state=TaskState.COMPLETED),
+            artifacts=[first, Artifact(parts=[TextPart(text="same")])],
+        )
+
+        def handler(request):
+            method = self.methods[-1]
+            if method == "tasks/sendSubscribe":
+                event = TaskArtifactUpdateEvent(id="a", artifact=first)
+                return self.sse([artifact_event(event)], drop=True)
+            if method == "tasks/resubscribe":
+                return httpx.Response(
+                    200,
+                    content=JSONRPCResponse(id=1, error=UnsupportedOperationError())
+                    .model_dump_json(),
+                    headers={"Content-Type": "application/json"},
+                )
+            return httpx.Response(
+                200, content=GetTaskResponse(id=1, result=task).model_dump_json()
+            )
+
+        events = [
+            response.result
+            async for response in self.stream_client(handler).send_task_streaming(
+                self.payload, reconnect_backoff=0
+            )
+        ]
+
+        # The second artifact has the same content, it is still new by its position.
+        self.assertEqual(
+            [type(event) for event in events],
+            [TaskArtifactUpdateEvent, TaskArtifactUpdateEvent, TaskStatusUpdateEvent],
+        )
+        self.assertTrue(events[2].final)
+
+    async def test_polls_when_resubscribe_is_not_supported(self):
+        task = Task(
+            id="a",
+            status=TaskStatus(state=TaskState.COMPLETED),
+            artifacts=[Artifact(parts=[TextPart(text="done")])],
+        )
+
+        def handler(request):
+            method = self.methods[-1]
+            if method == "tasks/sendSubscribe":
+                return self.sse(self.working[:1], drop=True)
+            if method == "tasks/resubscribe":
+                return httpx.Response(
+                    200,
+                    content=JSONRPCResponse(id=1, error=UnsupportedOperationError())
+                    .model_dump_json(),
+                    headers={"Content-Type": "application/json"},
+                )
+            return httpx.Response(
+                200, content=GetTaskResponse(id=1, result=task).model_dump_json()
+            )
+
+        responses = [
+            response.result
+            async for response in self.stream_client(handler).send_task_streaming(
+                self.payload, reconnect_backoff=0
+            )
+        ]
+
+        self.assertEqual(self.methods, ["tasks/sendSubscribe", "tasks/resubscribe", "tasks/get"])
+        self.assertEqual(responses[1].artifact.parts[0].text, "done")
+        self.assertEqual(responses[2].status.state, TaskState.COMPLETED)
+        self.assertTrue(responses[2].final)
+
+    async def test_gives_up_after_retry_budget(self):
+        def handler(request):
+            if self.methods[-1] == "tasks/get":
+                return self.task(self.working[0])
+            return self.sse(self.working[:1], drop=True)
+
+        with self.assertRaises(A2AClientHTTPError):
+            await self.states(self.stream_client(handler), max_reconnects=2)
+        self.assertEqual(len([m for m in self.methods if m != "tasks/get"]), 3)
+
+    async def test_reconnects_disabled(self):
+        client = self.stream_client(lambda request: self.sse(self.working[:1], drop=True))
+        with self.assertRaises(A2AClientHTTPError):
+            await self.states(client, max_reconnects=0)
+        self.assertEqual(self.methods, ["tasks/sendSubscribe"])
+
+
+@pytest.mark.usefixtures("stub_task_manager", "agent_card")
+class TestClientWaitForTask(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.task_manager = self.StubTaskManager()
+        server = A2AServer(
+            agent_card=self.agent_card(),
+            task_manager=self.task_manager,
+        )
+        self.params = []
+        transport = httpx.ASGITransport(app=server.app)
+
+        async def handle(request):
+            self.params.append(httpx.Response(200, content=request.content).json()["params"])
+            return await transport.handle_async_request(request)
+
+        self.client = A2AClient(
+            url="http://localhost:10000/",
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handle)),
+        )
+        await self.task_manager.upsert_task(
+            TaskSendParams(id="task", message=Message(role="user", parts=[TextPart(text="hi")]))
+        )
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def update(self, *states: TaskState):
+        for state in states:
+            await asyncio.sleep(0.05)
+            await self.task_manager.update_store("task", TaskStatus(state=state), None)
+
+    async def test_long_polls_until_the_task_is_final(self):
+        updates = asyncio.create_task(self.update(TaskState.WORKING, TaskState.COMPLETED))
+        response = await self.client.wait_for_task({"id": "task"}, timeout=5)
+        await updates
+
+        self.assertEqual(response.result.status.state, TaskState.COMPLETED)
+        # One request to read the task, then one long poll per update.
+        self.assertEqual(len(self.params), 3)
+        self.assertIsNone(self.params[0]["waitTimeout"])
+        self.assertEqual(self.params[1]["waitTimeout"], 30)
+        # Long polls only ask for what changed since the last response.
+        self.assertEqual(self.params[1]["ifVersionNewerThan"], 1)
+        self.assertEqual(self.params[2]["ifVersionNewerThan"], 2)
+
+    async def test_changes_are_applied_to_the_task(self):
+        message = Message(role="agent", parts=[TextPart(text="done")])
+
+        async def complete():
+            await asyncio.sleep(0.05)
+            await self.task_manager.update_store(
+                "task", TaskStatus(state=TaskState.COMPLETED, message=message), None
+            )
+
+        completion = asyncio.create_task(complete())
+        response = await self.client.wait_for_task({"id": "task", "historyLength": 10}, timeout=5)
+        await completion
+
+        self.assertIsInstance(response.result, Task)
+        self.assertEqual(response.result.version, 2)
+        self.assertEqual([m.parts[0].text for m in response.result.history], ["hi", "done"])
+
+    async def test_returns_latest_response_after_timeout(self):
+        response = await self.client.wait_for_task({"id": "task"}, timeout=0.1)
+        self.assertEqual(response.result.status.state, TaskState.SUBMITTED)
+
+    async def test_polls_agents_without_long_polling(self):
+        states = [TaskState.WORKING] * 3 + [TaskState.COMPLETED]
+
+        def handler(request):
+            task = Task(id="task", status=TaskStatus(state=states.pop(0)))
+            return httpx.Response(200, content=GetTaskResponse(id=1, result=task).model_dump_json())
+
+        client = A2AClient(
+            url="http://localhost:10000/",
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        response = await client.wait_for_task({"id": "task"}, timeout=5, poll_interval=0.01)
+        self.assertEqual(response.result.status.state, TaskState.COMPLETED)
+        self.assertEqual(states, [])
@@ -0,0 +1,89 @@
+import unittest
+
+import pytest
+
+from common.types import AgentSkill
+from common.utils.skill_router import SkillRouter, tokenize
+
+
+@pytest.mark.usefixtures("agent_card")
+class TestSkillRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = SkillRouter()
+        for card in self.cards():
+            self.router.add_agent(card)
+
+    def cards(self):
+        return [
+            self.agent_card(
+                "Currency Agent",
+                "Helps with exchange rates for currencies",
+                AgentSkill(
+                    id="convert_currency",
+                    name="Currency Exchange Rates Tool",
+                    description="Helps with exchange values between various currencies",
+                    tags=["currency conversion", "currency exchange"],
+                    examples=["What is exchange rate between USD and GBP?"],
+                ),
+            ),
+            self.agent_card(
+                "Image Generator Agent",
+                "Generate stunning, high-quality images on demand",
+                AgentSkill(
+                    id="image_generator",
+                    name="Image Generator",
+                    description="Generate high-quality images and edit or transform visuals.",
+                    tags=["generate image", "edit image"],
+                    examples=["Generate a photorealistic image of raspberry lemonade"],
+                ),
+            ),
+            self.agent_card(
+                "Reimbursement Agent",
+                "This agent handles the reimbursement process for the employees",
+                AgentSkill(
+                    id="process_reimbursement",
+                    name="Process Reimbursement Tool",
+                    description="Helps with the reimbursement process for users given the amount and purpose of the reimbursement.",
+                    tags=["reimbursement"],
+                    examples=["Can you reimburse me $20 for my lunch with the clients?"],
+                ),
+            ),
+        ]
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Generate two Images, please!"), ["generate", "two", "image"])
+
+    def test_routes_clear_matches(self):
+        self.assertEqual(
+            self.router.route("What is the exchange rate between EUR and USD?"), "Currency Agent"
+        )
+        self.assertEqual(
+            self.router.route("Generate an image of a cat on a skateboard"),
+            "Image Generator Agent",
+        )
+        self.assertEqual(
+            self.router.route("I need a reimbursement for my taxi ride"), "Reimbursement Agent"
+        )
+        self.assertEqual(self.router.metrics.hits, 3)
+        self.assertEqual(self.router.metrics.hit_rate, 1.0)
+
+    def test_unmatched_requests_are_left_to_the_model(self):
+        self.assertIsNone(self.router.route("Tell me a joke"))
+        self.assertEqual(self.router.metrics.misses, 1)
+        self.assertEqual(self.router.metrics.hit_rate, 0.0)
+
+    def test_ambiguous_requests_are_left_to_the_model(self):
+        request = "Generate an image of the currency exchange rates"
+        scores = self.router.scores(request)
+        self.assertEqual(
+            {name for name, _ in scores[:2]}, {"Currency Agent", "Image Generator Agent"}
+        )
+        self.assertIsNone(self.router.route(request))
+        self.assertEqual(self.router.metrics.as_dict()["ambiguous"], 1)
+
+    def test_remove_agent(self):
+        self.router.remove_agent("Currency Agent")
+        self.assertIsNone(self.router.route("What is the exchange rate between EUR and USD?"))
+
+    def test_empty_router(self):
+        self.assertIsNone(SkillRouter().route("Generate an image"))
@@ -32,9 +32,17 @@ from common.types import (
     SendTaskStreamingRequest,
     TextPart,
     TaskPushNotificationConfig,
+    ListTasksRequest,
+    ListTasksResponse,
+    TaskListParams,
+    InvalidParamsError,
+    A2ARequest,
+    TaskDelta,
 )
-from common.server.task_manager import InMemoryTaskManager
+from common.server.task_manager import InMemoryTaskManager, TaskManager
+from common.server.task_store import TaskStore
 from typing import Union, AsyncIterable
+import asyncio
 import httpx
 
 
@@ -203,6 +211,21 @@ class TestInMemoryTaskManager(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(updated_task.history), 2)
         self.assertEqual(len(updated_task.artifacts), 1)
 
+    async def test_record_update_does_not_materialize(self):
+        await self.task_manager.upsert_task(
+            TaskSendParams(id="task", sessionId="session", message=self.get_test_message())
+        )
+        with patch.object(
+            TaskStore, "materialize", side_effect=AssertionError("materialized")
+        ):
+            index_keys = await self.task_manager.record_update(
+                "task", TaskStatus(state=TaskState.WORKING), None
+            )
+        self.assertEqual(index_keys, ("task", "session", TaskState.WORKING))
+        self.assertEqual(
+            self.task_manager.task_index_keys["task"], ("session", TaskState.WORKING)
+        )
+
     async def test_update_store_task_not_found(self):
         with self.assertRaises(ValueError):
             await self.task_manager.update_store(
@@ -314,3 +337,305 @@ class TestInMemoryTaskManager(unittest.IsolatedAsyncioTestCase):
         ):
             pass
         self.assertEqual(len(self.task_manager.task_sse_subscribers[task_id]), 0)
+
+    async def create_tasks(self, session_id, count):
+        for i in range(count):
+            await self.task_manager.upsert_task(
+                TaskSendParams(
+                    id=f"{session_id}_task_{i}",
+                    sessionId=session_id,
+                    message=self.get_test_message(role="user"),
+                )
+            )
+
+    async def test_on_list_tasks_by_session(self):
+        await self.create_tasks("session_a", 3)
+        await self.create_tasks("session_b", 2)
+        request = ListTasksRequest(id="1", params=TaskListParams(sessionId="session_a"))
+        response = await self.task_manager.on_list_tasks(request)
+        self.assertIsInstance(response, ListTasksResponse)
+        # Most recently updated first
+        self.assertEqual(
+            [task.id for task in response.result.tasks],
+            ["session_a_task_2", "session_a_task_1", "session_a_task_0"],
+        )
+        self.assertIsNone(response.result.nextCursor)
+
+    async def test_on_list_tasks_by_state(self):
+        await self.create_tasks("session_a", 3)
+        await self.task_manager.update_store(
+            "session_a_task_1", TaskStatus(state=TaskState.COMPLETED), None
+        )
+        request = ListTasksRequest(
+            id="1", params=TaskListParams(sessionId="session_a", state=TaskState.SUBMITTED)
+        )
+        response = await self.task_manager.on_list_tasks(request)
+        self.assertEqual(
+            [task.id for task in response.result.tasks],
+            ["session_a_task_2", "session_a_task_0"],
+        )
+
+        request = ListTasksRequest(id="1", params=TaskListParams(state=TaskState.COMPLETED))
+        response = await self.task_manager.on_list_tasks(request)
+        self.assertEqual([task.id for task in response.result.tasks], ["session_a_task_1"])
+
+    async def test_on_list_tasks_pagination(self):
+        await self.create_tasks("session_a", 5)
+        task_ids = []
+        cursor = None
+        while True:
+            request = ListTasksRequest(
+                id="1", params=TaskListParams(sessionId="session_a", pageSize=2, cursor=cursor)
+            )
+            response = await self.task_manager.on_list_tasks(request)
+            self.assertLessEqual(len(response.result.tasks), 2)
+            task_ids.extend(task.id for task in response.result.tasks)
+            cursor = response.result.nextCursor
+            if cursor is None:
+                break
+        self.assertEqual(task_ids, [f"session_a_task_{i}" for i in reversed(range(5))])
+
+    async def test_on_list_tasks_pagination_after_updates(self):
+        await self.create_tasks("session_a", 50)
+        # Move every other task to the front, leaving removed entries in the indexes.
+        for i in range(0, 50, 2):
+            await self.task_manager.update_store(
+                f"session_a_task_{i}", TaskStatus(state=TaskState.WORKING), None
+            )
+        task_ids = []
+        cursor = None
+        while True:
+            request = ListTasksRequest(id="1", params=TaskListParams(pageSize=7, cursor=cursor))
+            response = await self.task_manager.on_list_tasks(request)
+            task_ids.extend(task.id for task in response.result.tasks)
+            cursor = response.result.nextCursor
+            if cursor is None:
+                break
+        expected = [f"session_a_task_{i}" for i in reversed(range(0, 50, 2))] + [
+            f"session_a_task_{i}" for i in reversed(range(1, 50, 2))
+        ]
+        self.assertEqual(task_ids, expected)
+
+    async def test_list_tasks_is_optional(self):
+        class MinimalTaskManager(TaskManager):
+            on_get_task = on_cancel_task = on_send_task = on_send_task_subscribe = None
+            on_set_task_push_notification = on_get_task_push_notification = None
+            on_resubscribe_to_task = None
+
+        response = await MinimalTaskManager().on_list_tasks(
+            ListTasksRequest(id="1", params=TaskListParams())
+        )
+        self.assertIsInstance(response.error, UnsupportedOperationError)
+
+    async def test_on_list_tasks_projection(self):
+        await self.create_tasks("session_a", 1)
+        await self.task_manager.update_store(
+            "session_a_task_0",
+            TaskStatus(state=TaskState.COMPLETED),
+            [Artifact(parts=[TextPart(text="artifact")])],
+        )
+        request = ListTasksRequest(
+            id="1", params=TaskListParams(sessionId="session_a", includeArtifacts=False)
+        )
+        response = await self.task_manager.on_list_tasks(request)
+        task = response.result.tasks[0]
+        self.assertIsNone(task.artifacts)
+        self.assertEqual(task.history, [])
+        # Stored task is left untouched
+        self.assertEqual(len(self.task_manager.tasks["session_a_task_0"].artifacts), 1)
+
+    async def test_on_list_tasks_invalid_cursor(self):
+        request = ListTasksRequest(id="1", params=TaskListParams(cursor="not-a-cursor"))
+        response = await self.task_manager.on_list_tasks(request)
+        self.assertIsInstance(response.error, InvalidParamsError)
+
+    def test_list_tasks_request_without_params(self):
+        request = A2ARequest.validate_python(
+            {"jsonrpc": "2.0", "id": "1", "method": "tasks/list"}
+        )
+        self.assertIsInstance(request, ListTasksRequest)
+
+    async def test_run_in_session_serializes_same_session(self):
+        await self.create_tasks("session_a", 3)
+        events = []
+
+        async def work(task_id):
+            async with self.task_manager.run_in_session("session_a", task_id):
+                events.append(("start", task_id))
+                await asyncio.sleep(0.01)
+                events.append(("end", task_id))
+
+        await asyncio.gather(*[work(f"session_a_task_{i}") for i in range(3)])
+        self.assertEqual(
+            events,
+            [
+                (edge, f"session_a_task_{i}")
+                for i in range(3)
+                for edge in ("start", "end")
+            ],
+        )
+        self.assertEqual(self.task_manager.session_queues, {})
+
+    async def test_run_in_session_parallel_across_sessions(self):
+        await self.create_tasks("session_a", 1)
+        await self.create_tasks("session_b", 1)
+        running = set()
+        overlap = []
+
+        async def work(session_id):
+            async with self.task_manager.run_in_session(session_id, f"{session_id}_task_0"):
+                running.add(session_id)
+                await asyncio.sleep(0.01)
+                overlap.append(len(running))
+                running.discard(session_id)
+
+        await asyncio.gather(work("session_a"), work("session_b"))
+        self.assertIn(2, overlap)
+
+    async def test_run_in_session_reports_queue_position(self):
+        await self.create_tasks("session_a", 3)
+        sse_queue = await self.task_manager.setup_sse_consumer("session_a_task_2")
+        releases = [asyncio.Event() for _ in range(3)]
+
+        async def work(i):
+            async with self.task_manager.run_in_session("session_a", f"session_a_task_{i}"):
+                await releases[i].wait()
+
+        workers = [asyncio.create_task(work(i)) for i in range(3)]
+        event = await sse_queue.get()
+        self.assertEqual(event.metadata, {"queuePosition": 2})
+        self.assertEqual(event.status.state, TaskState.WORKING)
+
+        releases[0].set()
+        event = await sse_queue.get()
+        self.assertEqual(event.metadata, {"queuePosition": 1})
+        # The position is transient and stays out of the history.
+        history = self.task_manager.tasks["session_a_task_2"].history
+        self.assertEqual([message.role for message in history], ["user"])
+
+        releases[1].set()
+        releases[2].set()
+        await asyncio.gather(*workers)
+
+    async def test_run_in_session_position_skips_cancelled_waiters(self):
+        await self.create_tasks("session_a", 3)
+        sse_queue = await self.task_manager.setup_sse_consumer("session_a_task_2")
+        release = asyncio.Event()
+
+        async def work(i):
+            async with self.task_manager.run_in_session("session_a", f"session_a_task_{i}"):
+                await release.wait()
+
+        first = asyncio.create_task(work(0))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(work(1))
+        await asyncio.sleep(0)
+        third = asyncio.create_task(work(2))
+        self.assertEqual((await sse_queue.get()).metadata, {"queuePosition": 2})
+
+        second.cancel()
+        release.set()
+        await asyncio.gather(first, third)
+        # Only one task was still ahead, so position 1 was never announced as stale news.
+        self.assertTrue(sse_queue.empty())
+
+    async def test_run_in_session_cancelled_waiter_keeps_order(self):
+        await self.create_tasks("session_a", 3)
+        events = []
+        release = asyncio.Event()
+
+        async def work(task_id):
+            async with self.task_manager.run_in_session("session_a", task_id):
+                events.append(task_id)
+                await release.wait()
+
+        first = asyncio.create_task(work("session_a_task_0"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(work("session_a_task_1"))
+        await asyncio.sleep(0)
+        third = asyncio.create_task(work("session_a_task_2"))
+        await asyncio.sleep(0.01)
+
+        second.cancel()
+        await asyncio.sleep(0.01)
+        # The first task is still running, so the third must keep waiting.
+        self.assertEqual(events, ["session_a_task_0"])
+
+        release.set()
+        await asyncio.gather(first, third)
+        self.assertEqual(events, ["session_a_task_0", "session_a_task_2"])
+
+    async def test_on_get_task_long_poll_answers_on_update(self):
+        await self.create_tasks("session_a", 1)
+        request = GetTaskRequest(
+            id="1", params=TaskQueryParams(id="session_a_task_0", waitTimeout=5)
+        )
+        waiter = asyncio.create_task(self.task_manager.on_get_task(request))
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+
+        await self.task_manager.update_store(
+            "session_a_task_0", TaskStatus(state=TaskState.COMPLETED), None
+        )
+        response = await asyncio.wait_for(waiter, 1)
+        self.assertEqual(response.result.status.state, TaskState.COMPLETED)
+
+    async def test_on_get_task_long_poll_times_out(self):
+        await self.create_tasks("session_a", 1)
+        request = GetTaskRequest(
+            id="1", params=TaskQueryParams(id="session_a_task_0", waitTimeout=0.02)
+        )
+        response = await self.task_manager.on_get_task(request)
+        self.assertEqual(response.result.status.state, TaskState.SUBMITTED)
+        # The lock is released again, other requests are not blocked.
+        self.assertFalse(self.task_manager.lock.locked())
+
+    async def test_on_get_task_long_poll_returns_final_task_at_once(self):
+        await self.create_tasks("session_a", 1)
+        await self.task_manager.update_store(
+            "session_a_task_0", TaskStatus(state=TaskState.INPUT_REQUIRED), None
+        )
+        request = GetTaskRequest(
+            id="1", params=TaskQueryParams(id="session_a_task_0", waitTimeout=5)
+        )
+        response = await asyncio.wait_for(self.task_manager.on_get_task(request), 1)
+        self.assertEqual(response.result.status.state, TaskState.INPUT_REQUIRED)
+
+    async def test_on_get_task_if_version_newer_than(self):
+        await self.create_tasks("session_a", 1)
+        task_id = "session_a_task_0"
+        await self.task_manager.update_store(
+            task_id, TaskStatus(state=TaskState.WORKING), None
+        )
+
+        request = GetTaskRequest(
+            id="1", params=TaskQueryParams(id=task_id, ifVersionNewerThan=1)
+        )
+        delta = (await self.task_manager.on_get_task(request)).result
+        self.assertIsInstance(delta, TaskDelta)
+        self.assertEqual((delta.baseVersion, delta.version), (1, 2))
+        self.assertEqual(delta.status.state, TaskState.WORKING)
+
+        request.params.ifVersionNewerThan = 2
+        delta = (await self.task_manager.on_get_task(request)).result
+        self.assertEqual(delta.version, delta.baseVersion)
+        self.assertIsNone(delta.status)
+
+        # Versions the task manager cannot tell changes from get the whole task.
+        request.params.ifVersionNewerThan = 5
+        task = (await self.task_manager.on_get_task(request)).result
+        self.assertIsInstance(task, Task)
+        self.assertEqual(task.version, 2)
+
+    async def test_on_get_task_long_poll_since_version(self):
+        await self.create_tasks("session_a", 1)
+        task_id = "session_a_task_0"
+        await self.task_manager.update_store(
+            task_id, TaskStatus(state=TaskState.WORKING), None
+        )
+        # A change the client has not seen yet is answered right away.
+        request = GetTaskRequest(
+            id="1", params=TaskQueryParams(id=task_id, waitTimeout=5, ifVersionNewerThan=1)
+        )
+        response = await asyncio.wait_for(self.task_manager.on_get_task(request), 1)
+        self.assertEqual(response.result.version, 2)
@@ -0,0 +1,150 @@
+import unittest
+
+from common.server.task_store import TaskStore
+from common.types import (
+    Artifact,
+    DataPart,
+    FileContent,
+    FilePart,
+    Message,
+    Task,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+
+class TestTaskStore(unittest.TestCase):
+    def setUp(self):
+        self.store = TaskStore()
+        self.task = Task(
+            id="task",
+            sessionId="session",
+            status=TaskStatus(
+                state=TaskState.WORKING,
+                message=Message(role="agent", parts=[TextPart(text="working")]),
+            ),
+            history=[
+                Message(role="user", parts=[TextPart(text=f"message {i}", metadata={"i": i})])
+                for i in range(5)
+            ],
+            artifacts=[Artifact(parts=[DataPart(data={"amount": 1})], append=False)],
+            metadata={"key": "value"},
+        )
+
+    def test_round_trip(self):
+        self.store["task"] = self.task
+        self.assertIn("task", self.store)
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(list(self.store), ["task"])
+        self.assertEqual(self.store["task"], self.task.model_copy(update={"version": 1}))
+        self.assertIsNot(self.store["task"], self.store["task"])
+
+    def test_task_without_history(self):
+        task = Task(id="empty", status=TaskStatus(state=TaskState.SUBMITTED))
+        self.store["empty"] = task
+        self.assertEqual(self.store["empty"], task.model_copy(update={"version": 1}))
+        self.store.append_message("empty", Message(role="user", parts=[TextPart(text="hi")]))
+        self.assertEqual(len(self.store["empty"].history), 1)
+
+    def test_materialize_history_length(self):
+        self.store["task"] = self.task
+        self.assertEqual(self.store.materialize("task", 2).history, self.task.history[-2:])
+        self.assertEqual(self.store.materialize("task", 0).history, [])
+        self.assertEqual(self.store.materialize("task").history, self.task.history)
+        self.assertIsNone(self.store.materialize("task", include_artifacts=False).artifacts)
+
+    def test_update_task(self):
+        self.store["task"] = self.task
+        status = TaskStatus(
+            state=TaskState.COMPLETED,
+            message=Message(role="agent", parts=[TextPart(text="done")]),
+        )
+        artifact = Artifact(parts=[TextPart(text="result")])
+        index_keys = self.store.update_task("task", status, [artifact])
+        self.assertEqual(index_keys, ("task", self.task.sessionId, TaskState.COMPLETED))
+
+        task = self.store["task"]
+        self.assertEqual(task.status, status)
+        self.assertEqual(task.history[-1], status.message)
+        self.assertEqual(task.artifacts[-1], artifact)
+
+        self.store.update_task("task", status, None, append_status_message=False)
+        self.assertEqual(len(self.store["task"].history), len(task.history))
+
+    def test_versions(self):
+        self.store["task"] = self.task
+        self.assertEqual(self.store.version("task"), 1)
+        self.store.append_message("task", Message(role="user", parts=[TextPart(text="hi")]))
+        self.store.update_task("task", TaskStatus(state=TaskState.COMPLETED))
+        self.assertEqual(self.store["task"].version, 3)
+
+        # Replacing a task keeps its version increasing.
+        self.store["task"] = self.task
+        self.assertEqual(self.store.version("task"), 4)
+
+    def test_delta(self):
+        self.store["task"] = self.task
+        message = Message(role="user", parts=[TextPart(text="hi")])
+        self.store.append_message("task", message)
+        status = TaskStatus(
+            state=TaskState.COMPLETED,
+            message=Message(role="agent", parts=[TextPart(text="done")]),
+        )
+        artifact = Artifact(parts=[TextPart(text="result")])
+        self.store.update_task("task", status, [artifact])
+
+        delta = self.store.delta("task", 2)
+        self.assertEqual((delta.baseVersion, delta.version), (2, 3))
+        self.assertEqual(delta.status, status)
+        self.assertEqual(delta.history, [status.message])
+        self.assertEqual(delta.artifacts, [artifact])
+
+        delta = self.store.delta("task", 1, history_length=1)
+        self.assertEqual(delta.history, [status.message])
+
+        delta = self.store.delta("task", 3)
+        self.assertEqual(delta.version, delta.baseVersion)
+        self.assertIsNone(delta.status)
+        self.assertIsNone(delta.history)
+        self.assertIsNone(delta.artifacts)
+
+        # Applying the delta to an old copy gives the current task.
+        old = self.store.materialize("task")
+        self.store.update_task("task", TaskStatus(state=TaskState.FAILED))
+        self.assertEqual(old.apply_delta(self.store.delta("task", 3)), self.store["task"])
+
+    def test_delta_of_unknown_version(self):
+        self.store["task"] = self.task
+        self.store["task"] = self.task
+        self.assertIsNone(self.store.delta("task", 1))
+        self.assertIsNone(self.store.delta("task", 3))
+        self.assertIsNotNone(self.store.delta("task", 2))
+
+    def test_delta_window(self):
+        store = TaskStore(max_delta_versions=3)
+        store["task"] = self.task
+        for i in range(4):
+            store.append_message("task", Message(role="user", parts=[TextPart(text=str(i))]))
+        self.assertEqual(store.version("task"), 5)
+        self.assertIsNone(store.delta("task", 2))
+        delta = store.delta("task", 3)
+        self.assertEqual([message.parts[0].text for message in delta.history], ["2", "3"])
+
+    def test_unknown_task(self):
+        with self.assertRaises(KeyError):
+            self.store["unknown"]
+        with self.assertRaises(KeyError):
+            self.store.update_task("unknown", TaskStatus(state=TaskState.COMPLETED))
+        self.assertIsNone(self.store.get("unknown"))
+
+    def test_inline_file_bytes_stay_shared(self):
+        message = Message(
+            role="user",
+            parts=[FilePart(file=FileContent(name="a.png", bytes="aGVsbG8="))],
+        )
+        self.store["task"] = self.task
+        self.store.append_message("task", message)
+        stored = self.store["task"].history[-1]
+        self.assertEqual(stored, message)
+        self.assertIs(stored.parts[0].file.bytes, message.parts[0].file.bytes)
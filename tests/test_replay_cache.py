@@ -0,0 +1,63 @@
+"""Test cases for the TokenReplayCache utility"""
+import threading
+
+import pytest
+
+from common.utils.replay_cache import TokenReplayCache
+
+
+@pytest.fixture(scope="function")
+def replay_cache():
+    """Provides a cache with a 60 second window split into 10 second buckets."""
+    return TokenReplayCache(window_seconds=60, bucket_seconds=10)
+
+
+def test_first_use_is_accepted(replay_cache):
+    assert replay_cache.add("jti-1", issued_at=1000, now=1000) is True
+    assert len(replay_cache) == 1
+
+
+def test_replay_within_window_is_rejected(replay_cache):
+    assert replay_cache.add("jti-1", issued_at=1000, now=1000) is True
+    assert replay_cache.add("jti-1", issued_at=1000, now=1030) is False
+
+
+def test_distinct_tokens_are_accepted(replay_cache):
+    assert replay_cache.add("jti-1", issued_at=1000, now=1000) is True
+    assert replay_cache.add("jti-2", issued_at=1000, now=1000) is True
+
+
+def test_expired_tokens_are_evicted(replay_cache):
+    replay_cache.add("jti-1", issued_at=1000, now=1000)
+    replay_cache.add("jti-2", issued_at=1000, now=1000)
+    # Past the window plus one bucket, every entry from t=1000 must be gone.
+    replay_cache.add("jti-3", issued_at=1080, now=1080)
+    assert len(replay_cache) == 1
+
+
+def test_memory_is_bounded_by_window(replay_cache):
+    """Only tokens issued within roughly one window are retained."""
+    for second in range(0, 1000):
+        replay_cache.add(f"jti-{second}", issued_at=second, now=second)
+    assert len(replay_cache) <= 60 + 10
+
+
+def test_future_issued_at_is_kept_until_it_expires(replay_cache):
+    assert replay_cache.add("jti-1", issued_at=1100, now=1000) is True
+    assert replay_cache.add("jti-1", issued_at=1100, now=1150) is False
+
+
+def test_concurrent_replays_accept_only_one():
+    replay_cache = TokenReplayCache()
+    results = []
+
+    def worker():
+        results.append(replay_cache.add("jti-1", issued_at=1000, now=1000))
+
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count(True) == 1